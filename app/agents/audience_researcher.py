@@ -1,8 +1,11 @@
 """Audience Research Agent — generates personas and targeting recommendations from brief data."""
 
+from app.context_compaction import PromptField, compact_prompt
 from app.gemini_client import LLMClient
 from app.schemas import AudienceOutput, BriefParserOutput
 
+TOKEN_BUDGET = 1_000
+
 PROMPT_TEMPLATE = """You are a senior audience strategist at a social-first marketing agency. Your job is to develop detailed audience personas and targeting recommendations based on a campaign brief.
 
 Create 2-3 distinct audience personas that align with the campaign objectives. Each persona should feel like a real person — give them a memorable name, specific demographics, motivations, pain points, and channel preferences.
@@ -28,6 +31,19 @@ For each persona, consider:
 Also provide overall targeting recommendations, an audience size estimate, key insights about the audience, and a suggested tone of voice for the campaign."""
 
 
+def build_prompt(input: BriefParserOutput) -> str:
+    """Render the audience research prompt, compacted to TOKEN_BUDGET."""
+    return compact_prompt("audience_researcher", PROMPT_TEMPLATE, TOKEN_BUDGET, {
+        "campaign_name": input.campaign_name,
+        "client_name": input.client_name,
+        "objectives": PromptField(input.objectives),
+        "target_audience": PromptField([input.target_audience], min_chars=300),
+        "channels": ", ".join(input.channels),
+        "key_messages": PromptField(input.key_messages),
+        "timeline": input.timeline,
+    })
+
+
 async def research_audience(input: BriefParserOutput, client: LLMClient) -> AudienceOutput:
     """Generate audience personas and targeting strategy from parsed brief data.
 
@@ -38,15 +54,7 @@ async def research_audience(input: BriefParserOutput, client: LLMClient) -> Audi
     Returns:
         Audience personas, targeting recommendations, and tone guidance.
     """
-    prompt = PROMPT_TEMPLATE.format(
-        campaign_name=input.campaign_name,
-        client_name=input.client_name,
-        objectives=", ".join(input.objectives),
-        target_audience=input.target_audience,
-        channels=", ".join(input.channels),
-        key_messages=", ".join(input.key_messages),
-        timeline=input.timeline,
-    )
-
-    result = await client.generate(prompt, AudienceOutput)
-    return AudienceOutput.model_validate(result)
+    prompt = build_prompt(input)
+
+    result = await client.generate_raw(prompt, AudienceOutput)
+    return AudienceOutput.model_validate_json(result)
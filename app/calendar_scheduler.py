@@ -0,0 +1,213 @@
+"""Calendar slot scheduler — the content calendar's grid, computed not generated.
+
+Most of a CalendarOutput is structure: how many weeks, which days each
+channel posts on, which content type goes in each slot. That follows from
+the brief and the personas by rule, so it is built here:
+
+- weeks: read from the brief's timeline ("8 weeks", "3-month"), default
+  DEFAULT_WEEKS, trimmed so the whole calendar fits the schema's entry limit;
+- days per channel: CHANNEL_RULES posting days, plus one extra day for a
+  channel any persona lists in preferred_channels;
+- content types: each channel's native formats, rotated through the weeks,
+  with formats matching a persona's content_preferences first and twice as
+  often;
+- focus: the brief's key messages, one per week in turn.
+
+The Content Calendar agent then asks the LLM only for each slot's topic,
+caption hook and hashtags (app/agents/content_calendar.py).
+"""
+
+import re
+from dataclasses import dataclass
+
+from app.schemas import AudienceOutput, BriefParserOutput, CalendarOutput, ChannelStrategy
+
+DEFAULT_WEEKS = 4
+MAX_WEEKS = 52
+MAX_ENTRIES = CalendarOutput.model_fields["entries"].metadata[0].max_length
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+_WEEKS = re.compile(r"(\d+)\s*-?\s*weeks?\b", re.IGNORECASE)
+_MONTHS = re.compile(r"(\d+)\s*-?\s*months?\b", re.IGNORECASE)
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelRule:
+    # Base posting days — posts a week is their count
+    days: tuple[str, ...]
+    # Native formats, in default rotation order
+    formats: tuple[str, ...]
+
+
+# Matched by substring of the casefolded channel name, first match wins
+CHANNEL_RULES: dict[str, ChannelRule] = {
+    "instagram": ChannelRule(("Monday", "Wednesday", "Friday", "Sunday"), ("Reel", "Carousel", "Story", "Static post")),
+    "tiktok": ChannelRule(("Tuesday", "Wednesday", "Thursday", "Saturday", "Sunday"), ("Short video", "Trend remix", "Duet")),
+    "linkedin": ChannelRule(("Tuesday", "Wednesday", "Thursday"), ("Text post", "Carousel", "Article", "Short video")),
+    "youtube": ChannelRule(("Thursday",), ("Long-form video", "Short")),
+    "facebook": ChannelRule(("Monday", "Wednesday", "Friday"), ("Static post", "Short video", "Story")),
+    "pinterest": ChannelRule(("Tuesday", "Friday", "Sunday"), ("Static pin", "Idea pin")),
+    "twitter": ChannelRule(("Monday", "Tuesday", "Wednesday", "Thursday", "Friday"), ("Thread", "Text post", "Image post")),
+    "threads": ChannelRule(("Monday", "Wednesday", "Friday"), ("Text post", "Image post")),
+    "email": ChannelRule(("Tuesday",), ("Newsletter",)),
+    "blog": ChannelRule(("Wednesday",), ("Article",)),
+}
+# Channels matched by exact name only — too short to substring-match
+EXACT_RULES = {"x": CHANNEL_RULES["twitter"]}
+DEFAULT_RULE = ChannelRule(("Monday", "Wednesday", "Friday"), ("Static post", "Short video"))
+# Where a persona-preferred channel's extra posting day comes from
+EXTRA_DAYS = ("Saturday", "Tuesday", "Thursday", "Sunday", "Friday", "Wednesday", "Monday")
+
+# Content-preference word prefix → format-name word prefixes it picks out
+FORMAT_KEYWORDS: dict[str, tuple[str, ...]] = {
+    "video": ("video", "reel", "short", "duet", "trend"),
+    "reel": ("reel",),
+    "carousel": ("carousel",),
+    "stor": ("story",),
+    "thread": ("thread",),
+    "article": ("article",),
+    "blog": ("article",),
+    "long-form": ("article", "long-form"),
+    "newsletter": ("newsletter",),
+    "email": ("newsletter",),
+    "pin": ("pin",),
+    "image": ("image", "static", "pin"),
+    "photo": ("image", "static", "pin"),
+    "static": ("static",),
+    "text": ("text", "thread"),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CalendarSlot:
+    week: int
+    day: str
+    channel: str
+    content_type: str
+    # Key message this week's posts lead with; "" when the brief has none
+    focus: str
+    # Format matches a persona's content preferences
+    preferred: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CalendarSchedule:
+    weeks: int
+    # Weeks the timeline asked for, before trimming to MAX_ENTRIES
+    requested_weeks: int
+    slots: list[CalendarSlot]
+    # Per channel, in brief order: (channel, posting days, format rotation)
+    channels: list[tuple[str, tuple[str, ...], tuple[str, ...]]]
+
+    def campaign_duration(self) -> str:
+        if self.weeks < self.requested_weeks:
+            return f"{self.weeks} weeks (of {self.requested_weeks}, capped at {MAX_ENTRIES} posts)"
+        return f"{self.weeks} weeks"
+
+    def posting_frequency(self) -> str:
+        label = ", ".join(f"{channel} {len(days)}/week" for channel, days, _ in self.channels)
+        if len(label) <= 100:
+            return label
+        return f"{sum(len(days) for _, days, _ in self.channels)} posts/week across {len(self.channels)} channels"
+
+    def channel_strategies(self) -> list[ChannelStrategy]:
+        return [
+            ChannelStrategy(
+                channel=channel,
+                strategy=(
+                    f"{len(days)} posts a week ({', '.join(day[:3] for day in days)}), "
+                    f"rotating {', '.join(dict.fromkeys(rotation))}."
+                )[:500],
+            )
+            for channel, days, rotation in self.channels[:10]
+        ]
+
+
+def schedule_calendar(brief: BriefParserOutput, audience: AudienceOutput) -> CalendarSchedule:
+    """Build the slot grid: every (week, day, channel) post with its content type and focus.
+
+    Slots are ordered by week, weekday, then brief channel order, so the same
+    brief and personas always give the same calendar.
+    """
+    targets = _format_targets(audience)
+    preferred_channels = {c.casefold() for persona in audience.personas for c in persona.preferred_channels}
+
+    channels = []
+    seen: set[str] = set()
+    for name in (c.strip() for c in brief.channels):
+        if not name or name.casefold() in seen:
+            continue
+        seen.add(name.casefold())
+        rule = channel_rule(name)
+        days = rule.days
+        if name.casefold() in preferred_channels:
+            extra = next((day for day in EXTRA_DAYS if day not in days), None)
+            days = days + ((extra,) if extra else ())
+        channels.append((name, tuple(sorted(days, key=DAYS.index)), _rotation(rule.formats, targets)))
+
+    per_week = sum(len(days) for _, days, _ in channels)
+    requested_weeks = timeline_weeks(brief.timeline)
+    weeks = min(requested_weeks, max(MAX_ENTRIES // max(per_week, 1), 1))
+    messages = brief.key_messages
+
+    slots = []
+    for week in range(1, weeks + 1):
+        focus = messages[(week - 1) % len(messages)] if messages else ""
+        for day in DAYS:
+            for channel, days, rotation in channels:
+                if day not in days:
+                    continue
+                # Continue the rotation across weeks so a channel's Monday isn't always the same format
+                turn = (week - 1) * len(days) + days.index(day)
+                content_type = rotation[turn % len(rotation)]
+                slots.append(CalendarSlot(
+                    week=week, day=day, channel=channel, content_type=content_type,
+                    focus=focus, preferred=_matches(content_type, targets),
+                ))
+    return CalendarSchedule(weeks=weeks, requested_weeks=requested_weeks, slots=slots[:MAX_ENTRIES], channels=channels)
+
+
+def channel_rule(channel: str) -> ChannelRule:
+    name = channel.strip().casefold()
+    if name in EXACT_RULES:
+        return EXACT_RULES[name]
+    return next((rule for key, rule in CHANNEL_RULES.items() if key in name), DEFAULT_RULE)
+
+
+def timeline_weeks(timeline: str) -> int:
+    """Campaign length in weeks from free text — "8 weeks", "6-week", "3 months"; DEFAULT_WEEKS if none."""
+    if match := _WEEKS.search(timeline):
+        weeks = int(match.group(1))
+    elif match := _MONTHS.search(timeline):
+        weeks = round(int(match.group(1)) * 52 / 12)
+    else:
+        weeks = DEFAULT_WEEKS
+    return min(max(weeks, 1), MAX_WEEKS)
+
+
+def _format_targets(audience: AudienceOutput) -> set[str]:
+    """Format-name word prefixes the personas' content preferences point at."""
+    targets: set[str] = set()
+    for persona in audience.personas:
+        for preference in persona.content_preferences:
+            for word in _words(preference):
+                for keyword, prefixes in FORMAT_KEYWORDS.items():
+                    if word.startswith(keyword):
+                        targets.update(prefixes)
+    return targets
+
+
+def _rotation(formats: tuple[str, ...], targets: set[str]) -> tuple[str, ...]:
+    """Format rotation: preferred formats first and twice each, then the rest."""
+    preferred = [f for f in formats if _matches(f, targets)]
+    if not preferred:
+        return formats
+    return tuple(preferred * 2 + [f for f in formats if f not in preferred])
+
+
+def _matches(content_type: str, targets: set[str]) -> bool:
+    return any(word.startswith(target) for word in _words(content_type) for target in targets)
+
+
+def _words(text: str) -> list[str]:
+    return [word for word in re.split(r"[\s/,]+", text.casefold()) if word]
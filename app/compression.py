@@ -0,0 +1,252 @@
+"""Negotiated response compression — gzip always, brotli/zstd when installed.
+
+Pure ASGI middleware that works on streaming responses too. Starlette's
+GZipMiddleware buffers its compressor and deliberately skips
+text/event-stream, so SSE went out uncompressed. Here every body chunk is
+compressed and flushed on its own (a sync flush), so each SSE event reaches
+the browser as soon as it's emitted — the compressor never holds it back.
+
+Buffered responses (JSON endpoints) smaller than `compression_min_bytes` are
+sent as-is, since compressing a tiny body costs more than it saves. A stream
+can't switch encodings mid-response, so small SSE events are still
+compressed — they share the dictionary of earlier events and shrink well.
+
+Responses that carry an ETag or a Content-Encoding pass through untouched:
+the route chose that representation (/demo serves its own gzip variant),
+and re-encoding it would put one validator on two different byte bodies.
+
+Per-endpoint byte counts are logged when each response ends — including a
+stream cut short by a client disconnect — and are aggregated for
+/api/v1/metrics.
+"""
+
+import logging
+import zlib
+from collections.abc import Callable
+
+from app.config import settings
+
+logger = logging.getLogger("agencyflow.compression")
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript")
+
+
+class _Gzip:
+    def __init__(self):
+        # wbits=31 → gzip container
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self):
+        # Quality 5: near-gzip speed with better ratios; 11 is far too slow per event
+        self._compressor = brotli.Compressor(quality=5)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_encodings() -> dict[str, Callable[[], object]]:
+    """Encoding name → compressor factory, in server preference order."""
+    encodings: dict[str, Callable[[], object]] = {}
+    if zstandard is not None:
+        encodings["zstd"] = _Zstd
+    if brotli is not None:
+        encodings["br"] = _Brotli
+    encodings["gzip"] = _Gzip
+    return encodings
+
+
+def negotiate(accept_encoding: str, encodings: dict[str, Callable[[], object]]) -> str | None:
+    """Pick the encoding to use from an Accept-Encoding header, or None for identity.
+
+    Highest client q-value wins; ties go to the server's preference order.
+    """
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name:
+            weights[name.strip()] = q
+
+    candidates = [
+        (weights.get(name, weights.get("*", 0.0)), -rank, name)
+        for rank, name in enumerate(encodings)
+    ]
+    q, _, name = max(candidates)
+    return name if q > 0 else None
+
+
+class CompressionStats:
+    """Raw vs compressed bytes per endpoint."""
+
+    def __init__(self):
+        self._endpoints: dict[str, dict[str, int]] = {}
+
+    def record(self, endpoint: str, raw: int, compressed: int) -> None:
+        row = self._endpoints.setdefault(endpoint, {"responses": 0, "raw_bytes": 0, "compressed_bytes": 0})
+        row["responses"] += 1
+        row["raw_bytes"] += raw
+        row["compressed_bytes"] += compressed
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            endpoint: {**row, "ratio": round(row["raw_bytes"] / row["compressed_bytes"], 2)
+                       if row["compressed_bytes"] else None}
+            for endpoint, row in self._endpoints.items()
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_bytes: int | None = None, stats: CompressionStats | None = None):
+        self.app = app
+        self.min_bytes = settings.compression_min_bytes if min_bytes is None else min_bytes
+        self.stats = stats or compression_stats
+        self.encodings = available_encodings()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        encoding = negotiate(headers.get(b"accept-encoding", b"").decode("latin-1"), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, scope, send, encoding)
+        try:
+            await self.app(scope, receive, responder)
+        finally:
+            # A disconnected client ends the stream without a final body message
+            if responder.compressor is not None:
+                responder.record_stats()
+
+
+class _CompressingResponder:
+    """Wraps `send` for one response, deciding on the first body message."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str):
+        self.middleware = middleware
+        self.scope = scope
+        self.send = send
+        self.encoding = encoding
+        self.start_message: dict | None = None
+        self.compressor = None
+        self.passthrough = False
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    async def __call__(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            if not self._compressible(message):
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        if self.passthrough or message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < self.middleware.min_bytes:
+                # Whole response fits in one small body — not worth compressing
+                self.passthrough = True
+                await self._send_start(identity=True)
+                await self.send(message)
+                return
+            self.compressor = self.middleware.encodings[self.encoding]()
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                self.raw_bytes = len(body)
+                await self._send_start(content_length=len(compressed))
+                await self._send_body(compressed, more_body=False)
+                return
+            # Streaming — length unknown, every chunk is flushed as it's compressed
+            await self._send_start()
+
+        chunk = self.compressor.compress(body) if body else b""
+        self.raw_bytes += len(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self._send_body(chunk, more_body)
+
+    def _compressible(self, message) -> bool:
+        if message["status"] in (204, 304) or self.scope.get("method") == "HEAD":
+            return False
+        headers = {k.lower(): v for k, v in message.get("headers", [])}
+        if b"content-encoding" in headers or b"etag" in headers:
+            return False
+        content_type = headers.get(b"content-type", b"").decode("latin-1")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+    async def _send_start(self, identity: bool = False, content_length: int | None = None) -> None:
+        message = self.start_message
+        headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"vary"]
+        vary = [v for k, v in message.get("headers", []) if k.lower() == b"vary"]
+        headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+        if not identity:
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+            if content_length is not None:
+                headers.append((b"content-length", str(content_length).encode("latin-1")))
+        await self.send({**message, "headers": headers})
+
+    async def _send_body(self, chunk: bytes, more_body: bool) -> None:
+        self.compressed_bytes += len(chunk)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def record_stats(self) -> None:
+        route = self.scope.get("route")
+        endpoint = getattr(route, "path", None) or self.scope.get("path", "")
+        self.middleware.stats.record(endpoint, self.raw_bytes, self.compressed_bytes)
+        ratio = self.raw_bytes / self.compressed_bytes if self.compressed_bytes else 0.0
+        logger.info(
+            f"{endpoint} {self.encoding}: {self.raw_bytes} → {self.compressed_bytes} bytes "
+            f"({ratio:.1f}x)"
+        )
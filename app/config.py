@@ -3,8 +3,8 @@ from pydantic import Field
 
 
 class Settings(BaseSettings):
-    # Provider selection: "gemini" or "ollama"
-    llm_provider: str = Field("ollama", description="LLM provider: 'gemini' or 'ollama'")
+    # Provider selection: "gemini", "ollama" or "replay"
+    llm_provider: str = Field("ollama", description="LLM provider: 'gemini', 'ollama' or 'replay'")
 
     # Gemini settings
     gemini_api_key: str = Field("", description="Google Gemini API key")
@@ -15,8 +15,47 @@ class Settings(BaseSettings):
     ollama_base_url: str = Field("http://localhost:11434", description="Ollama server URL")
     ollama_model: str = Field("gemma3n:e2b", description="Ollama model name")
 
+    # Replay settings — offline backend for load testing (llm_provider="replay")
+    replay_data_dir: str = Field("", description="Directory of <agent>.json fixtures (default: data/precomputed)")
+    replay_recordings_path: str = Field("", description="JSONL recordings captured from live runs")
+    replay_capture_path: str = Field("", description="If set, record live LLM responses to this JSONL file")
+    replay_latency_model: str = Field("fixed", description="Latency distribution: 'fixed', 'lognormal' or 'histogram'")
+    replay_latency_ms: float = Field(0.0, description="Fixed latency, or lognormal median, in milliseconds")
+    replay_latency_sigma: float = Field(0.5, description="Lognormal shape parameter")
+    replay_error_rate_429: float = Field(0.0, ge=0.0, le=1.0, description="Fraction of calls failing with 429")
+    replay_error_rate_503: float = Field(0.0, ge=0.0, le=1.0, description="Fraction of calls failing with 503")
+    replay_rpm_limit: int = Field(0, ge=0, description="Simulated provider RPM limit (0 = unlimited)")
+    replay_seed: int | None = Field(None, description="Random seed for reproducible latency/errors")
+
+    max_concurrent_runs: int = Field(1, ge=1, description="Pipeline runs allowed at once (raise for load tests)")
+    max_concurrent_demo_runs: int = Field(1000, ge=1, description="Demo-replay runs allowed at once (beyond this POST /run returns 429)")
+    max_finished_runs: int = Field(1000, ge=1, description="Finished runs kept for streaming and lookup; the oldest are evicted first")
+    finished_run_ttl_s: float = Field(3600.0, gt=0, description="Seconds a finished run is kept before eviction")
+    event_log_capacity: int = Field(512, ge=1, description="SSE events retained per run for replay/resume")
+    compact_events: bool = Field(False, description="Default for runs: send large output lists as agent_output_chunk pages")
+    event_chunk_size: int = Field(20, ge=1, description="List items per agent_output_chunk event in compact mode")
+    firehose_capacity: int = Field(4096, ge=1, description="SSE events retained across all runs for the multiplexed stream")
     max_upload_size_bytes: int = Field(10 * 1024 * 1024, description="Max file upload size (10MB)")
+    pdf_workers: int = Field(0, ge=0, description="PDF extraction worker processes (0 = CPU count)")
+    pdf_timeout_s: float = Field(30.0, gt=0, description="Wall-clock limit per PDF; stuck workers are killed")
+    pdf_fast_pass: bool = Field(True, description="Read the PDF text layer with pdfium first; pdfplumber only for pages that fail the quality check")
+    text_cache_max_bytes: int = Field(64 * 1024 * 1024, ge=0, description="In-memory budget for cached extracted text (characters)")
+    text_cache_dir: str = Field("", description="Optional directory for a persistent extracted-text cache")
+    upload_spool_bytes: int = Field(1024 * 1024, ge=0, description="Uploads larger than this spool to a temp file")
+    compression_enabled: bool = Field(True, description="Negotiated gzip/brotli/zstd for JSON and SSE responses")
+    compression_min_bytes: int = Field(512, ge=0, description="Buffered responses smaller than this go out uncompressed")
+    analytics_dir: str = Field("", description="Directory for the Parquet analytics store of completed runs (empty = disabled)")
+    analytics_flush_rows: int = Field(5000, ge=1, description="Buffered analytics rows per Parquet write")
+    metrics_ingest_max_bytes: int = Field(2 * 1024**3, ge=1, description="Max size of a streamed metrics export (CSV/NDJSON)")
+    metrics_ingest_block_bytes: int = Field(8 * 1024 * 1024, ge=1024, description="Export bytes parsed and reduced per block")
+    performance_fast_report: bool = Field(False, description="Default for runs: build the performance report from computed metrics, no LLM call")
+    performance_incremental_report: bool = Field(False, description="Default for runs: cached per-channel analyses + a summary call, so refreshes regenerate only changed channels")
+    calendar_fan_out: bool = Field(False, description="Default for runs: plan the content calendar in one call, then generate each channel's entries concurrently")
+    calendar_scheduler: bool = Field(False, description="Default for runs: build the calendar grid by rule and ask the LLM only for topics, caption hooks and hashtags")
+    report_cache_max_entries: int = Field(1000, ge=0, description="Cached channel analyses and report summaries (LRU)")
     cors_origin: str = Field("http://localhost:5173", description="Allowed CORS origin")
+    data_cache_check_interval_s: float = Field(1.0, ge=0, description="How often bundled data files are checked for changes")
+    demo_replay_scale: float = Field(0.1, gt=0, description="Speed factor for 'scaled' demo replay (0.1 = 10x faster)")
     demo_mode: bool = Field(False, description="Use pre-computed demo outputs")
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
@@ -0,0 +1,186 @@
+"""Context compaction — fits upstream agent outputs into a per-agent prompt token budget.
+
+Each downstream agent declares a TOKEN_BUDGET and hands its prompt fields to
+`compact_prompt` instead of calling PROMPT_TEMPLATE.format directly. When the
+rendered prompt is over budget, fields are shrunk one at a time — largest
+first — by summarizing list items, dropping the lowest-ranked items, and
+finally truncating text.
+"""
+
+import logging
+import string
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from app.schemas import CompactionReport
+
+logger = logging.getLogger("agencyflow.compaction")
+
+# WHY a character heuristic: we don't ship a tokenizer for Gemini or the local
+# Ollama models. ~4 characters per token is the usual rule of thumb for English
+# and is good enough for budgeting — the goal is bounded prompts, not exact counts.
+CHARS_PER_TOKEN = 4
+ELLIPSIS = "…"
+
+# Reports for the current pipeline run. A ContextVar (not a global list) so that
+# concurrent runs each see their own list — asyncio tasks copy the context of
+# the task that created them, so agents started via asyncio.gather still append
+# to the run's list.
+_reports: ContextVar[list[CompactionReport] | None] = ContextVar(
+    "compaction_reports", default=None
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (ceil of chars / CHARS_PER_TOKEN)."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class PromptField:
+    """A compactable prompt value.
+
+    Args:
+        items: List items in priority order — the tail is dropped first.
+        summaries: Optional shorter variant of each item, swapped in before
+            any item is dropped.
+        separator: Joins items into the rendered value.
+        min_items: Never drop below this many items.
+        min_chars: Never truncate the rendered value below this length.
+        truncatable: Set False for values that must never be cut mid-text.
+    """
+
+    items: list[str]
+    summaries: list[str] | None = None
+    separator: str = ", "
+    min_items: int = 1
+    min_chars: int = 80
+    truncatable: bool = True
+
+    def __post_init__(self) -> None:
+        self._items = list(self.items)
+        self._unsummarized = len(self._items) if self.summaries else 0
+        self._truncate_to: int | None = None
+
+    @property
+    def compacted(self) -> bool:
+        return self.render() != self.separator.join(self.items) if self.items else False
+
+    def render(self) -> str:
+        text = self.separator.join(self._items)
+        if self._truncate_to is not None and len(text) > self._truncate_to:
+            text = _truncate(text, self._truncate_to)
+        return text
+
+    def shrink(self, excess_chars: int) -> bool:
+        """Apply the next compaction step. Returns False when nothing is left to cut."""
+        # 1. Summarize: swap in the summary of the lowest-priority full item
+        if self._unsummarized > 0:
+            self._unsummarized -= 1
+            self._items[self._unsummarized] = self.summaries[self._unsummarized]  # type: ignore[index]
+            return True
+
+        # 2. Rank: drop the lowest-priority item
+        if len(self._items) > self.min_items:
+            self._items.pop()
+            return True
+
+        # 3. Truncate: cut the rendered text down toward min_chars
+        current = len(self.render())
+        if self.truncatable and current > self.min_chars:
+            self._truncate_to = max(self.min_chars, current - max(excess_chars, 1))
+            return True
+
+        return False
+
+
+def first_sentence(text: str) -> str:
+    """Cheap extractive summary — the text up to its first sentence break."""
+    for i, char in enumerate(text):
+        if char in ".!?" and (i + 1 == len(text) or text[i + 1] == " "):
+            return text[: i + 1]
+    return text
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    """Truncate at a word boundary and mark the cut with an ellipsis."""
+    cut = text[: max(max_chars - len(ELLIPSIS), 0)]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,;") + ELLIPSIS
+
+
+def compact_prompt(
+    agent_name: str,
+    template: str,
+    token_budget: int,
+    fields: dict[str, str | PromptField],
+) -> str:
+    """Render `template` with `fields`, compacting PromptFields until it fits the budget.
+
+    Plain string fields are treated as fixed and never shrunk. The compaction
+    report is logged and, inside `collect_reports()`, recorded for the run.
+    """
+    occurrences: dict[str, int] = {}
+    for _, name, _, _ in string.Formatter().parse(template):
+        if name:
+            occurrences[name] = occurrences.get(name, 0) + 1
+    overhead = len(template.format(**{name: "" for name in fields}))
+
+    def total_chars() -> int:
+        return overhead + sum(
+            occurrences.get(name, 0) * len(_render(value)) for name, value in fields.items()
+        )
+
+    before_chars = total_chars()
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    while total_chars() > budget_chars:
+        # Shrink the largest compactable field first — it has the most to give
+        candidates = sorted(
+            (name for name, value in fields.items() if isinstance(value, PromptField)),
+            key=lambda name: len(fields[name].render()),
+            reverse=True,
+        )
+        excess = total_chars() - budget_chars
+        if not any(fields[name].shrink(excess) for name in candidates):
+            break  # Every field is at its floor — send what we have
+
+    prompt = template.format(**{name: _render(value) for name, value in fields.items()})
+
+    report = CompactionReport(
+        agent_name=agent_name,
+        token_budget=token_budget,
+        tokens_before=-(-before_chars // CHARS_PER_TOKEN),
+        tokens_after=estimate_tokens(prompt),
+        compacted_fields=[
+            name
+            for name, value in fields.items()
+            if isinstance(value, PromptField) and value.compacted
+        ],
+    )
+    if report.compacted_fields:
+        logger.info(
+            f"{agent_name}: compacted prompt {report.tokens_before} → {report.tokens_after} "
+            f"tokens (budget {token_budget}, fields: {', '.join(report.compacted_fields)})"
+        )
+    reports = _reports.get()
+    if reports is not None:
+        reports.append(report)
+    return prompt
+
+
+def _render(value: str | PromptField) -> str:
+    return value.render() if isinstance(value, PromptField) else value
+
+
+@contextmanager
+def collect_reports() -> Iterator[list[CompactionReport]]:
+    """Collect compaction reports from every agent prompt built inside the block."""
+    reports: list[CompactionReport] = []
+    token = _reports.set(reports)
+    try:
+        yield reports
+    finally:
+        _reports.reset(token)
@@ -1,37 +1,47 @@
 """File parser — extracts text from uploaded PDF and TXT files."""
 
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO
 
-# WHY ThreadPoolExecutor: pdfplumber is a synchronous, CPU-bound library.
-# Running it directly in an async context would block the event loop,
-# preventing other requests from being served. asyncio.run_in_executor
-# offloads it to a thread pool so the event loop stays responsive.
-_executor = ThreadPoolExecutor(max_workers=2)
+# WHY a process pool: pdfplumber is synchronous and CPU-bound. Running it in
+# the event loop would block every other request, and threads are serialized
+# by the GIL — see app/pdf_extraction.py.
+from app.pdf_extraction import EXTRACTOR_VERSION, MAX_PDF_PAGES, pdf_pool  # noqa: F401 — MAX_PDF_PAGES re-exported
+from app.text_cache import cache_key, text_cache
 
 ALLOWED_EXTENSIONS = {".txt", ".pdf"}
-MAX_PDF_PAGES = 20
 PDF_MAGIC_BYTES = b"%PDF-"
 
 
-def _extract_pdf_text(file_bytes: bytes) -> str:
-    """Extract text from PDF bytes (runs in thread pool, not async)."""
-    import io
-    import pdfplumber
+def check_file_header(filename: str, head: bytes) -> None:
+    """Validate the extension and the file's leading bytes.
 
-    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-        pages = pdf.pages[:MAX_PDF_PAGES]
-        texts = [page.extract_text() or "" for page in pages]
-    return "\n\n".join(texts).strip()
+    Needs only the first `len(PDF_MAGIC_BYTES)` bytes, so streaming uploads can
+    be rejected from their first chunk.
 
+    Raises:
+        ValueError: If the file type is not supported or the magic bytes don't match.
+    """
+    ext = Path(filename).suffix.lower()
+
+    if ext not in ALLOWED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: {ext}. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
 
-async def parse_file(filename: str, content: bytes) -> str:
+    # Validate magic bytes — prevents someone from uploading a .exe renamed to .pdf
+    if ext == ".pdf" and not head[:5].startswith(PDF_MAGIC_BYTES):
+        raise ValueError("File does not appear to be a valid PDF")
+
+
+async def parse_file(filename: str, content: bytes | BinaryIO) -> str:
     """Parse an uploaded file and return extracted text.
 
     Args:
         filename: Original filename (used for extension detection).
-        content: Raw file bytes.
+        content: Raw file bytes, or a seekable binary file positioned at the
+            start (e.g. a spooled upload) — read in place, not copied first.
+            A file with a `path` (an upload spooled to disk) is extracted
+            from that path.
 
     Returns:
         Extracted text content.
@@ -41,23 +51,36 @@ async def parse_file(filename: str, content: bytes) -> str:
     """
     ext = Path(filename).suffix.lower()
 
-    if ext not in ALLOWED_EXTENSIONS:
-        raise ValueError(f"Unsupported file type: {ext}. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
+    if isinstance(content, bytes):
+        check_file_header(filename, content[:len(PDF_MAGIC_BYTES)])
+    else:
+        check_file_header(filename, content.read(len(PDF_MAGIC_BYTES)))
+        content.seek(0)
 
     if ext == ".txt":
-        return content.decode("utf-8").strip()
+        data = content if isinstance(content, bytes) else content.read()
+        return data.decode("utf-8").strip()
 
     if ext == ".pdf":
-        # Validate magic bytes — prevents someone from uploading a .exe renamed to .pdf
-        if not content[:5].startswith(PDF_MAGIC_BYTES):
-            raise ValueError("File does not appear to be a valid PDF")
-
-        loop = asyncio.get_event_loop()
-        text = await loop.run_in_executor(_executor, _extract_pdf_text, content)
+        # Checked before any pool dispatch — a repeat upload costs one hash,
+        # computed block by block for a file
+        key = await asyncio.to_thread(cache_key, content, EXTRACTOR_VERSION)
+        text = await text_cache.get(key)
+        if text is not None:
+            return text
+
+        # Workers open a file on disk by path; anything else goes to them as bytes
+        path = None if isinstance(content, bytes) else getattr(content, "path", None)
+        if path is not None:
+            source = path
+        else:
+            source = content if isinstance(content, bytes) else await asyncio.to_thread(content.read)
+        text = await pdf_pool.extract(source)
 
         if not text:
             raise ValueError("Could not extract text from PDF — file may be image-only")
 
+        await text_cache.put(key, text)
         return text
 
     raise ValueError(f"Unhandled file type: {ext}")
@@ -16,10 +16,19 @@ logger = logging.getLogger("agencyflow.gemini")
 
 @runtime_checkable
 class LLMClient(Protocol):
-    """Protocol for LLM clients — enables swapping Gemini for mocks or other providers."""
+    """Protocol for LLM clients — enables swapping Gemini for mocks or other providers.
+
+    Agents call `generate_raw` and validate the provider's JSON text straight
+    into the response model with `model_validate_json`. WHY: pydantic-core
+    parses and validates in one pass, where `json.loads` + `model_validate`
+    builds a throwaway dict tree first. `generate` returns the parsed dict
+    for callers that want one.
+    """
 
     async def generate(self, prompt: str, response_schema: type[BaseModel]) -> dict: ...
 
+    async def generate_raw(self, prompt: str, response_schema: type[BaseModel]) -> str | bytes: ...
+
 
 class TokenBucketRateLimiter:
     """Token bucket rate limiter for Gemini API calls.
@@ -33,9 +42,13 @@ class TokenBucketRateLimiter:
         self._tokens = float(rpm_limit)
         self._last_refill = time.monotonic()
         self._lock = asyncio.Lock()
+        # Counters for load benchmarks — how much of a run is spent throttled
+        self.acquisitions = 0
+        self.total_wait_s = 0.0
 
     async def acquire(self) -> None:
         """Wait until a token is available."""
+        start = time.monotonic()
         while True:
             async with self._lock:
                 now = time.monotonic()
@@ -49,6 +62,8 @@ class TokenBucketRateLimiter:
 
                 if self._tokens >= 1.0:
                     self._tokens -= 1.0
+                    self.acquisitions += 1
+                    self.total_wait_s += now - start
                     return
 
             # No token available — wait before retrying
@@ -76,6 +91,10 @@ class GeminiClient:
         self._client = genai.Client(api_key=self._api_key)
 
     async def generate(self, prompt: str, response_schema: type[BaseModel]) -> dict:
+        """Generate structured output from Gemini as a parsed JSON dict."""
+        return json.loads(await self.generate_raw(prompt, response_schema))
+
+    async def generate_raw(self, prompt: str, response_schema: type[BaseModel]) -> str:
         """Generate structured output from Gemini.
 
         Args:
@@ -83,7 +102,7 @@ class GeminiClient:
             response_schema: Pydantic model class defining expected output structure.
 
         Returns:
-            Parsed JSON dict matching the response_schema.
+            The response's JSON text, unparsed, matching the response_schema.
 
         Raises:
             RuntimeError: After exhausting retries on retryable errors.
@@ -106,7 +125,7 @@ class GeminiClient:
                     ),
                     timeout=self.CALL_TIMEOUT,
                 )
-                return json.loads(response.text)
+                return response.text
 
             except asyncio.TimeoutError:
                 last_error = TimeoutError(f"Gemini API call timed out after {self.CALL_TIMEOUT}s")
@@ -138,6 +157,13 @@ class GeminiClient:
             f"Gemini API failed after {self.MAX_RETRIES} retries: {last_error}"
         ) from last_error
 
+    def stats(self) -> dict:
+        """Rate limiter counters for the metrics endpoint."""
+        return {
+            "rate_limit_acquisitions": self._rate_limiter.acquisitions,
+            "rate_limit_wait_s": round(self._rate_limiter.total_wait_s, 3),
+        }
+
     def _backoff_delay(self, attempt: int) -> float:
         """Exponential backoff with jitter."""
         delay = min(self.BASE_DELAY * (2 ** attempt), self.MAX_DELAY)
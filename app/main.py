@@ -1,15 +1,23 @@
 import logging
 from contextlib import asynccontextmanager
+from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from app.compression import CompressionMiddleware
 from app.config import settings
 from app.gemini_client import GeminiClient
 from app.ollama_client import OllamaClient
+from app.pdf_extraction import pdf_pool
+from app.replay_client import RecordingLLMClient, ReplayLLMClient
+from app.routers.analytics import router as analytics_router
 from app.routers.health import router as health_router
+from app.routers.performance import router as performance_router
 from app.routers.pipeline import router as pipeline_router
+from app.services.analytics_store import analytics_store
+from app.services.data_cache import data_cache
 from app.services.pipeline_orchestrator import PipelineOrchestrator
 
 logger = logging.getLogger("agencyflow")
@@ -24,18 +32,29 @@ async def lifespan(app: FastAPI):
     the resources (like GeminiClient) are guaranteed to be cleaned up.
     """
     logger.info("AgencyFlow starting up")
+    # Demo outputs and sample metrics are served from memory from here on
+    data_cache.preload()
     # Pick the LLM client based on config — both satisfy the LLMClient Protocol
     if settings.llm_provider == "ollama":
         logger.info(f"Using Ollama ({settings.ollama_model}) at {settings.ollama_base_url}")
         client = OllamaClient()
+    elif settings.llm_provider == "replay":
+        logger.info(f"Using replay backend ({settings.replay_latency_model} latency)")
+        client = ReplayLLMClient.from_settings()
     else:
         logger.info(f"Using Gemini ({settings.gemini_model})")
         client = GeminiClient()
+    if settings.replay_capture_path and settings.llm_provider != "replay":
+        logger.info(f"Recording LLM responses to {settings.replay_capture_path}")
+        client = RecordingLLMClient(client, Path(settings.replay_capture_path))
     app.state.orchestrator = PipelineOrchestrator(client)
     yield
-    # Clean up httpx client if using Ollama
+    # Clean up httpx client if using Ollama (directly or behind the recorder)
     if hasattr(client, "close"):
         await client.close()
+    pdf_pool.shutdown()
+    # Write any analytics rows still buffered
+    await analytics_store.close()
     logger.info("AgencyFlow shutting down")
 
 
@@ -54,6 +73,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.compression_enabled:
+    # Added after CORS so it wraps it — CORS headers are set on the uncompressed response
+    app.add_middleware(CompressionMiddleware)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -70,3 +93,5 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 app.include_router(health_router)
 app.include_router(pipeline_router)
+app.include_router(analytics_router)
+app.include_router(performance_router)
@@ -0,0 +1,226 @@
+"""Metrics engine — derived campaign KPIs and goal attainment, computed not generated.
+
+CTR, CPC, CPA, CPM and conversion rate are arithmetic on the raw channel
+metrics. Asking the LLM to work them out costs output tokens and latency and
+gets the arithmetic wrong often enough to matter, so they are computed here
+for every channel (and the blended total) in one vectorized pass, then handed
+to the Performance Reporter as facts.
+
+Goals are free text ("5M social impressions", ">4% engagement rate"). Each is
+matched to a metric by keyword and its first number taken as the target;
+goals that can't be matched are reported with no attainment rather than
+guessed at.
+"""
+
+import functools
+import math
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.schemas import PerformanceInput
+
+# Raw columns, in matrix order
+RAW = ("impressions", "reach", "clicks", "conversions", "spend", "engagement_rate")
+_I, _R, _CL, _CV, _S, _E = range(len(RAW))
+
+# Derived KPIs as numerator / denominator × multiplier over the raw columns
+DERIVED = ("ctr", "cpc", "cpa", "cpm", "conversion_rate")
+_NUMERATORS = [_CL, _S, _S, _S, _CV]
+_DENOMINATORS = [_I, _CL, _CV, _I, _CL]
+_MULTIPLIERS = np.array([100.0, 1.0, 1.0, 1000.0, 100.0])
+
+# Display labels, raw and derived
+LABELS = {
+    "impressions": "Impressions",
+    "reach": "Reach",
+    "clicks": "Clicks",
+    "conversions": "Conversions",
+    "spend": "Spend",
+    "engagement_rate": "Engagement rate",
+    "ctr": "CTR",
+    "cpc": "CPC",
+    "cpa": "CPA",
+    "cpm": "CPM",
+    "conversion_rate": "Conversion rate",
+}
+# KPIs a channel is rated on, relative to the blended total
+RATING_KPIS = ("ctr", "conversion_rate", "engagement_rate", "cpa")
+# Geometric-mean score vs the blend: at or above STRONG is Strong, below WEAK is Weak
+STRONG_SCORE = 1.05
+WEAK_SCORE = 0.9
+
+_RATING_COLUMNS = [(RAW + DERIVED).index(metric) for metric in RATING_KPIS]
+_RATING_LOWER = np.array([metric in ("cpc", "cpa", "cpm") for metric in RATING_KPIS])
+
+# Goal keyword → metric, first match wins (rates and costs before the counts they mention)
+_GOAL_METRICS = [
+    (re.compile(r"\bctr\b|click[- ]?through"), "ctr"),
+    (re.compile(r"\bcpc\b|cost per click"), "cpc"),
+    (re.compile(r"\bcpa\b|cost per (?:acquisition|conversion|purchase|sale|lead)"), "cpa"),
+    (re.compile(r"\bcpm\b|cost per (?:mille|thousand)"), "cpm"),
+    (re.compile(r"conversion rate"), "conversion_rate"),
+    (re.compile(r"engagement"), "engagement_rate"),
+    (re.compile(r"impression"), "impressions"),
+    (re.compile(r"\breach\b"), "reach"),
+    (re.compile(r"click|visit|traffic|sessions"), "clicks"),
+    (re.compile(r"conversion|purchase|sale|order|sign[- ]?up|lead|install"), "conversions"),
+    (re.compile(r"spend|budget"), "spend"),
+]
+_GOAL_NUMBER = re.compile(r"(\d[\d,]*(?:\.\d+)?)\s*([kmb](?![a-z])|%)?", re.IGNORECASE)
+_SCALE = {"k": 1e3, "m": 1e6, "b": 1e9}
+# Goals met (and channels better) by staying at or under the target
+LOWER_IS_BETTER = {"cpc", "cpa", "cpm", "spend"}
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelKPIs:
+    channel: str
+    impressions: int
+    reach: int
+    clicks: int
+    conversions: int
+    spend: float
+    engagement_rate: float
+    # Derived — None where the denominator is zero
+    ctr: float | None
+    cpc: float | None
+    cpa: float | None
+    cpm: float | None
+    conversion_rate: float | None
+
+    def value(self, metric: str) -> float | None:
+        return getattr(self, metric)
+
+    def format(self, metric: str) -> str:
+        """Display form of one metric — "1,400,000", "$8.35", "1.01%"."""
+        return format_metric(metric, self.value(metric))
+
+
+@dataclass(frozen=True, slots=True)
+class GoalAttainment:
+    goal: str
+    metric: str | None
+    target: float | None
+    actual: float | None
+    # actual/target (target/actual for cost goals) — 1.0 means exactly met
+    attainment: float | None
+
+    @property
+    def met(self) -> bool | None:
+        return None if self.attainment is None else self.attainment >= 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class DerivedMetrics:
+    channels: list[ChannelKPIs]
+    total: ChannelKPIs
+    goals: list[GoalAttainment]
+    # Per channel: "Strong" / "Moderate" / "Weak", and the score behind it
+    ratings: list[str]
+    scores: list[float]
+
+
+def derive_metrics(input: PerformanceInput) -> DerivedMetrics:
+    """Derived KPIs per channel and blended, goal attainment, and channel ratings."""
+    channels = input.channel_metrics
+    # One row per channel plus the blended total as the last row
+    raw = np.array([[getattr(m, name) for name in RAW] for m in channels], dtype=np.float64)
+    raw = raw.reshape(-1, len(RAW))
+    total = raw.sum(axis=0)
+    # Blended engagement rate is impression-weighted, not summed
+    total[_E] = raw[:, _E] @ raw[:, _I] / total[_I] if total[_I] else np.nan
+    matrix = np.vstack([raw, total])
+
+    # Every derived KPI for every row in one divide
+    with np.errstate(divide="ignore", invalid="ignore"):
+        derived = matrix[:, _NUMERATORS] / matrix[:, _DENOMINATORS] * _MULTIPLIERS
+    # x/0 is inf and 0/0 NaN — both mean "no value"
+    derived[~np.isfinite(derived)] = np.nan
+    kpis = np.hstack([matrix, derived])
+    scores = _scores(kpis)
+
+    names = [m.channel for m in channels] + ["Total"]
+    rows = [
+        ChannelKPIs(
+            names[i],
+            *(int(value) for value in row[:_S]),
+            *(None if math.isnan(value) else value for value in row[_S:]),
+        )
+        for i, row in enumerate(np.round(kpis, 4).tolist())
+    ]
+    ratings = [
+        "Strong" if score >= STRONG_SCORE else "Weak" if score < WEAK_SCORE else "Moderate"
+        for score in scores
+    ]
+    return DerivedMetrics(
+        channels=rows[:-1],
+        total=rows[-1],
+        goals=[_attainment(goal, rows[-1]) for goal in input.goals],
+        ratings=ratings,
+        scores=np.round(scores, 3).tolist(),
+    )
+
+
+def format_metric(metric: str, value: float | None) -> str:
+    if value is None:
+        return "n/a"
+    if metric in ("spend", "cpc", "cpa", "cpm"):
+        return f"${value:,.2f}"
+    if metric in ("ctr", "conversion_rate", "engagement_rate"):
+        return f"{value:.2f}%"
+    return f"{value:,.0f}"
+
+
+def relative(channel: ChannelKPIs, total: ChannelKPIs, metric: str) -> float | None:
+    """How much better (>1) or worse (<1) a channel is than the blend on one KPI."""
+    value, blended = channel.value(metric), total.value(metric)
+    if not value or not blended:
+        return None
+    return blended / value if metric in LOWER_IS_BETTER else value / blended
+
+
+@functools.lru_cache(maxsize=256)
+def parse_goal(goal: str) -> tuple[str | None, float | None]:
+    """(metric, target) for a free-text goal — (None, None) if it can't be matched."""
+    text = goal.casefold()
+    metric = metric_named(text)
+    number = _GOAL_NUMBER.search(text)
+    if metric is None or number is None:
+        return None, None
+    target = float(number.group(1).replace(",", ""))
+    suffix = (number.group(2) or "").casefold()
+    target *= _SCALE.get(suffix, 1.0)
+    return metric, target
+
+
+def metric_named(text: str) -> str | None:
+    """The metric a goal or label mentions ("Total impressions" → impressions), or None."""
+    text = text.casefold()
+    return next((metric for pattern, metric in _GOAL_METRICS if pattern.search(text)), None)
+
+
+def _attainment(goal: str, total: ChannelKPIs) -> GoalAttainment:
+    metric, target = parse_goal(goal)
+    actual = total.value(metric) if metric else None
+    if metric is None or actual is None or not target:
+        return GoalAttainment(goal, metric, target, actual, None)
+    if metric in LOWER_IS_BETTER:
+        attainment = target / actual if actual else None
+    else:
+        attainment = actual / target
+    return GoalAttainment(goal, metric, target, actual, None if attainment is None else round(attainment, 3))
+
+
+def _scores(kpis: np.ndarray) -> np.ndarray:
+    """Geometric mean of each channel's RATING_KPIS relative to the blend (last row)."""
+    columns = kpis[:, _RATING_COLUMNS]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = columns[:-1] / columns[-1]
+        # Lower-is-better KPIs count as blend/channel
+        ratios[:, _RATING_LOWER] = 1 / ratios[:, _RATING_LOWER]
+        logs = np.log(ratios)
+    valid = np.isfinite(logs)
+    # Missing KPIs are skipped; a channel with none to rate on scores a neutral 1.0
+    return np.exp(np.where(valid, logs, 0.0).sum(axis=1) / np.maximum(valid.sum(axis=1), 1))
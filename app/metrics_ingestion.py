@@ -0,0 +1,411 @@
+"""Metrics ingestion — ad-platform exports streamed into per-channel totals.
+
+Exports are CSV or NDJSON with one row per post (or ad) per day, often
+millions of rows. The request body is never held whole: it is cut into
+blocks of `metrics_ingest_block_bytes` at row boundaries, each block is
+parsed by Arrow and reduced with one group-by to per-channel sums, and only
+those sums (a handful of numbers per channel) are kept between blocks. Memory
+is one block, whatever the export's size.
+
+Column names vary by platform, so headers are normalized ("Amount spent
+(USD)" → amount_spent_usd) and matched against COLUMN_ALIASES. Engagement
+comes from an engagements count (engagements / impressions) or, failing that,
+an engagement_rate column averaged by impressions. Reach is summed across rows,
+so for per-day exports it overstates unique reach. NDJSON keys are mapped as
+they appear, and a block whose values change type mid-key is re-read with
+every value as text, then cast like the rest.
+
+With a date column the group-by is per (channel, day) instead, and those
+daily sums are kept too (channels × days, still tiny) for the time series
+in app/metrics_timeseries.py.
+"""
+
+import asyncio
+import csv
+import datetime
+import io
+import logging
+import re
+import time
+from collections.abc import AsyncIterator
+from typing import Literal
+
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.json as pa_json
+
+from app.metrics_timeseries import MetricsTimeSeries
+from app.schemas import ChannelMetrics, PerformanceInput
+from app.uploads import UploadTooLarge
+
+logger = logging.getLogger("agencyflow.metrics_ingestion")
+
+IngestFormat = Literal["csv", "ndjson"]
+
+# Canonical column → accepted (normalized) header names
+COLUMN_ALIASES: dict[str, tuple[str, ...]] = {
+    "channel": ("channel", "platform", "network", "publisher_platform", "source"),
+    "impressions": ("impressions", "impr", "impressions_total"),
+    "reach": ("reach", "unique_reach", "accounts_reached"),
+    "clicks": ("clicks", "link_clicks", "clicks_all", "outbound_clicks"),
+    "conversions": ("conversions", "purchases", "results", "orders", "total_conversions"),
+    "spend": ("spend", "cost", "amount_spent", "amount_spent_usd", "spend_usd", "cost_usd"),
+    "engagements": ("engagements", "engagement", "interactions", "post_engagement", "total_engagements"),
+    "engagement_rate": ("engagement_rate", "engagement_rate_pct", "er"),
+    "date": ("date", "day", "reporting_date", "date_start", "reporting_starts"),
+}
+REQUIRED = ("channel", "impressions", "clicks", "spend")
+# Summed per channel, in accumulator order; the last two give the weighted engagement rate
+SUMS = ("impressions", "reach", "clicks", "conversions", "spend", "engagements", "rate_x_impressions", "rated_impressions")
+
+_HEADER = re.compile(r"[^a-z0-9]+")
+CONTENT_TYPES: dict[str, IngestFormat] = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+
+def normalize_header(name: str) -> str:
+    return _HEADER.sub("_", name.casefold()).strip("_")
+
+
+class MetricsAggregator:
+    """Per-channel running sums over blocks of export rows.
+
+    `reduce_block` is synchronous and CPU-bound (run it in a thread); blocks
+    must end on a row boundary. The first CSV block carries the header; NDJSON
+    columns are mapped as their keys turn up, and `finish` checks that the
+    required ones did.
+    """
+
+    def __init__(self, format: IngestFormat):
+        self.format = format
+        self._columns: list[str] | None = None  # CSV header, or NDJSON keys seen so far, as sent
+        self._mapping: dict[str, str] | None = None  # Canonical → source column
+        self._totals: dict[str, np.ndarray] = {}
+        # (channel, day) → sums, only for exports with a date column
+        self._daily: dict[tuple[str, datetime.date], np.ndarray] = {}
+
+        self.rows = 0
+        self.rows_skipped = 0
+        self.bytes = 0
+        self.blocks = 0
+        self.elapsed_s = 0.0
+
+    def reduce_block(self, block: bytes) -> None:
+        start = time.perf_counter()
+        self.bytes += len(block)
+        table = self._parse(block)
+        if table is not None and table.num_rows:
+            try:
+                self._reduce(table)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError) as exc:
+                # A value that isn't a number ("n/a", a nested object) in a numeric column
+                raise ValueError(f"Could not parse {self.format.upper()} rows: {exc}") from exc
+        self.blocks += 1
+        self.elapsed_s += time.perf_counter() - start
+
+    def finish(self) -> None:
+        """Check the export as a whole, after its last block.
+
+        Raises:
+            ValueError: An NDJSON export none of whose rows had a required key.
+        """
+        if self.format == "ndjson" and self._columns is not None:
+            _check_required(self._mapping or {}, self._columns)
+
+    def to_performance_input(
+        self, campaign_name: str, reporting_period: str | None = None, goals: list[str] | None = None
+    ) -> PerformanceInput:
+        """The totals as a validated PerformanceInput, channels by spend (largest first).
+
+        Raises:
+            ValueError: No rows, or more channels than PerformanceInput allows.
+            pydantic.ValidationError: A total outside ChannelMetrics' bounds.
+        """
+        if not self._totals:
+            raise ValueError("No metric rows found in the upload")
+        limit = PerformanceInput.model_fields["channel_metrics"].metadata[0].max_length
+        if len(self._totals) > limit:
+            raise ValueError(f"Export has {len(self._totals)} channels; at most {limit} are supported")
+
+        channels = []
+        for channel, sums in sorted(self._totals.items(), key=lambda item: -item[1][4]):
+            impressions, reach, clicks, conversions, spend, engagements, rate_x_impr, rated_impr = sums.tolist()
+            if engagements:
+                engagement_rate = engagements / impressions * 100 if impressions else 0.0
+            else:
+                engagement_rate = rate_x_impr / rated_impr if rated_impr else 0.0
+            channels.append(ChannelMetrics(
+                channel=channel,
+                impressions=round(impressions),
+                reach=round(reach),
+                engagement_rate=round(min(engagement_rate, 100.0), 2),
+                clicks=round(clicks),
+                conversions=round(conversions),
+                spend=round(spend, 2),
+            ))
+
+        series = self.timeseries()
+        if reporting_period is None:
+            # From the parsed dates — rows whose date didn't parse don't stretch the range
+            reporting_period = f"{series.start} – {series.end}" if series else "Uploaded export"
+        return PerformanceInput(
+            campaign_name=campaign_name,
+            reporting_period=reporting_period,
+            channel_metrics=channels,
+            goals=goals or [],
+            trends=series.summarize() if series else None,
+        )
+
+    def timeseries(self) -> MetricsTimeSeries | None:
+        """Daily per-channel sums — None if the export had no (parseable) dates."""
+        return MetricsTimeSeries.from_daily(self._daily) if self._daily else None
+
+    def stats(self) -> dict:
+        return {
+            "format": self.format,
+            "rows": self.rows,
+            "rows_skipped": self.rows_skipped,
+            "bytes": self.bytes,
+            "blocks": self.blocks,
+            "channels": len(self._totals),
+            "columns": self._mapping or {},
+            "elapsed_s": round(self.elapsed_s, 3),
+            "rows_per_s": round(self.rows / self.elapsed_s) if self.elapsed_s else 0,
+        }
+
+    def _parse(self, block: bytes) -> pa.Table | None:
+        try:
+            if self.format == "ndjson":
+                try:
+                    table = pa_json.read_json(io.BytesIO(block))
+                except pa.ArrowInvalid:
+                    # WHY: Arrow types a key from its first values and fails on drift
+                    # ("spend": 12 then "spend": "12.50"); _reduce casts the strings
+                    table = _ndjson_as_strings(block)
+                self._map_keys(table.column_names)
+                return table
+
+            if self._columns is None:
+                header, _, block = block.partition(b"\n")
+                self._columns = next(csv.reader([header.decode("utf-8-sig")]))
+                self._mapping = _map_columns(self._columns)
+                if not block.strip():
+                    return None
+            return pa_csv.read_csv(
+                io.BytesIO(block),
+                read_options=pa_csv.ReadOptions(column_names=self._columns),
+                # Line breaks inside quoted fields — Arrow's slower path, so only when there are quotes
+                parse_options=pa_csv.ParseOptions(newlines_in_values=b'"' in block),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=list(self._mapping.values()),  # type: ignore[union-attr]
+                    column_types={
+                        source: pa.string() if canonical in ("channel", "date") else pa.float64()
+                        for canonical, source in self._mapping.items()  # type: ignore[union-attr]
+                    },
+                    strings_can_be_null=True,
+                ),
+            )
+        except (pa.ArrowInvalid, UnicodeDecodeError, csv.Error, orjson.JSONDecodeError) as exc:
+            raise ValueError(f"Could not parse {self.format.upper()} rows: {exc}") from exc
+
+    def _map_keys(self, keys: list[str]) -> None:
+        """Map NDJSON keys not seen in earlier blocks — a canonical column, once mapped, stays."""
+        seen = self._columns or []
+        new = [key for key in keys if key not in seen]
+        if self._mapping is None or new:
+            self._columns = seen + new
+            self._mapping = _match_columns(self._columns) | (self._mapping or {})
+
+    def _reduce(self, table: pa.Table) -> None:
+        mapping = self._mapping
+        assert mapping is not None
+        # NDJSON rows may omit keys — a column absent from a whole block is all nulls
+        for name in mapping.values():
+            if name not in table.column_names:
+                table = table.append_column(name, pa.nulls(table.num_rows))
+        if "channel" not in mapping:
+            # No NDJSON row so far has had a channel key: nothing to attribute
+            self.rows += table.num_rows
+            self.rows_skipped += table.num_rows
+            return
+
+        channel = pc.utf8_trim_whitespace(table.column(mapping["channel"]).cast(pa.string()))
+        keep = pc.fill_null(pc.greater(pc.utf8_length(channel), 0), False)
+        # Rows without a channel can't be attributed — counted, not summed
+        self.rows += table.num_rows
+        self.rows_skipped += table.num_rows - pc.sum(keep).as_py()
+        zeros = pa.chunked_array([np.zeros(table.num_rows)])
+
+        def number(name: str) -> pa.ChunkedArray:
+            source = mapping.get(name)
+            if source is None:
+                return zeros
+            return pc.fill_null(table.column(source).cast(pa.float64()), 0.0)
+
+        impressions = number("impressions")
+        columns = {
+            "channel": channel,
+            "impressions": impressions,
+            "reach": number("reach"),
+            "clicks": number("clicks"),
+            "conversions": number("conversions"),
+            "spend": number("spend"),
+            "engagements": number("engagements"),
+        }
+        if "engagement_rate" in mapping:
+            rate = table.column(mapping["engagement_rate"]).cast(pa.float64())
+            columns["rate_x_impressions"] = pc.fill_null(pc.multiply(rate, impressions), 0.0)
+            columns["rated_impressions"] = pc.if_else(pc.is_null(rate), 0.0, impressions)
+        else:
+            columns["rate_x_impressions"] = columns["rated_impressions"] = zeros
+
+        keys = ["channel"]
+        if "date" in mapping:
+            # "2026-05-01", "2026-05-01T00:00:00" and timestamps all key by their first 10 chars
+            date = pc.utf8_slice_codeunits(table.column(mapping["date"]).cast(pa.string()), 0, 10)
+            columns["date"] = date
+            keys.append("date")
+
+        reduced = pa.table(columns).filter(keep).group_by(keys).aggregate(
+            [(name, "sum") for name in SUMS]
+        )
+        names = reduced.column("channel").to_pylist()
+        sums = np.column_stack([reduced.column(f"{name}_sum").to_numpy() for name in SUMS])
+        for name, row in zip(names, sums):
+            name = name[:50]
+            total = self._totals.get(name)
+            self._totals[name] = row if total is None else total + row
+
+        if "date" in mapping:
+            for name, day, row in zip(names, reduced.column("date").to_pylist(), sums):
+                day = _parse_date(day)
+                if day is None:
+                    continue
+                key = (name[:50], day)
+                total = self._daily.get(key)
+                self._daily[key] = row if total is None else total + row
+
+
+async def ingest_stream(
+    chunks: AsyncIterator[bytes],
+    format: IngestFormat,
+    *,
+    block_bytes: int,
+    max_bytes: int,
+) -> MetricsAggregator:
+    """Aggregate a streamed export, one line-aligned block at a time.
+
+    Raises:
+        UploadTooLarge: The stream passed `max_bytes` (checked per chunk).
+        ValueError: Missing required columns, or rows that don't parse.
+    """
+    aggregator = MetricsAggregator(format)
+    pending = bytearray()
+    received = 0
+    start = time.perf_counter()
+
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadTooLarge(f"Metrics export exceeds {max_bytes:,} bytes")
+        pending += chunk
+        if len(pending) >= block_bytes:
+            cut = _last_row_end(pending, quoted=format == "csv")
+            if cut:
+                block = bytes(pending[:cut])
+                del pending[:cut]
+                await asyncio.to_thread(aggregator.reduce_block, block)
+
+    if pending.strip():
+        await asyncio.to_thread(aggregator.reduce_block, bytes(pending))
+    aggregator.finish()
+
+    logger.info(
+        f"Ingested {aggregator.rows:,} {format} rows ({received:,} bytes) in "
+        f"{time.perf_counter() - start:.2f}s — {aggregator.stats()['rows_per_s']:,} rows/s"
+    )
+    return aggregator
+
+
+def _last_row_end(data: bytearray, quoted: bool) -> int:
+    """Index just past the last line break that ends a row — 0 if none does yet.
+
+    WHY quote-aware: a quoted CSV field may span lines ("Summer\nsale"), and
+    cutting a block there leaves half a row on each side. Blocks start on a
+    row boundary, so a line break ends a row only after an even number of
+    quotes (an escaped "" counts twice). NDJSON can't break inside a value.
+    """
+    end = data.rfind(b"\n")
+    if not quoted:
+        return end + 1
+    quotes = data.count(b'"', 0, max(end, 0))
+    while end >= 0 and quotes % 2:
+        previous = data.rfind(b"\n", 0, end)
+        quotes -= data.count(b'"', previous + 1, end)
+        end = previous
+    return end + 1
+
+
+def _parse_date(value: str | None) -> datetime.date | None:
+    try:
+        return datetime.date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def _ndjson_as_strings(block: bytes) -> pa.Table:
+    """An NDJSON block with every scalar value as a string — the fallback for mixed-type keys."""
+    rows = [orjson.loads(line) for line in block.splitlines() if line.strip()]
+    keys = list(dict.fromkeys(key for row in rows if isinstance(row, dict) for key in row))
+    return pa.table({
+        key: pa.array([_as_string(row.get(key)) if isinstance(row, dict) else None for row in rows], pa.string())
+        for key in keys
+    })
+
+
+def _as_string(value) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return orjson.dumps(value).decode()
+    return str(value)
+
+
+def _map_columns(columns: list[str]) -> dict[str, str]:
+    """Canonical → source column, first alias present wins.
+
+    Raises:
+        ValueError: A required column has no match.
+    """
+    mapping = _match_columns(columns)
+    _check_required(mapping, columns)
+    return mapping
+
+
+def _match_columns(columns: list[str]) -> dict[str, str]:
+    by_normalized: dict[str, str] = {}
+    for column in columns:
+        by_normalized.setdefault(normalize_header(column), column)
+    mapping = {}
+    for canonical, aliases in COLUMN_ALIASES.items():
+        match = next((by_normalized[alias] for alias in aliases if alias in by_normalized), None)
+        if match is not None:
+            mapping[canonical] = match
+    return mapping
+
+
+def _check_required(mapping: dict[str, str], columns: list[str]) -> None:
+    missing = [name for name in REQUIRED if name not in mapping]
+    if missing:
+        raise ValueError(
+            f"Missing required column(s): {', '.join(missing)} (found: {', '.join(columns)})"
+        )
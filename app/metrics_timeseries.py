@@ -0,0 +1,270 @@
+"""Metrics time series — daily per-channel arrays, rollups, anomalies and trend deltas.
+
+A ChannelMetrics row is one total per channel, which can't say what changed
+during the period. When an export has a date column, ingestion also keeps
+per-day sums (app/metrics_ingestion.py), stored here as one dense float
+array of shape (channels, days, metrics) — a year of 20 channels is a few
+hundred KB, and every analysis below is a whole-array NumPy operation:
+
+- rollups: daily (the array itself), weekly (7-day buckets from the first
+  day) and period totals;
+- anomalies: a day more than ANOMALY_Z standard deviations from the trailing
+  ANOMALY_WINDOW-day mean (rolling z-score);
+- changepoints: per series, the split that best separates two mean levels
+  (a two-sample t statistic scanned over every split with cumulative sums);
+- trend deltas: the last full week against the week before.
+
+`summarize` keeps only the strongest few of each, so the Performance
+Reporter's prompt stays the same size however long the period is.
+"""
+
+import datetime
+
+import numpy as np
+
+from app.schemas import MetricAnomaly, MetricChangepoint, MetricsTrends, TrendDelta
+
+# Per-day sums, in array order (matches the ingestion accumulator's first columns)
+SERIES_METRICS = ("impressions", "reach", "clicks", "conversions", "spend", "engagements")
+# Series analysed for anomalies, changepoints and deltas: sums plus derived ratios
+ANALYSED = ("impressions", "clicks", "conversions", "spend", "ctr", "cpa")
+
+ANOMALY_WINDOW = 14
+ANOMALY_Z = 4.0
+# Floor on the trailing std, relative to its mean — near-flat series don't flag noise
+MIN_RELATIVE_STD = 0.05
+# Shortest segment on either side of a changepoint, its t statistic and relative shift
+CHANGEPOINT_MIN_DAYS = 5
+CHANGEPOINT_T = 8.0
+CHANGEPOINT_MIN_SHIFT = 0.2
+# Caps on what reaches the prompt
+MAX_ANOMALIES = 10
+MAX_CHANGEPOINTS = 8
+MAX_DELTAS = 12
+
+
+class MetricsTimeSeries:
+    """Daily per-channel metric sums over a contiguous date range."""
+
+    def __init__(self, channels: list[str], start: datetime.date, values: np.ndarray):
+        self.channels = channels
+        self.start = start
+        # (channels, days, len(SERIES_METRICS)); days with no rows are zeros
+        self.values = values
+
+    @classmethod
+    def from_daily(cls, daily: dict[tuple[str, datetime.date], np.ndarray]) -> "MetricsTimeSeries":
+        """Build from (channel, date) → sums of SERIES_METRICS."""
+        channels = sorted({channel for channel, _ in daily})
+        dates = [date for _, date in daily]
+        start, end = min(dates), max(dates)
+        values = np.zeros((len(channels), (end - start).days + 1, len(SERIES_METRICS)))
+        index = {channel: i for i, channel in enumerate(channels)}
+        for (channel, date), sums in daily.items():
+            values[index[channel], (date - start).days] += sums[:len(SERIES_METRICS)]
+        return cls(channels, start, values)
+
+    @property
+    def days(self) -> int:
+        return self.values.shape[1]
+
+    @property
+    def end(self) -> datetime.date:
+        return self.start + datetime.timedelta(days=self.days - 1)
+
+    def weekly(self) -> np.ndarray:
+        """(channels, weeks, metrics) sums of 7-day buckets from the start date; the last may be partial."""
+        weeks = -(-self.days // 7)
+        padded = np.zeros((len(self.channels), weeks * 7, len(SERIES_METRICS)))
+        padded[:, :self.days] = self.values
+        return padded.reshape(len(self.channels), weeks, 7, len(SERIES_METRICS)).sum(axis=2)
+
+    def period(self) -> np.ndarray:
+        """(channels, metrics) totals for the whole range."""
+        return self.values.sum(axis=1)
+
+    def weekly_rollup(self) -> list[dict]:
+        """Weekly sums as rows — {week_start, channel, <metric>: value}."""
+        weekly = self.weekly()
+        return [
+            {
+                "week_start": (self.start + datetime.timedelta(weeks=w)).isoformat(),
+                "channel": channel,
+                **{name: round(float(value), 2) for name, value in zip(SERIES_METRICS, weekly[c, w])},
+            }
+            for w in range(weekly.shape[1])
+            for c, channel in enumerate(self.channels)
+        ]
+
+    def summarize(self) -> MetricsTrends:
+        """The strongest anomalies, changepoints and week-over-week deltas, capped for the prompt."""
+        series = _analysed(self.values)
+        return MetricsTrends(
+            start=self.start,
+            end=self.end,
+            days=self.days,
+            comparison=self._comparison_label(),
+            deltas=self._deltas(),
+            anomalies=self._anomalies(series),
+            changepoints=self._changepoints(series),
+        )
+
+    # -------------------------------------------------------------------------
+
+    def _comparison_label(self) -> str:
+        return "last full week vs the week before" if self.days >= 14 else "second half vs first half"
+
+    def _periods(self) -> tuple[np.ndarray, np.ndarray]:
+        """(previous, current) sums per channel for the delta comparison."""
+        if self.days >= 14:
+            full_weeks = self.days // 7
+            weekly = self.weekly()[:, :full_weeks]
+            return weekly[:, -2], weekly[:, -1]
+        half = self.days // 2
+        return self.values[:, :half].sum(axis=1), self.values[:, half:half * 2].sum(axis=1)
+
+    def _deltas(self) -> list[TrendDelta]:
+        previous, current = self._periods()
+        # Channel rows plus the blended total as the last row
+        previous = np.vstack([previous, previous.sum(axis=0)])
+        current = np.vstack([current, current.sum(axis=0)])
+        before, after = _analysed(previous), _analysed(current)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (after - before) / np.abs(before)
+        names = [*self.channels, "Total"]
+
+        rows, metrics = np.nonzero(np.isfinite(change))
+        # Blended totals (the last row) first, then the largest moves
+        order = np.lexsort((-np.abs(change[rows, metrics]), rows != len(self.channels)))[:MAX_DELTAS]
+        return [
+            TrendDelta(
+                channel=names[c], metric=ANALYSED[k],
+                previous=round(float(before[c, k]), 4), current=round(float(after[c, k]), 4),
+                change_pct=round(float(change[c, k]) * 100, 1),
+            )
+            for c, k in zip(rows[order], metrics[order])
+        ]
+
+    def _anomalies(self, series: np.ndarray) -> list[MetricAnomaly]:
+        z, mean = rolling_zscore(series, ANOMALY_WINDOW)
+        flagged = np.argwhere(np.abs(z) >= ANOMALY_Z)
+        # Strongest first, capped before any objects are built
+        flagged = flagged[np.argsort(-np.abs(z[tuple(flagged.T)]), kind="stable")][:MAX_ANOMALIES]
+        return [
+            MetricAnomaly(
+                channel=self.channels[c],
+                metric=ANALYSED[k],
+                date=self.start + datetime.timedelta(days=int(d)),
+                value=round(float(series[c, d, k]), 4),
+                expected=round(float(mean[c, d, k]), 4),
+                z_score=round(float(z[c, d, k]), 2),
+                kind="spike" if z[c, d, k] > 0 else "drop",
+            )
+            for c, d, k in flagged
+        ]
+
+    def _changepoints(self, series: np.ndarray) -> list[MetricChangepoint]:
+        split, t, before, after = changepoints(series, CHANGEPOINT_MIN_DAYS)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # From a zero baseline (a channel launching mid-period) the shift is infinite — ranked first
+            shift = np.abs(after - before) / np.abs(before)
+        found = np.argwhere((t >= CHANGEPOINT_T) & (shift >= CHANGEPOINT_MIN_SHIFT))
+        found = found[np.argsort(-shift[tuple(found.T)], kind="stable")][:MAX_CHANGEPOINTS]
+        return [
+            MetricChangepoint(
+                channel=self.channels[c],
+                metric=ANALYSED[k],
+                date=self.start + datetime.timedelta(days=int(split[c, k])),
+                before=round(float(before[c, k]), 4),
+                after=round(float(after[c, k]), 4),
+                # No percentage from a zero baseline
+                change_pct=(
+                    round(float((after[c, k] - before[c, k]) / abs(before[c, k])) * 100, 1)
+                    if before[c, k] else None
+                ),
+            )
+            for c, k in found
+        ]
+
+
+def rolling_zscore(series: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """z-score of each day against the trailing `window` days (excluding itself), along axis 1.
+
+    NaN days (a ratio with no denominator) are left out of the trailing
+    statistics rather than counted as zero. Returns (z, trailing mean); the
+    first `window` days, NaN days and windows with fewer than half their days
+    defined score 0.
+    """
+    defined = ~np.isnan(series)
+    values = np.where(defined, series, 0.0)
+    pad = [(0, 0)] * values.ndim
+    pad[1] = (1, 0)
+    csum = np.pad(np.cumsum(values, axis=1), pad)
+    csq = np.pad(np.cumsum(values ** 2, axis=1), pad)
+    ccount = np.pad(np.cumsum(defined, axis=1), pad)
+    days = values.shape[1]
+    mean = np.zeros_like(values)
+    z = np.zeros_like(values)
+    if days <= window:
+        return z, mean
+    # Trailing window for day d is [d - window, d)
+    total = csum[:, window:days] - csum[:, :days - window]
+    squares = csq[:, window:days] - csq[:, :days - window]
+    count = ccount[:, window:days] - ccount[:, :days - window]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        trailing = np.where(count > 0, total / count, 0.0)
+        # Sample variance (ddof=1) — a short window underestimates the spread otherwise
+        variance = np.maximum(squares - count * trailing ** 2, 0.0) / (count - 1)
+        std = np.maximum(np.sqrt(variance), MIN_RELATIVE_STD * np.abs(trailing))
+        scores = (values[:, window:] - trailing) / std
+    mean[:, window:] = trailing
+    scored = np.isfinite(scores) & defined[:, window:] & (count >= max(window // 2, 2))
+    z[:, window:] = np.where(scored, scores, 0.0)
+    return z, mean
+
+
+def changepoints(series: np.ndarray, min_days: int) -> tuple[np.ndarray, ...]:
+    """Best single mean-shift split per series along axis 1.
+
+    NaN days are left out of both means; each side needs `min_days` defined
+    days. Returns (split day, t statistic, mean before, mean after), each
+    shaped like `series` without axis 1. Series too short to split get t = 0.
+    """
+    defined = ~np.isnan(series)
+    values = np.where(defined, series, 0.0)
+    days = values.shape[1]
+    shape = values.shape[:1] + values.shape[2:]
+    if days < 2 * min_days:
+        zeros = np.zeros(shape)
+        return zeros.astype(int), zeros, zeros, zeros
+
+    csum = np.cumsum(values, axis=1)
+    csq = np.cumsum(values ** 2, axis=1)
+    ccount = np.cumsum(defined, axis=1)
+    total, total_sq, total_count = csum[:, -1:], csq[:, -1:], ccount[:, -1:]
+    # Candidate split k: days [0, k) before, [k, days) after
+    k = np.arange(min_days, days - min_days + 1)
+    left_sum, left_sq, n_left = csum[:, k - 1], csq[:, k - 1], ccount[:, k - 1]
+    right_sum, right_sq, n_right = total - left_sum, total_sq - left_sq, total_count - n_left
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_left, mean_right = left_sum / n_left, right_sum / n_right
+        pooled = (left_sq - n_left * mean_left ** 2 + right_sq - n_right * mean_right ** 2) / (total_count - 2)
+        t = np.abs(mean_left - mean_right) / np.sqrt(np.maximum(pooled, 0.0) * (1 / n_left + 1 / n_right))
+    # A perfectly flat segment on each side gives 0/0 or x/0 — treat an exact step as huge, no change as none
+    t = np.where(np.isnan(t), 0.0, t)
+    t = np.where(np.isinf(t), 1e9, t)
+    # Too few defined days on a side to call it a level
+    t = np.where((n_left >= min_days) & (n_right >= min_days), t, 0.0)
+
+    best = np.argmax(t, axis=1)
+    take = lambda a: np.take_along_axis(a, np.expand_dims(best, 1), axis=1).squeeze(1)  # noqa: E731
+    return best + min_days, take(t), np.nan_to_num(take(mean_left)), np.nan_to_num(take(mean_right))
+
+
+def _analysed(sums: np.ndarray) -> np.ndarray:
+    """ANALYSED metrics from SERIES_METRICS sums along the last axis (NaN where undefined)."""
+    impressions, _, clicks, conversions, spend, _ = np.moveaxis(sums, -1, 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ctr = np.where(impressions > 0, clicks / impressions * 100, np.nan)
+        cpa = np.where(conversions > 0, spend / conversions, np.nan)
+    return np.stack([impressions, clicks, conversions, spend, ctr, cpa], axis=-1)
@@ -34,7 +34,11 @@ class OllamaClient:
         )
 
     async def generate(self, prompt: str, response_schema: type[BaseModel]) -> dict:
-        """Generate structured output from Ollama.
+        """Generate structured output from Ollama as a parsed JSON dict."""
+        return json.loads(await self.generate_raw(prompt, response_schema))
+
+    async def generate_raw(self, prompt: str, response_schema: type[BaseModel]) -> str:
+        """Generate structured output from Ollama, returned as unparsed JSON text.
 
         Uses Ollama's `format` parameter with a JSON schema to get structured output,
         similar to how GeminiClient uses response_schema.
@@ -64,8 +68,7 @@ class OllamaClient:
         response.raise_for_status()
 
         data = response.json()
-        content = data["message"]["content"]
-        return json.loads(content)
+        return data["message"]["content"]
 
     async def close(self):
         await self._http.aclose()
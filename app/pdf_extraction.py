@@ -0,0 +1,302 @@
+"""Process-pool PDF extraction — pages split across worker processes, hard timeout.
+
+WHY processes, not threads: pdfplumber is CPU-bound pure Python, so a
+thread pool is serialized by the GIL — one 20-page brief occupied both
+threads of the old ThreadPoolExecutor and concurrent uploads queued behind
+it. Worker processes run on separate cores, and a stuck one can be killed,
+which a thread can't.
+
+A document is extracted in two steps: one worker counts its pages, then the
+pages (up to MAX_PDF_PAGES) are split into contiguous ranges, one task per
+worker, and the texts are joined in page order with form feeds between pages. The whole document gets
+`pdf_timeout_s` of wall-clock time; past that its queued tasks are cancelled
+and new work goes to a fresh pool, while tasks of other documents already
+running finish on the old one. Workers enforce a deadline of their own, so
+the stuck task ends and the old pool winds down.
+
+Each page is tiered: pdfium reads the text layer first (native code, no
+layout analysis), and only pages whose fast text fails the quality check —
+too sparse, or too many replacement/control/private-use characters — are
+re-extracted with pdfplumber. Plain text-layer briefs never touch pdfplumber.
+"""
+
+import asyncio
+import io
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.config import settings
+
+logger = logging.getLogger("agencyflow.pdf_extraction")
+
+MAX_PDF_PAGES = 20
+# Part of the extracted-text cache key — bump whenever extraction output changes
+EXTRACTOR_VERSION = "tiered-2"
+
+# Fast-pass quality check: below this many non-whitespace characters a page
+# may be scanned or have an odd text layer, so pdfplumber gets a second look
+MIN_PAGE_CHARS = 16
+# Fraction of non-whitespace characters that may be garbled (U+FFFD, control,
+# private-use or unassigned — typical of fonts without a usable ToUnicode map)
+MAX_GARBLED_RATIO = 0.02
+# Worker-side deadline, as a multiple of pdf_timeout_s — a backstop that ends a
+# task its document already gave up on
+WORKER_DEADLINE_FACTOR = 2
+
+
+# =============================================================================
+# Worker functions (run in the child processes)
+# =============================================================================
+
+# A PDF as the workers receive it: its bytes, or the path of a file holding them
+PdfSource = bytes | str
+
+
+def _run_with_deadline(seconds: float, fn, *args):
+    """Run `fn(*args)`, raising TimeoutError in this worker once `seconds` pass.
+
+    WHY in the worker: a running ProcessPoolExecutor task can't be cancelled
+    from outside, and killing the worker takes every other task on the pool
+    down with it. Tasks run on the worker's main thread, so SIGALRM reaches
+    them (between bytecodes — native pdfium calls finish first).
+    """
+    if not hasattr(signal, "setitimer"):
+        return fn(*args)
+
+    def expire(signum, frame):
+        raise TimeoutError(f"PDF worker task exceeded {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return fn(*args)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _page_count(source: PdfSource) -> int:
+    pdf = _open_fast(source)
+    if pdf is not None:
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+    import pdfplumber
+
+    with pdfplumber.open(_plumber_input(source)) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_pages(source: PdfSource, start: int, stop: int, fast: bool = True) -> tuple[list[str], int]:
+    """Text of pages [start, stop), one string per page, and how many needed pdfplumber."""
+    texts: list[str | None] = [None] * (stop - start)
+    pdf = _open_fast(source) if fast else None
+    if pdf is not None:
+        try:
+            for offset in range(stop - start):
+                text = _fast_page_text(pdf, start + offset)
+                if fast_text_usable(text):
+                    texts[offset] = text
+        finally:
+            pdf.close()
+
+    fallback = [offset for offset, text in enumerate(texts) if text is None]
+    if fallback:
+        import pdfplumber
+
+        with pdfplumber.open(_plumber_input(source)) as plumber:
+            for offset in fallback:
+                texts[offset] = plumber.pages[start + offset].extract_text() or ""
+    return texts, len(fallback)  # type: ignore[return-value]
+
+
+def _open_fast(source: PdfSource):
+    """A pdfium document, or None if pdfium can't parse it (pdfplumber may still)."""
+    import pypdfium2
+
+    try:
+        return pypdfium2.PdfDocument(source)
+    except pypdfium2.PdfiumError:
+        return None
+
+
+def _plumber_input(source: PdfSource):
+    return io.BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _fast_page_text(pdf, index: int) -> str:
+    page = pdf[index]
+    try:
+        textpage = page.get_textpage()
+        try:
+            text = textpage.get_text_range()
+        finally:
+            textpage.close()
+    finally:
+        page.close()
+    # pdfium uses CRLF line ends; pdfplumber (and everything downstream) uses LF
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def garbled_ratio(text: str) -> float:
+    """Fraction of non-whitespace characters that are replacement, control, private-use or unassigned."""
+    chars = [char for char in text if not char.isspace()]
+    if not chars:
+        return 0.0
+    garbled = sum(
+        1 for char in chars
+        if char == "\ufffd" or unicodedata.category(char) in ("Cc", "Co", "Cn")
+    )
+    return garbled / len(chars)
+
+
+def fast_text_usable(text: str) -> bool:
+    """Whether a page's fast-pass text is good enough to skip pdfplumber."""
+    dense = sum(1 for char in text if not char.isspace()) >= MIN_PAGE_CHARS
+    return dense and garbled_ratio(text) <= MAX_GARBLED_RATIO
+
+
+def page_ranges(page_count: int, workers: int) -> list[tuple[int, int]]:
+    """Split pages into at most `workers` contiguous, near-equal ranges."""
+    if page_count <= 0:
+        return []
+    size = math.ceil(page_count / max(workers, 1))
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+# =============================================================================
+# Pool
+# =============================================================================
+
+class PdfExtractionPool:
+    """Shared process pool for PDF text extraction, created on first use."""
+
+    def __init__(
+        self, max_workers: int | None = None, timeout_s: float | None = None, fast_pass: bool | None = None
+    ):
+        self.max_workers = max_workers or settings.pdf_workers or os.cpu_count() or 1
+        self.timeout_s = settings.pdf_timeout_s if timeout_s is None else timeout_s
+        self.fast_pass = settings.pdf_fast_pass if fast_pass is None else fast_pass
+        self._pool: ProcessPoolExecutor | None = None
+        # Bumped on every restart, so queued tasks cancelled by someone else's timeout can retry
+        self._generation = 0
+
+        self.pending_tasks = 0  # Submitted to the pool and not finished yet (running + queued)
+        self.active_documents = 0
+        self.documents = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.resubmitted = 0  # Tasks of other documents cancelled by a restart and sent to the new pool
+        self.total_extract_s = 0.0
+        self.pages = 0
+        self.fallback_pages = 0  # Pages the fast pass rejected, re-extracted with pdfplumber
+
+    async def extract(self, source: PdfSource) -> str:
+        """Extract text from the first MAX_PDF_PAGES pages of a PDF.
+
+        `source` is the PDF's bytes or a path — a spooled upload goes by path,
+        so the workers open it themselves and its bytes are never pickled.
+
+        Raises:
+            ValueError: If extraction exceeds the timeout or the PDF can't be read.
+        """
+        start = time.monotonic()
+        self.active_documents += 1
+        try:
+            texts = await asyncio.wait_for(self._extract_pages(source), self.timeout_s)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(f"PDF extraction exceeded {self.timeout_s}s — replacing the pool")
+            self._restart()
+            raise ValueError("PDF extraction timed out — file may be malformed")
+        except BrokenProcessPool:
+            raise ValueError("PDF extraction failed — worker process crashed")
+        finally:
+            self.active_documents -= 1
+        self.documents += 1
+        self.total_extract_s += time.monotonic() - start
+        # Form feeds keep page boundaries for header/footer detection (app/text_normalization.py)
+        return "\f".join(texts).strip()
+
+    async def _extract_pages(self, source: PdfSource) -> list[str]:
+        page_count = min(await self._submit(_page_count, source), MAX_PDF_PAGES)
+        chunks = await asyncio.gather(*(
+            self._submit(_extract_pages, source, start, stop, self.fast_pass)
+            for start, stop in page_ranges(page_count, self.max_workers)
+        ))
+        self.pages += page_count
+        self.fallback_pages += sum(fallback for _, fallback in chunks)
+        return [text for texts, _ in chunks for text in texts]
+
+    async def _submit(self, fn, *args):
+        """Run `fn(*args)` in the pool, resubmitting once if a restart cancelled it while queued."""
+        deadline = self.timeout_s * WORKER_DEADLINE_FACTOR
+        for attempt in range(2):
+            generation = self._generation
+            self.pending_tasks += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._get_pool(), _run_with_deadline, deadline, fn, *args
+                )
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if attempt or generation == self._generation or (task is not None and task.cancelling()):
+                    raise  # This document's own cancellation, not collateral from another's timeout
+                self.resubmitted += 1
+            finally:
+                self.pending_tasks -= 1
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # WHY spawn: forking a process that's running an event loop and
+            # threads can deadlock children on inherited locks
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    def _restart(self) -> None:
+        """Retire the pool — the next submit creates a fresh one.
+
+        Queued tasks are cancelled (other documents' resubmit, see _submit);
+        running ones finish on the retired pool, whose workers exit once
+        they're done. The stuck task is ended by its worker deadline.
+        """
+        pool, self._pool = self._pool, None
+        self._generation += 1
+        self.restarts += 1
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> dict:
+        """Queue depth and timing counters for the metrics endpoint."""
+        return {
+            "workers": self.max_workers,
+            "pending_tasks": self.pending_tasks,
+            # Tasks waiting for a free worker
+            "queue_depth": max(self.pending_tasks - self.max_workers, 0),
+            "active_documents": self.active_documents,
+            "documents": self.documents,
+            "timeouts": self.timeouts,
+            "restarts": self.restarts,
+            "resubmitted": self.resubmitted,
+            "pages": self.pages,
+            "fallback_pages": self.fallback_pages,
+            "mean_extract_s": round(self.total_extract_s / self.documents, 3) if self.documents else 0.0,
+        }
+
+
+pdf_pool = PdfExtractionPool()
@@ -0,0 +1,349 @@
+"""Replay LLM client — serves recorded responses so the pipeline can be load-tested offline.
+
+Responses are keyed by response schema (one schema per agent) and seeded from
+data/precomputed/*.json or from JSONL recordings captured by RecordingLLMClient
+during live runs. Each call sleeps for a latency drawn from a configurable
+distribution and can fail with injected 429/503 errors.
+
+Also ships an HTTP stand-in for the Ollama API so OllamaClient itself can be
+pointed at it:
+
+    python -m app.replay_client --port 11435
+    LLM_PROVIDER=ollama OLLAMA_BASE_URL=http://localhost:11435 uvicorn app.main:app
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from pathlib import Path
+from typing import Protocol
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.gemini_client import LLMClient, TokenBucketRateLimiter
+
+logger = logging.getLogger("agencyflow.replay")
+
+PRECOMPUTED_DIR = Path(__file__).parent.parent / "data" / "precomputed"
+
+# Which precomputed demo file answers which agent's response schema —
+# including the partial schemas of the incremental report and the fan-out and scheduled calendars
+SCHEMA_FIXTURES = {
+    "BriefParserOutput": "brief_parsed",
+    "AudienceOutput": "audience",
+    "CalendarOutput": "calendar",
+    "CreativeBriefOutput": "creative_brief",
+    "PerformanceOutput": "performance",
+    "ChannelAnalysisBatch": "performance_channel_analysis",
+    "PerformanceSummary": "performance_summary",
+    "CalendarPlan": "calendar_plan",
+    "CalendarEntryBatch": "calendar_entries",
+    "SlotCopyBatch": "slot_copy_batch",
+}
+
+
+class ReplayAPIError(Exception):
+    """Injected provider error. Carries `status_code` like the google-genai errors do,
+    so GeminiClient-style retry checks and `_is_retryable` treat it the same way."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Replay backend injected HTTP {status_code}")
+        self.status_code = status_code
+
+
+# =============================================================================
+# Latency distributions
+# =============================================================================
+
+class LatencyModel(Protocol):
+    def sample(self, rng: random.Random, schema_name: str = "") -> float:
+        """Return a latency in seconds for a call answering `schema_name`."""
+        ...
+
+
+class FixedLatency:
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def sample(self, rng: random.Random, schema_name: str = "") -> float:
+        return self.seconds
+
+
+class LognormalLatency:
+    """Lognormal latency — the long right tail real LLM APIs show."""
+
+    def __init__(self, median_seconds: float, sigma: float = 0.5):
+        self._mu = math.log(max(median_seconds, 1e-6))
+        self._sigma = sigma
+
+    def sample(self, rng: random.Random, schema_name: str = "") -> float:
+        return rng.lognormvariate(self._mu, self._sigma)
+
+
+class HistogramLatency:
+    """Resample latencies observed in recorded live runs."""
+
+    def __init__(self, samples_seconds: list[float]):
+        if not samples_seconds:
+            raise ValueError("HistogramLatency needs at least one recorded sample")
+        self._samples = samples_seconds
+
+    def sample(self, rng: random.Random, schema_name: str = "") -> float:
+        return rng.choice(self._samples)
+
+
+class RecordedLatency:
+    """Per-schema latencies recorded from a live run, optionally scaled.
+
+    Replays each agent with the duration it actually took, so demo runs have
+    the same shape as a real one (scale=0.1 plays it back 10x faster).
+    """
+
+    def __init__(self, seconds_by_schema: dict[str, float], scale: float = 1.0, default: float = 0.0):
+        self._seconds = seconds_by_schema
+        self._scale = scale
+        self._default = default
+
+    def sample(self, rng: random.Random, schema_name: str = "") -> float:
+        return self._seconds.get(schema_name, self._default) * self._scale
+
+
+# =============================================================================
+# Recorded responses
+# =============================================================================
+
+class ReplayStore:
+    """Recorded response texts (and their live latencies) keyed by schema name."""
+
+    def __init__(self):
+        self.responses: dict[str, list[str]] = {}
+        self.latencies: dict[str, list[float]] = {}
+        self._cursor: dict[str, int] = {}
+
+    def add(self, schema_name: str, response_text: str, latency_s: float | None = None) -> None:
+        self.responses.setdefault(schema_name, []).append(response_text)
+        if latency_s is not None:
+            self.latencies.setdefault(schema_name, []).append(latency_s)
+
+    def next_response(self, schema_name: str) -> str:
+        """Round-robin over the recordings for a schema."""
+        recorded = self.responses.get(schema_name)
+        if not recorded:
+            raise KeyError(f"No recorded response for schema {schema_name}")
+        index = self._cursor.get(schema_name, 0)
+        self._cursor[schema_name] = index + 1
+        return recorded[index % len(recorded)]
+
+    def all_latencies(self) -> list[float]:
+        return [latency for samples in self.latencies.values() for latency in samples]
+
+    @classmethod
+    def from_precomputed(cls, directory: Path = PRECOMPUTED_DIR) -> "ReplayStore":
+        store = cls()
+        for schema_name, stem in SCHEMA_FIXTURES.items():
+            path = directory / f"{stem}.json"
+            if path.exists():
+                store.add(schema_name, path.read_text(encoding="utf-8"))
+        return store
+
+    def load_recordings(self, path: Path) -> "ReplayStore":
+        """Add responses captured by RecordingLLMClient (one JSON object per line)."""
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                latency_ms = record.get("latency_ms")
+                self.add(
+                    record["schema"],
+                    json.dumps(record["response"]),
+                    latency_ms / 1000 if latency_ms is not None else None,
+                )
+        return self
+
+
+# =============================================================================
+# Clients
+# =============================================================================
+
+class ReplayLLMClient:
+    """LLMClient that replays recorded responses with simulated latency and errors."""
+
+    def __init__(
+        self,
+        store: ReplayStore | None = None,
+        latency: LatencyModel | None = None,
+        error_rate_429: float = 0.0,
+        error_rate_503: float = 0.0,
+        rpm_limit: int = 0,
+        seed: int | None = None,
+    ):
+        self._store = store or ReplayStore.from_precomputed()
+        self._latency = latency or FixedLatency(0.0)
+        self._error_rate_429 = error_rate_429
+        self._error_rate_503 = error_rate_503
+        self._rng = random.Random(seed)
+        # Optional — lets load tests reproduce the Gemini free-tier throttle
+        self._rate_limiter = TokenBucketRateLimiter(rpm_limit) if rpm_limit > 0 else None
+        self.calls = 0
+        self.errors_injected = 0
+
+    @classmethod
+    def from_settings(cls) -> "ReplayLLMClient":
+        store = ReplayStore.from_precomputed(
+            Path(settings.replay_data_dir) if settings.replay_data_dir else PRECOMPUTED_DIR
+        )
+        if settings.replay_recordings_path:
+            store.load_recordings(Path(settings.replay_recordings_path))
+        return cls(
+            store=store,
+            latency=build_latency_model(
+                settings.replay_latency_model, settings.replay_latency_ms / 1000, store
+            ),
+            error_rate_429=settings.replay_error_rate_429,
+            error_rate_503=settings.replay_error_rate_503,
+            rpm_limit=settings.replay_rpm_limit,
+            seed=settings.replay_seed,
+        )
+
+    async def generate(self, prompt: str, response_schema: type[BaseModel]) -> dict:
+        return json.loads(await self.generate_text(response_schema.__name__))
+
+    async def generate_raw(self, prompt: str, response_schema: type[BaseModel]) -> str:
+        return await self.generate_text(response_schema.__name__)
+
+    async def generate_text(self, schema_name: str) -> str:
+        """Return the next recorded response for `schema_name` as JSON text.
+
+        Raises:
+            ReplayAPIError: When an injected 429/503 fires.
+            KeyError: If nothing was recorded for the schema.
+        """
+        self.calls += 1
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+
+        await asyncio.sleep(self._latency.sample(self._rng, schema_name))
+
+        roll = self._rng.random()
+        if roll < self._error_rate_429:
+            self.errors_injected += 1
+            raise ReplayAPIError(429)
+        if roll < self._error_rate_429 + self._error_rate_503:
+            self.errors_injected += 1
+            raise ReplayAPIError(503)
+
+        return self._store.next_response(schema_name)
+
+    def stats(self) -> dict:
+        """Call, error and rate limiter counters for the metrics endpoint."""
+        limiter = self._rate_limiter
+        return {
+            "calls": self.calls,
+            "errors_injected": self.errors_injected,
+            "rate_limit_acquisitions": limiter.acquisitions if limiter else 0,
+            "rate_limit_wait_s": round(limiter.total_wait_s, 3) if limiter else 0.0,
+        }
+
+
+class RecordingLLMClient:
+    """Wraps a live LLMClient and appends every response + latency to a JSONL file.
+
+    The file can be replayed later with `ReplayStore.load_recordings` (or the
+    REPLAY_RECORDINGS_PATH setting), including as a latency histogram.
+    """
+
+    def __init__(self, inner: LLMClient, path: Path):
+        self._inner = inner
+        self._path = path
+
+    async def generate(self, prompt: str, response_schema: type[BaseModel]) -> dict:
+        return json.loads(await self.generate_raw(prompt, response_schema))
+
+    async def generate_raw(self, prompt: str, response_schema: type[BaseModel]) -> str | bytes:
+        start = time.monotonic()
+        text = await self._inner.generate_raw(prompt, response_schema)
+        record = {
+            "schema": response_schema.__name__,
+            "latency_ms": round((time.monotonic() - start) * 1000, 1),
+            # Parsed so each record stays on one line, whatever the provider's formatting
+            "response": json.loads(text),
+        }
+        # Small append per call — cheap enough not to need an executor
+        with open(self._path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return text
+
+    def stats(self) -> dict:
+        return self._inner.stats() if hasattr(self._inner, "stats") else {}
+
+    async def close(self):
+        if hasattr(self._inner, "close"):
+            await self._inner.close()
+
+
+def build_latency_model(kind: str, seconds: float, store: ReplayStore) -> LatencyModel:
+    """Build a latency model from config: 'fixed', 'lognormal' or 'histogram'."""
+    if kind == "fixed":
+        return FixedLatency(seconds)
+    if kind == "lognormal":
+        return LognormalLatency(seconds, settings.replay_latency_sigma)
+    if kind == "histogram":
+        return HistogramLatency(store.all_latencies())
+    raise ValueError(f"Unknown replay latency model: {kind}")
+
+
+# =============================================================================
+# Ollama API stand-in
+# =============================================================================
+
+def create_ollama_app(replay: ReplayLLMClient):
+    """Minimal Ollama-compatible HTTP app backed by a ReplayLLMClient.
+
+    Implements just what OllamaClient uses: POST /api/chat with a JSON-schema
+    `format`. The schema's title (the Pydantic model name) picks the recording.
+    """
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    ollama_app = FastAPI(title="AgencyFlow Ollama replay")
+
+    @ollama_app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "replay"}]}
+
+    @ollama_app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        schema = body.get("format")
+        schema_name = schema.get("title", "") if isinstance(schema, dict) else ""
+        try:
+            content = await replay.generate_text(schema_name)
+        except ReplayAPIError as exc:
+            return JSONResponse(status_code=exc.status_code, content={"error": str(exc)})
+        except KeyError as exc:
+            return JSONResponse(status_code=404, content={"error": str(exc)})
+        return {
+            "model": body.get("model", "replay"),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+        }
+
+    return ollama_app
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve recorded LLM responses over the Ollama API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    args = parser.parse_args()
+
+    uvicorn.run(create_ollama_app(ReplayLLMClient.from_settings()), host=args.host, port=args.port)
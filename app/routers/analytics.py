@@ -0,0 +1,45 @@
+"""Analytics API routes — cross-run group-bys over the columnar output store."""
+
+import datetime
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services.analytics_store import TABLE_SCHEMAS, analytics_store
+
+router = APIRouter(prefix="/api/v1/analytics", tags=["analytics"])
+
+
+@router.get("/tables")
+async def list_tables() -> dict:
+    """Queryable tables and their columns (list columns can be grouped by item)."""
+    return {
+        name: {field.name: str(field.type) for field in schema}
+        for name, schema in TABLE_SCHEMAS.items()
+    }
+
+
+@router.get("/{table}")
+async def group_by(
+    table: str,
+    group_by: str = Query(..., description="Comma-separated columns, e.g. channel,content_type or hashtags"),
+    since: datetime.date | None = Query(None, description="First completion date, inclusive"),
+    until: datetime.date | None = Query(None, description="Last completion date, inclusive"),
+    tenant: str | None = Query(None),
+    limit: int = Query(50, ge=1, le=1000),
+) -> dict:
+    """Row and distinct-run counts per group across every recorded run, largest first.
+
+    e.g. `/api/v1/analytics/calendar_entries?group_by=channel,content_type`
+    or `?group_by=hashtags` for recurring hashtags. The group-by is vectorized
+    over Parquet columns (see services/analytics_store.py).
+    """
+    if not analytics_store.enabled:
+        raise HTTPException(status_code=503, detail="Analytics store is disabled (set ANALYTICS_DIR)")
+    keys = [key.strip() for key in group_by.split(",") if key.strip()]
+    try:
+        return await analytics_store.group_by(
+            table, keys, since=since, until=until, tenant=tenant, limit=limit
+        )
+    except ValueError as exc:
+        status = 404 if str(exc).startswith("Unknown analytics table") else 422
+        raise HTTPException(status_code=status, detail=str(exc))
@@ -1,6 +1,13 @@
-"""Health check endpoint."""
+"""Health check and runtime metrics endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+
+from app.compression import compression_stats
+from app.pdf_extraction import pdf_pool
+from app.services.analytics_store import analytics_store
+from app.services.data_cache import data_cache
+from app.services.report_cache import report_cache
+from app.text_cache import text_cache
 
 router = APIRouter(tags=["health"])
 
@@ -8,3 +15,20 @@ router = APIRouter(tags=["health"])
 @router.get("/api/v1/health")
 async def health():
     return {"status": "healthy", "version": "0.1.0"}
+
+
+@router.get("/api/v1/metrics")
+async def metrics(request: Request):
+    """Runtime counters for load benchmarks and ops dashboards."""
+    orchestrator = request.app.state.orchestrator
+    client = orchestrator.client
+    return {
+        "pipeline": orchestrator.stats(),
+        "llm": client.stats() if hasattr(client, "stats") else {},
+        "compression": compression_stats.snapshot(),
+        "data_cache": data_cache.stats(),
+        "pdf_extraction": pdf_pool.stats(),
+        "text_cache": text_cache.stats(),
+        "analytics": analytics_store.stats(),
+        "report_cache": report_cache.stats(),
+    }
@@ -0,0 +1,96 @@
+"""Performance metrics routes — streaming ingestion of ad-platform exports and report refreshes."""
+
+import logging
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from pydantic import ValidationError
+
+from app.agents.performance_reporter import build_fast_report, refresh_report
+from app.config import settings
+from app.metrics_ingestion import CONTENT_TYPES, IngestFormat, ingest_stream
+from app.schemas import PerformanceInput
+from app.services.report_cache import report_cache
+from app.uploads import UploadTooLarge
+
+logger = logging.getLogger("agencyflow.router.performance")
+
+router = APIRouter(prefix="/api/v1/performance", tags=["performance"])
+
+
+@router.post("/ingest")
+async def ingest_metrics(
+    request: Request,
+    campaign_name: str = Query(..., min_length=1, max_length=200),
+    reporting_period: str | None = Query(None, max_length=100, description="Default: the export's date range"),
+    goals: list[str] = Query([], description="Repeat for each goal"),
+    format: IngestFormat | None = Query(None, description="Default: from Content-Type"),
+) -> dict:
+    """Aggregate a CSV/NDJSON metrics export into a PerformanceInput.
+
+    The export is the raw request body (`curl --data-binary @export.csv -H
+    'Content-Type: text/csv'`), streamed and reduced block by block — see
+    app/metrics_ingestion.py. The returned `metrics` can be passed as the
+    `metrics` field of POST /api/v1/pipeline/run; `ingest` reports rows,
+    bytes and rows/sec. With a date column, `metrics.trends` holds the
+    period's deltas and anomalies and `weekly` the per-channel weekly sums.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format = CONTENT_TYPES.get(content_type)
+        if format is None:
+            raise HTTPException(
+                status_code=415,
+                detail="Send text/csv or application/x-ndjson, or pass ?format=csv|ndjson",
+            )
+
+    max_bytes = settings.metrics_ingest_max_bytes
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Metrics export exceeds {max_bytes:,} bytes")
+
+    try:
+        aggregator = await ingest_stream(
+            request.stream(), format,
+            block_bytes=settings.metrics_ingest_block_bytes, max_bytes=max_bytes,
+        )
+        metrics = aggregator.to_performance_input(campaign_name, reporting_period, goals)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=f"Aggregated metrics are out of range: {exc.errors(include_url=False)}")
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    series = aggregator.timeseries()
+    return {
+        "metrics": metrics.model_dump(),
+        "weekly": series.weekly_rollup() if series else [],
+        "ingest": aggregator.stats(),
+    }
+
+
+@router.post("/report")
+async def refresh_performance_report(
+    request: Request,
+    metrics: PerformanceInput,
+    fast: bool = Query(False, description="Compute the report from the metrics alone, no LLM call"),
+) -> dict:
+    """Report on a set of metrics — e.g. each time a refreshed export is ingested.
+
+    Incremental: channel analyses whose metrics haven't changed since an
+    earlier report (and the summary, if nothing changed) come from the
+    report cache, so only changed channels cost LLM output. `refresh` says
+    how many analyses were reused.
+    """
+    if fast:
+        return {"report": build_fast_report(metrics).model_dump(), "refresh": None}
+    try:
+        report, refresh = await refresh_report(metrics, request.app.state.orchestrator.client, report_cache)
+    except (ValidationError, ValueError) as exc:
+        logger.warning(f"Report refresh failed: {exc}")
+        raise HTTPException(status_code=502, detail="Performance Reporter returned an invalid report")
+    except Exception:
+        # Provider errors (rate limits, outages, a replay backend with no recording)
+        logger.exception("Report refresh failed calling the LLM")
+        raise HTTPException(status_code=502, detail="Performance Reporter call failed")
+    return {"report": report.model_dump(), "refresh": refresh.model_dump()}
@@ -1,34 +1,64 @@
 """Pipeline API routes — run pipeline, stream SSE events, demo mode."""
 
-import json
 import logging
 from pathlib import Path
 
-from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
 from sse_starlette.sse import EventSourceResponse
 
-from app.config import settings
+from app.compression import negotiate
 from app.file_parser import parse_file
-from app.schemas import PipelineRunResponse, PipelineStatus
+from app.uploads import UploadTooLarge, read_form
+from app.schemas import PipelineRunResponse, PipelineStatus, RunRequestForm
+from app.services.data_cache import data_cache
+from app.services.event_log import frame_for
+from app.services.pipeline_orchestrator import DemoRunLimitReached
 
 logger = logging.getLogger("agencyflow.router.pipeline")
 
 router = APIRouter(prefix="/api/v1/pipeline", tags=["pipeline"])
 
-# Pre-computed demo outputs directory
-DEMO_DATA_DIR = Path(__file__).parent.parent.parent / "data" / "precomputed"
 
+def _run_form_openapi() -> dict:
+    schema = RunRequestForm.model_json_schema()
+    schema["properties"]["file"] = {"type": "string", "format": "binary"}
+    # A JSON string on the wire; its nested $defs wouldn't resolve inside the OpenAPI document
+    schema.pop("$defs", None)
+    schema["properties"]["metrics"] = {
+        "anyOf": [{"type": "string", "contentMediaType": "application/json"}, {"type": "null"}],
+        "description": "PerformanceInput as JSON, e.g. the `metrics` from /api/v1/performance/ingest",
+    }
+    return {"requestBody": {"content": {"multipart/form-data": {"schema": schema}}}}
 
-@router.post("/run", status_code=202)
-async def run_pipeline(
-    request: Request,
-    file: UploadFile | None = File(None),
-    text: str | None = Form(None),
-) -> PipelineRunResponse:
+
+@router.post("/run", status_code=202, openapi_extra=_run_form_openapi())
+async def run_pipeline(request: Request) -> PipelineRunResponse:
     """Start a new pipeline run.
 
     Accepts either a file upload (PDF/TXT) or raw text. File takes precedence.
-    Returns 202 Accepted with a run_id for SSE streaming.
+    Returns 202 Accepted with a run_id for SSE streaming. Optional `tenant`
+    and `batch` labels let the multiplexed stream select groups of runs;
+    `compact_events` overrides the COMPACT_EVENTS default for this run,
+    `fast_report` the PERFORMANCE_FAST_REPORT default (report computed from
+    the metrics, no LLM call), `incremental_report` the
+    PERFORMANCE_INCREMENTAL_REPORT default (cached channel analyses reused,
+    only changed channels regenerated), `calendar_fan_out` the
+    CALENDAR_FAN_OUT default (calendar planned first, entries generated per
+    channel in parallel), and `calendar_scheduler` the CALENDAR_SCHEDULER
+    default (calendar grid built by rule, only its copy generated).
+    `metrics` is a PerformanceInput as JSON (see
+    POST /api/v1/performance/ingest) to report on instead of the bundled sample.
+
+    `demo_replay` (instant/recorded/scaled) ignores any input and plays the
+    precomputed demo outputs through the real pipeline and SSE stream, with
+    no LLM calls and no concurrency limit.
+
+    The form is streamed (see app/uploads.py): an oversized upload gets 413 as
+    soon as it crosses the limit, not after it has been fully received.
 
     WHY 202 instead of 200: the pipeline takes 60-120 seconds. Returning 202
     tells the client "I accepted your request but it's not done yet — use the
@@ -36,51 +66,141 @@ async def run_pipeline(
     """
     orchestrator = request.app.state.orchestrator
 
+    try:
+        form = await read_form(request)
+    except UploadTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+
+    try:
+        # Empty form values mean "not provided", as with FastAPI's Form()
+        fields = RunRequestForm.model_validate({k: v for k, v in form.fields.items() if v != ""})
+    except ValidationError as exc:
+        form.close()
+        raise RequestValidationError(exc.errors(include_url=False))
+
+    if fields.demo_replay is not None:
+        form.close()
+        try:
+            run = await orchestrator.start_demo_run(
+                fields.demo_replay, fields.demo_replay_scale,
+                tenant=fields.tenant, batch=fields.batch, compact=fields.compact_events,
+                fast_report=fields.fast_report,
+            )
+        except DemoRunLimitReached as exc:
+            raise HTTPException(status_code=429, detail=str(exc))
+        return PipelineRunResponse(run_id=run.run_id, status=run.status)
+
+    upload = form.upload
+    text = fields.text
+
     # Validate: at least one input provided
-    if file is None and not text:
+    if upload is None and not text:
         raise HTTPException(status_code=422, detail="Provide either a file or text brief")
 
-    if file is None and text and len(text.strip()) < 10:
+    if upload is None and text and len(text.strip()) < 10:
         raise HTTPException(status_code=422, detail="Brief text is too short (minimum 10 characters)")
 
     raw_text: str
     source_filename: str | None = None
 
-    if file is not None:
-        # Read and validate uploaded file
-        content = await file.read()
-
-        if len(content) > settings.max_upload_size_bytes:
-            raise HTTPException(status_code=413, detail="File exceeds 10MB size limit")
-
-        if not file.filename:
-            raise HTTPException(status_code=422, detail="File must have a filename")
-
+    if upload is not None:
         try:
-            raw_text = await parse_file(file.filename, content)
+            if not upload.filename:
+                raise HTTPException(status_code=422, detail="File must have a filename")
+            # The spooled file is parsed in place — no second full copy in memory
+            raw_text = await parse_file(upload.filename, upload.file)
         except ValueError as exc:
             raise HTTPException(status_code=422, detail=str(exc))
+        finally:
+            upload.close()
 
-        source_filename = file.filename
+        source_filename = upload.filename
     else:
         raw_text = text  # type: ignore[assignment]
 
     # Start the pipeline — raises ValueError if one is already running
     try:
-        run = await orchestrator.start_run(raw_text, source_filename)
+        run = await orchestrator.start_run(
+            raw_text, source_filename,
+            tenant=fields.tenant, batch=fields.batch, compact=fields.compact_events,
+            fast_report=fields.fast_report, incremental_report=fields.incremental_report,
+            calendar_fan_out=fields.calendar_fan_out, calendar_scheduler=fields.calendar_scheduler,
+            metrics=fields.metrics,
+        )
     except ValueError:
         raise HTTPException(status_code=409, detail="A pipeline run is already in progress")
 
     return PipelineRunResponse(run_id=run.run_id, status=run.status)
 
 
+@router.get("/stream")
+async def stream_runs(
+    request: Request,
+    run_ids: str | None = Query(None, description="Comma-separated run IDs"),
+    tenant: str | None = Query(None),
+    batch: str | None = Query(None),
+    event_types: str | None = Query(None, description="Comma-separated event types to include"),
+    scope: Literal["active", "all"] = Query("active"),
+    known: str | None = Query(None, description="Comma-separated content hashes the client already has"),
+) -> EventSourceResponse:
+    """Multiplexed SSE stream — many runs' events interleaved over one connection.
+
+    WHY one stream: a dashboard watching every active run would otherwise hold
+    one EventSource (and one server generator) per run. Each event's data
+    carries its run_id; filtering by run, tenant, batch and event type happens
+    server-side. `scope=active` replays history only for runs still in flight;
+    `scope=all` replays everything retained. A run's event ids come from the
+    orchestrator-wide sequence, so Last-Event-ID resumes the multiplexed
+    stream as well as the per-run one.
+    """
+    orchestrator = request.app.state.orchestrator
+    last_event_id = request.headers.get("last-event-id")
+
+    events = orchestrator.watch(
+        run_ids=_split_csv(run_ids),
+        tenant=tenant,
+        batch=batch,
+        event_types=_split_csv(event_types),
+        active_only=scope == "active",
+        after_id=_parse_last_event_id(last_event_id) if last_event_id else None,
+    )
+    known_hashes = _split_csv(known)
+
+    async def event_generator():
+        async for event in events:
+            if await request.is_disconnected():
+                break
+            frame = frame_for(event, known_hashes)
+            if frame is not None:
+                yield frame
+
+    return EventSourceResponse(event_generator())
+
+
+def _split_csv(value: str | None) -> set[str] | None:
+    if not value:
+        return None
+    return {item.strip() for item in value.split(",") if item.strip()} or None
+
+
 @router.get("/stream/{run_id}")
-async def stream_pipeline(request: Request, run_id: str) -> EventSourceResponse:
+async def stream_pipeline(
+    request: Request,
+    run_id: str,
+    known: str | None = Query(None, description="Comma-separated content hashes the client already has"),
+) -> EventSourceResponse:
     """SSE endpoint — streams pipeline events in real-time.
 
     WHY SSE over WebSockets: the pipeline only sends events server→client
     (no bidirectional communication needed). SSE is simpler — uses plain HTTP,
     auto-reconnects, and the frontend uses the native EventSource API.
+
+    Any number of clients can stream the same run. A reconnecting EventSource
+    sends Last-Event-ID and resumes after that event instead of starting over.
+    Outputs whose content_hash is listed in `known` are sent without their
+    payload (a refetching client already has them).
     """
     orchestrator = request.app.state.orchestrator
     run = orchestrator.get_run(run_id)
@@ -88,59 +208,72 @@ async def stream_pipeline(request: Request, run_id: str) -> EventSourceResponse:
     if run is None:
         raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
 
+    last_event_id = _parse_last_event_id(request.headers.get("last-event-id"))
+    known_hashes = _split_csv(known)
+
     async def event_generator():
-        """Yield SSE events from the pipeline's event queue.
+        """Yield pre-framed SSE events from the run's event log.
 
         WHY async generator: SSE needs a stream of events over time.
         An async generator lets FastAPI send each event as it arrives
-        from the queue, keeping the HTTP connection open until the
-        pipeline finishes (signaled by None in the queue).
+        from the log, keeping the HTTP connection open until the
+        pipeline finishes (the log is closed).
         """
-        while True:
+        async for event in run.events.subscribe(after_id=last_event_id):
             # Check if client disconnected
             if await request.is_disconnected():
                 break
+            # Bytes pass straight through EventSourceResponse — the frame was
+            # encoded once at emit time and is shared by every subscriber
+            frame = frame_for(event, known_hashes)
+            if frame is not None:
+                yield frame
 
-            event = await run.event_queue.get()
-
-            # None signals end of stream
-            if event is None:
-                break
+    return EventSourceResponse(event_generator())
 
-            event_type = event.get("event_type", "message")
-            yield {
-                "event": event_type,
-                "id": str(event.get("id", "")),
-                "data": json.dumps(event),
-            }
 
-    return EventSourceResponse(event_generator())
+def _parse_last_event_id(value: str | None) -> int:
+    """Event ids are positive ints; anything else means "from the start"."""
+    try:
+        return max(int(value), 0) if value else 0
+    except ValueError:
+        return 0
 
 
-@router.post("/demo", status_code=200)
-async def run_demo(request: Request) -> dict:
+@router.get("/demo", operation_id="get_demo")
+@router.post("/demo", operation_id="run_demo")
+async def run_demo(request: Request) -> Response:
     """Return pre-computed demo outputs instantly (no LLM calls).
 
     WHY a separate endpoint: demo mode skips the entire pipeline and rate
     limiting. It lets the frontend be developed and tested without burning
     API quota or waiting 60+ seconds per test.
+
+    The body is pre-encoded at startup (see services/data_cache.py), so this
+    does no disk I/O or JSON encoding. A strong ETag lets clients revalidate
+    with If-None-Match and get a 304 instead of the full payload.
     """
-    if not DEMO_DATA_DIR.exists():
-        raise HTTPException(status_code=404, detail="Demo data not available")
-
-    outputs = {}
-    for name in ["brief_parsed", "audience", "calendar", "creative_brief", "performance"]:
-        filepath = DEMO_DATA_DIR / f"{name}.json"
-        if filepath.exists():
-            with open(filepath) as f:
-                outputs[name] = json.load(f)
-        else:
-            raise HTTPException(
-                status_code=404, detail=f"Demo data missing: {name}.json"
-            )
+    try:
+        demo = data_cache.demo_response()
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=404, detail=f"Demo data missing: {Path(exc.filename).name}")
 
-    return {
-        "status": "complete",
-        "demo": True,
-        "outputs": outputs,
-    }
+    use_gzip = negotiate(request.headers.get("accept-encoding", ""), {"gzip": None}) == "gzip"
+    etag = demo.gzip_etag if use_gzip else demo.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        # Already compressed — the compression middleware passes it through
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=demo.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=demo.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
@@ -5,7 +5,7 @@ import uuid
 from enum import StrEnum
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, Json
 
 
 # =============================================================================
@@ -14,7 +14,7 @@ from pydantic import BaseModel, ConfigDict, Field
 
 class BriefParserInput(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
-    raw_text: str = Field(..., min_length=10, max_length=50_000)
+    raw_text: str = Field(..., min_length=10, max_length=500_000)
     source_filename: str | None = Field(None, max_length=255, pattern=r"^[a-zA-Z0-9_\-\.]+$")
 
 
@@ -89,6 +89,36 @@ class CalendarOutput(BaseModel):
     content_mix_rationale: str = Field(..., max_length=1000)
 
 
+class CalendarPlan(BaseModel):
+    """Fan-out calendar, first call: the plan every per-channel entry call works from."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    campaign_duration: str = Field(..., max_length=100)
+    weeks: int = Field(..., ge=1, le=52)
+    posting_frequency: str = Field(..., max_length=100)
+    channel_strategies: list[ChannelStrategy] = Field(..., max_length=10)
+    content_mix_rationale: str = Field(..., max_length=1000)
+
+
+class CalendarEntryBatch(BaseModel):
+    """Fan-out calendar: one channel's entries for a range of weeks."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    entries: list[CalendarEntry] = Field(..., max_length=100)
+
+
+class SlotCopy(BaseModel):
+    """Scheduled calendar: the copy for one numbered slot of the rule-built grid."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    slot: int = Field(..., ge=1)
+    topic: str = Field(..., max_length=200)
+    caption_hook: str = Field(..., max_length=500)
+    hashtags: list[str] = Field(..., max_length=10)
+
+
+class SlotCopyBatch(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+    copies: list[SlotCopy] = Field(..., max_length=100)
+
+
 class CalendarSummary(BaseModel):
     """Condensed version passed to Creative Brief agent (reduces prompt size)."""
     campaign_duration: str
@@ -139,12 +169,56 @@ class ChannelMetrics(BaseModel):
     spend: float = Field(..., ge=0.0, le=100_000_000)
 
 
+class TrendDelta(BaseModel):
+    """One metric's change between two equal stretches of the period ("Total" = blended)."""
+    channel: str = Field(..., max_length=50)
+    metric: str = Field(..., max_length=50)
+    previous: float
+    current: float
+    change_pct: float | None
+
+
+class MetricAnomaly(BaseModel):
+    """A day far outside its trailing window (rolling z-score)."""
+    channel: str = Field(..., max_length=50)
+    metric: str = Field(..., max_length=50)
+    date: datetime.date
+    value: float
+    expected: float
+    z_score: float
+    kind: Literal["spike", "drop"]
+
+
+class MetricChangepoint(BaseModel):
+    """A lasting shift in a metric's daily level, starting on `date`."""
+    channel: str = Field(..., max_length=50)
+    metric: str = Field(..., max_length=50)
+    date: datetime.date
+    before: float
+    after: float
+    # None when `before` is zero (e.g. a channel that launched mid-period)
+    change_pct: float | None
+
+
+class MetricsTrends(BaseModel):
+    """What changed during the period, from daily series — capped, whatever its length."""
+    start: datetime.date
+    end: datetime.date
+    days: int = Field(..., ge=1)
+    comparison: str = Field(..., max_length=100)
+    deltas: list[TrendDelta] = Field(default_factory=list, max_length=50)
+    anomalies: list[MetricAnomaly] = Field(default_factory=list, max_length=20)
+    changepoints: list[MetricChangepoint] = Field(default_factory=list, max_length=20)
+
+
 class PerformanceInput(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
     campaign_name: str = Field(..., max_length=200)
     reporting_period: str = Field(..., max_length=100)
     channel_metrics: list[ChannelMetrics] = Field(..., max_length=20)
     goals: list[str] = Field(..., max_length=10)
+    # From a dated export (app/metrics_timeseries.py); None when only totals are known
+    trends: MetricsTrends | None = None
 
 
 class ChannelAnalysis(BaseModel):
@@ -163,6 +237,23 @@ class MetricSummary(BaseModel):
     trend: str = Field(..., max_length=50)
 
 
+class ChannelAnalysisBatch(BaseModel):
+    """Incremental reporting, phase 1: analyses for the channels whose metrics changed."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    channel_analysis: list[ChannelAnalysis] = Field(..., max_length=20)
+
+
+class PerformanceSummary(BaseModel):
+    """Incremental reporting, phase 2: PerformanceOutput without the channel analyses."""
+    model_config = ConfigDict(str_strip_whitespace=True)
+    executive_summary: str = Field(..., max_length=2000)
+    overall_performance: str = Field(..., max_length=50)
+    top_performing_content: list[str] = Field(..., max_length=10)
+    recommendations: list[str] = Field(..., max_length=10)
+    next_steps: list[str] = Field(..., max_length=10)
+    key_metrics_summary: list[MetricSummary] = Field(..., max_length=20)
+
+
 class PerformanceOutput(BaseModel):
     model_config = ConfigDict(str_strip_whitespace=True)
     executive_summary: str = Field(..., max_length=2000)
@@ -189,11 +280,57 @@ class PipelineStatus(StrEnum):
     FAILED = "failed"
 
 
+class RunRequestForm(BaseModel):
+    """Non-file fields of POST /run, validated after the form is streamed in."""
+    text: str | None = None
+    tenant: str | None = Field(None, max_length=100)
+    batch: str | None = Field(None, max_length=100)
+    compact_events: bool | None = None
+    fast_report: bool | None = None
+    incremental_report: bool | None = None
+    calendar_fan_out: bool | None = None
+    calendar_scheduler: bool | None = None
+    # PerformanceInput as JSON (e.g. from /performance/ingest); default: bundled sample metrics
+    metrics: Json[PerformanceInput] | None = None
+    demo_replay: Literal["instant", "recorded", "scaled"] | None = None
+    demo_replay_scale: float | None = Field(None, gt=0)
+
+
 class PipelineRunResponse(BaseModel):
     run_id: str
     status: PipelineStatus
 
 
+class CompactionReport(BaseModel):
+    """Prompt size for one agent call, before and after context compaction."""
+    agent_name: str = Field(..., max_length=100)
+    token_budget: int = Field(..., ge=0)
+    tokens_before: int = Field(..., ge=0)
+    tokens_after: int = Field(..., ge=0)
+    compacted_fields: list[str] = Field(default_factory=list)
+
+
+class NormalizationReport(BaseModel):
+    """Brief text size before and after normalization (boilerplate, wraps, whitespace)."""
+    chars_before: int = Field(..., ge=0)
+    chars_after: int = Field(..., ge=0)
+    tokens_before: int = Field(..., ge=0)
+    tokens_after: int = Field(..., ge=0)
+    pages: int = Field(..., ge=1)
+    boilerplate_lines_removed: int = Field(0, ge=0)
+    hyphenations_joined: int = Field(0, ge=0)
+    wrapped_lines_joined: int = Field(0, ge=0)
+
+
+class ReportRefresh(BaseModel):
+    """What an incremental Performance Reporter run reused from earlier reports."""
+    channels: int = Field(..., ge=0)
+    reused: int = Field(..., ge=0)
+    regenerated: int = Field(..., ge=0)
+    summary_reused: bool
+    llm_calls: int = Field(..., ge=0)
+
+
 class AgentError(BaseModel):
     agent_name: str = Field(..., max_length=100)
     error_type: str = Field(..., max_length=50)
@@ -222,14 +359,34 @@ class PipelineStatusEvent(SSEEvent):
 class AgentCompleteEvent(SSEEvent):
     event_type: Literal["agent_complete"] = "agent_complete"
     agent_name: str = Field(..., max_length=100)
-    output: dict
+    content_hash: str = Field(..., max_length=64)
+    # None when the subscriber already holds this content_hash
+    output: dict | None
+    # Compact mode: list fields sent as agent_output_chunk pages → their lengths
+    chunked_fields: dict[str, int] | None = None
+    unchanged: bool = False
+
+
+class AgentOutputChunkEvent(SSEEvent):
+    """One page of a large output list, sent before its agent_complete (compact mode)."""
+    event_type: Literal["agent_output_chunk"] = "agent_output_chunk"
+    agent_name: str = Field(..., max_length=100)
+    content_hash: str = Field(..., max_length=64)
+    field: str = Field(..., max_length=100)
+    offset: int = Field(..., ge=0)
+    total: int = Field(..., ge=0)
+    items: list
 
 
 class ReporterStatusEvent(SSEEvent):
     """Separate event for Performance Reporter (runs in parallel)."""
     event_type: Literal["reporter_status"] = "reporter_status"
     status: PipelineStatus
+    agent_name: str | None = Field(None, max_length=100)
+    content_hash: str | None = Field(None, max_length=64)
     output: dict | None = None
+    chunked_fields: dict[str, int] | None = None
+    unchanged: bool = False
 
 
 class PipelineErrorEvent(SSEEvent):
@@ -0,0 +1,341 @@
+"""Columnar analytics store — completed runs' output rows as date-partitioned Parquet.
+
+Pipeline outputs only live as long as their PipelineRun. For cross-campaign
+questions (which channels and content types calendars favour, which hashtags
+keep recurring) every completed run's calendar entries, personas, channel
+analyses and metric summaries are appended here as Arrow columns:
+
+    <analytics_dir>/<table>/date=YYYY-MM-DD/part-<ns>-<id>.parquet
+
+Rows are buffered in memory and written in batches of `analytics_flush_rows`
+(one Parquet file per table and day per flush, not per run), so hundreds of
+thousands of rows stay a handful of files, and a day's files are merged into
+one once there are `COMPACT_FILES` of them — scan cost tracks the file count
+far more than the row count. Queries run as vectorized Arrow
+group-bys over only the columns they need, with date partitions pruned —
+rows never become Python objects until the (small) grouped result. Rows not
+yet flushed are read from the buffer, so querying never writes files.
+"""
+
+import asyncio
+import datetime
+import logging
+import threading
+import time
+import types
+import typing
+import uuid
+from pathlib import Path
+
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pydantic import BaseModel
+
+from app.config import settings
+from app.schemas import (
+    AudienceOutput,
+    CalendarEntry,
+    CalendarOutput,
+    ChannelAnalysis,
+    MetricSummary,
+    PerformanceOutput,
+    Persona,
+)
+
+logger = logging.getLogger("agencyflow.analytics")
+
+# Columns every table carries, ahead of the row model's own fields
+RUN_COLUMNS = pa.schema([
+    ("run_id", pa.string()),
+    ("completed_at", pa.timestamp("us", tz="UTC")),
+    ("tenant", pa.string()),
+    ("batch", pa.string()),
+    ("campaign_name", pa.string()),
+])
+# Files in one date partition that trigger merging them into one
+COMPACT_FILES = 8
+# Parquet schema metadata key on an in-progress merged file: the part names it replaces
+COMPACTS_KEY = b"agencyflow.compacts"
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+def _arrow_type(annotation) -> pa.DataType:
+    origin = typing.get_origin(annotation)
+    if origin is list:
+        return pa.list_(_arrow_type(typing.get_args(annotation)[0]))
+    if origin in (typing.Union, types.UnionType):
+        return _arrow_type(next(arg for arg in typing.get_args(annotation) if arg is not type(None)))
+    return {str: pa.string(), int: pa.int32(), float: pa.float64(), bool: pa.bool_()}[annotation]
+
+
+def _schema(model: type[BaseModel]) -> pa.Schema:
+    fields = [pa.field(name, _arrow_type(info.annotation)) for name, info in model.model_fields.items()]
+    return pa.schema([*RUN_COLUMNS, *fields])
+
+
+# Table name → row model
+TABLE_MODELS: dict[str, type[BaseModel]] = {
+    "calendar_entries": CalendarEntry,
+    "personas": Persona,
+    "channel_analysis": ChannelAnalysis,
+    "metric_summaries": MetricSummary,
+}
+TABLE_SCHEMAS = {name: _schema(model) for name, model in TABLE_MODELS.items()}
+
+
+class AnalyticsStore:
+    def __init__(self, root: str | Path | None = None, flush_rows: int | None = None):
+        root = settings.analytics_dir if root is None else root
+        self.root = Path(root) if root else None
+        self.flush_rows = settings.analytics_flush_rows if flush_rows is None else flush_rows
+        # (table, date) → Arrow tables waiting to be written
+        self._buffer: dict[tuple[str, str], list[pa.Table]] = {}
+        self._buffered_rows = 0
+        # WHY two locks: record_run runs on the event loop and must never wait
+        # behind file I/O. The buffer lock only guards the in-memory buffer and
+        # is never held during I/O; the files lock keeps flushes, compactions
+        # and scans from interleaving (a scan must not see a half-merged
+        # partition) and is only taken in worker threads.
+        self._buffer_lock = threading.Lock()
+        self._files_lock = threading.Lock()
+
+        self.rows_written = 0
+        self.files_written = 0
+        self.compactions = 0
+        if self.enabled and self.root.is_dir():
+            self._recover()
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    async def record_run(
+        self,
+        run_id: str,
+        *,
+        campaign_name: str,
+        tenant: str | None = None,
+        batch: str | None = None,
+        calendar: CalendarOutput | None = None,
+        audience: AudienceOutput | None = None,
+        performance: PerformanceOutput | None = None,
+        completed_at: datetime.datetime | None = None,
+    ) -> None:
+        """Buffer a completed run's rows; writes a batch once `flush_rows` have accumulated."""
+        if not self.enabled:
+            return
+        completed_at = completed_at or datetime.datetime.now(datetime.timezone.utc)
+        run = {"run_id": run_id, "completed_at": completed_at, "tenant": tenant,
+               "batch": batch, "campaign_name": campaign_name}
+        rows = {
+            "calendar_entries": calendar.entries if calendar else [],
+            "personas": audience.personas if audience else [],
+            "channel_analysis": performance.channel_analysis if performance else [],
+            "metric_summaries": performance.key_metrics_summary if performance else [],
+        }
+        date = completed_at.date().isoformat()
+        with self._buffer_lock:
+            for table, items in rows.items():
+                if items:
+                    self._buffer.setdefault((table, date), []).append(_to_arrow(table, run, items))
+                    self._buffered_rows += len(items)
+            due = self._buffered_rows >= self.flush_rows
+        if due:
+            await asyncio.to_thread(self.flush)
+
+    def flush(self) -> None:
+        """Write every buffered row to Parquet — one file per table and date."""
+        with self._files_lock:
+            with self._buffer_lock:
+                buffer, self._buffer = self._buffer, {}
+                self._buffered_rows = 0
+            for (table, date), tables in buffer.items():
+                directory = self.root / table / f"date={date}"  # type: ignore[operator]
+                directory.mkdir(parents=True, exist_ok=True)
+                data = pa.concat_tables(tables)
+                _write_part(directory, data)
+                self.rows_written += data.num_rows
+                self.files_written += 1
+                parts = sorted(directory.glob("part-*.parquet"))
+                if len(parts) >= COMPACT_FILES:
+                    self._compact(directory, parts)
+
+    def _compact(self, directory: Path, parts: list[Path]) -> None:
+        """Merge a partition's files into one.
+
+        WHY a temp name: the merged file is written as `_compacting-*` (scans
+        skip `_`-prefixed files) recording the parts it replaces, and renamed
+        into place only after they are removed — a crash part-way never
+        leaves the rows in both, and `_recover` finishes the job.
+        """
+        merged = pa.concat_tables([
+            pq.read_table(part, partitioning=None).replace_schema_metadata(None) for part in parts
+        ])
+        replaces = orjson.dumps([part.name for part in parts])
+        tmp = directory / f"_compacting-{uuid.uuid4().hex}.parquet"
+        pq.write_table(merged.replace_schema_metadata({COMPACTS_KEY: replaces}), tmp)
+        self._finish_compaction(tmp)
+        self.compactions += 1
+
+    def _finish_compaction(self, tmp: Path) -> None:
+        """Remove the parts a complete `_compacting-*` file replaces, then rename it into place."""
+        directory = tmp.parent
+        for name in orjson.loads(pq.read_schema(tmp).metadata[COMPACTS_KEY]):
+            (directory / name).unlink(missing_ok=True)
+        tmp.rename(_part_path(directory))
+
+    def _recover(self) -> None:
+        """Finish compactions a crash interrupted.
+
+        A `_compacting-*` file that reads back whole was written before any
+        part was removed, so the compaction is completed; one that doesn't
+        was cut off mid-write with its parts all still there, so it's dropped.
+        """
+        for tmp in sorted(self.root.glob("*/date=*/_compacting-*.parquet")):  # type: ignore[union-attr]
+            try:
+                pq.read_schema(tmp).metadata[COMPACTS_KEY]
+            except (OSError, pa.ArrowInvalid, KeyError, TypeError):
+                logger.warning(f"Dropping incomplete analytics compaction {tmp}")
+                tmp.unlink()
+                continue
+            logger.warning(f"Finishing interrupted analytics compaction {tmp}")
+            self._finish_compaction(tmp)
+
+    async def close(self) -> None:
+        if self.enabled:
+            await asyncio.to_thread(self.flush)
+
+    async def group_by(self, table: str, keys: list[str], **filters) -> dict:
+        """Counts per group, largest first — see `_group_by` for the arguments."""
+        return await asyncio.to_thread(self._group_by, table, keys, **filters)
+
+    def _group_by(
+        self,
+        table: str,
+        keys: list[str],
+        *,
+        since: datetime.date | None = None,
+        until: datetime.date | None = None,
+        tenant: str | None = None,
+        limit: int = 50,
+    ) -> dict:
+        """Group `table` by `keys` and count rows and distinct runs per group.
+
+        A list column among the keys (e.g. hashtags) is exploded first, so
+        each item is counted once per row it appears in. `since`/`until` are
+        inclusive dates and prune whole partitions.
+
+        Raises:
+            ValueError: Unknown table or column, or more than one list column.
+        """
+        schema = TABLE_SCHEMAS.get(table)
+        if schema is None:
+            raise ValueError(f"Unknown analytics table: {table}")
+        keys = list(dict.fromkeys(keys))  # A repeated key would be a duplicate column
+        if not keys:
+            raise ValueError("group_by needs at least one column")
+        unknown = [key for key in keys if key != "date" and key not in schema.names]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for {table}: {', '.join(unknown)}")
+        list_keys = [key for key in keys if key != "date" and pa.types.is_list(schema.field(key).type)]
+        if len(list_keys) > 1:
+            raise ValueError("Group by at most one list column")
+
+        start = time.perf_counter()
+        columns = list(dict.fromkeys([*keys, "run_id"]))
+        dates = (since.isoformat() if since else None, until.isoformat() if until else None)
+        directory = self.root / table if self.root else None
+        parts = []
+        with self._files_lock:
+            if directory is not None and directory.exists():
+                expression = None
+                for condition in (
+                    ds.field("date") >= dates[0] if since else None,
+                    ds.field("date") <= dates[1] if until else None,
+                    ds.field("tenant") == tenant if tenant is not None else None,
+                ):
+                    if condition is not None:
+                        expression = condition if expression is None else expression & condition
+                dataset = ds.dataset(directory, format="parquet", partitioning=PARTITIONING)
+                parts.append(dataset.to_table(columns=columns, filter=expression))
+            # Taken under the files lock, so a row is either on disk or still buffered
+            with self._buffer_lock:
+                buffered = [
+                    (date, data) for (name, date), tables in self._buffer.items() if name == table
+                    and (since is None or date >= dates[0]) and (until is None or date <= dates[1])
+                    for data in tables
+                ]
+
+        for date, data in buffered:
+            if tenant is not None:
+                data = data.filter(pc.equal(data.column("tenant"), tenant))
+            parts.append(pa.table({
+                column: pa.array([date] * data.num_rows, pa.string()) if column == "date" else data.column(column)
+                for column in columns
+            }))
+        if parts:
+            data = pa.concat_tables([part.cast(parts[0].schema) for part in parts])
+        else:
+            data = pa.table({column: pa.array([], type=_key_type(schema, column)) for column in columns})
+
+        scanned = data.num_rows
+        if list_keys:
+            data = _explode(data, list_keys[0])
+
+        grouped = data.group_by(keys).aggregate([("run_id", "count"), ("run_id", "count_distinct")])
+        grouped = grouped.sort_by([("run_id_count", "descending"), *((key, "ascending") for key in keys)])
+        rows = grouped.slice(0, limit).rename_columns([*keys, "count", "runs"]).to_pylist()
+        return {
+            "table": table,
+            "group_by": keys,
+            "rows": rows,
+            "groups": grouped.num_rows,
+            "rows_scanned": scanned,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "rows_written": self.rows_written,
+            "files_written": self.files_written,
+            "compactions": self.compactions,
+            "buffered_rows": self._buffered_rows,
+        }
+
+
+def _to_arrow(table: str, run: dict, items: list[BaseModel]) -> pa.Table:
+    """Rows of one run as an Arrow table — built column by column."""
+    schema = TABLE_SCHEMAS[table]
+    columns = {name: [value] * len(items) for name, value in run.items()}
+    for name in TABLE_MODELS[table].model_fields:
+        columns[name] = [getattr(item, name) for item in items]
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+def _write_part(directory: Path, data: pa.Table) -> None:
+    pq.write_table(data, _part_path(directory))
+
+
+def _part_path(directory: Path) -> Path:
+    # Nanosecond time first so parts sort in write order; the suffix avoids collisions
+    return directory / f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+
+
+def _key_type(schema: pa.Schema, key: str) -> pa.DataType:
+    return pa.string() if key == "date" else schema.field(key).type
+
+
+def _explode(data: pa.Table, column: str) -> pa.Table:
+    """One row per list item, other columns repeated (rows with empty lists drop out)."""
+    values = data.column(column)
+    parents = pc.list_parent_indices(values)
+    exploded = {name: pc.take(data.column(name), parents) for name in data.column_names if name != column}
+    exploded[column] = pc.list_flatten(values)
+    return pa.table(exploded).select(data.column_names)
+
+
+analytics_store = AnalyticsStore()
@@ -0,0 +1,150 @@
+"""Bundled data cache — demo outputs and sample metrics, loaded once at startup.
+
+Holds each document parsed (for the pipeline) and the demo response
+pre-encoded as bytes (identity and gzip) with a strong ETag, so `/demo`
+serves from memory with no disk I/O and no JSON encoding per request.
+
+Files are re-stat'ed at most once per `data_cache_check_interval_s`; a
+changed mtime or size reloads that document and rebuilds the demo response,
+so editing the precomputed JSON doesn't need a server restart.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.config import settings
+
+logger = logging.getLogger("agencyflow.data_cache")
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+# Demo response key → file under data/precomputed, in response order
+DEMO_DOCUMENTS = {
+    "brief_parsed": "precomputed/brief_parsed.json",
+    "audience": "precomputed/audience.json",
+    "calendar": "precomputed/calendar.json",
+    "creative_brief": "precomputed/creative_brief.json",
+    "performance": "precomputed/performance.json",
+}
+SAMPLE_METRICS = "sample_metrics.json"
+SAMPLE_BRIEF = "sample_brief.txt"
+# Per-agent call durations from a live run, for demo replay timing
+DEMO_TIMINGS = "precomputed/timings.json"
+
+
+@dataclass(frozen=True, slots=True)
+class CachedDocument:
+    path: Path
+    mtime_ns: int
+    size: int
+    data: dict | str  # Parsed JSON, or text for non-.json files
+
+
+@dataclass(frozen=True, slots=True)
+class EncodedResponse:
+    body: bytes
+    gzip_body: bytes
+    etag: str  # Strong ETag of the identity body; the gzip variant appends "-gzip"
+
+    @property
+    def gzip_etag(self) -> str:
+        return self.etag[:-1] + '-gzip"'
+
+
+class DataCache:
+    def __init__(self, root: Path = DATA_DIR, check_interval_s: float | None = None):
+        self.root = root
+        self.check_interval_s = (
+            settings.data_cache_check_interval_s if check_interval_s is None else check_interval_s
+        )
+        self._documents: dict[str, CachedDocument] = {}
+        self._demo: EncodedResponse | None = None
+        self._last_check = 0.0
+        self.reloads = 0
+
+    def preload(self) -> None:
+        """Load every known document and build the demo response (called from lifespan)."""
+        for relative in [*DEMO_DOCUMENTS.values(), SAMPLE_METRICS, SAMPLE_BRIEF, DEMO_TIMINGS]:
+            if (self.root / relative).exists():
+                self._load(relative)
+        self._demo = None
+        self._last_check = time.monotonic()
+        try:
+            self.demo_response()
+        except FileNotFoundError:
+            logger.warning("Demo data incomplete — /demo will return 404")
+
+    def get(self, relative: str) -> dict | str:
+        """Parsed document (text for non-.json files) — treat as read-only, it's shared across requests.
+
+        Raises FileNotFoundError if the file doesn't exist.
+        """
+        self._refresh_if_due()
+        document = self._documents.get(relative)
+        if document is None:
+            document = self._load(relative)
+        return document.data
+
+    def demo_response(self) -> EncodedResponse:
+        """The pre-encoded `/demo` body. Raises FileNotFoundError if any demo file is missing."""
+        self._refresh_if_due()
+        if self._demo is None:
+            outputs = {key: self.get(relative) for key, relative in DEMO_DOCUMENTS.items()}
+            body = json.dumps({"status": "complete", "demo": True, "outputs": outputs}).encode("utf-8")
+            self._demo = EncodedResponse(
+                body=body,
+                # mtime=0 keeps the gzip bytes (and so the ETag) deterministic
+                gzip_body=gzip.compress(body, mtime=0),
+                etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            )
+        return self._demo
+
+    def stats(self) -> dict:
+        return {"documents": len(self._documents), "reloads": self.reloads}
+
+    def _load(self, relative: str) -> CachedDocument:
+        path = self.root / relative
+        stat = path.stat()
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f) if path.suffix == ".json" else f.read()
+        document = CachedDocument(path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size, data=data)
+        self._documents[relative] = document
+        return document
+
+    def _refresh_if_due(self) -> None:
+        """Reload documents whose mtime or size changed since they were loaded.
+
+        WHY throttled: a stat per document per request would put syscalls back
+        on the hot path; edits to bundled data only need to show up within a
+        second or so.
+        """
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval_s:
+            return
+        self._last_check = now
+        for relative, document in list(self._documents.items()):
+            try:
+                stat = os.stat(document.path)
+            except FileNotFoundError:
+                del self._documents[relative]
+                self._demo = None
+                continue
+            if (stat.st_mtime_ns, stat.st_size) != (document.mtime_ns, document.size):
+                logger.info(f"Reloading {relative} (changed on disk)")
+                try:
+                    self._load(relative)
+                except (OSError, json.JSONDecodeError) as exc:
+                    # Likely caught mid-write — keep serving the old copy, retry next check
+                    logger.warning(f"Could not reload {relative}: {exc}")
+                    continue
+                self._demo = None
+                self.reloads += 1
+
+
+data_cache = DataCache()
@@ -0,0 +1,53 @@
+"""Demo replay — precomputed outputs played back through the real pipeline.
+
+Unlike POST /demo, which returns everything at once, a demo-replay run goes
+through PipelineOrchestrator, the event log, SSE and the frontend's
+progressive rendering — only the LLM is replaced, by a ReplayLLMClient that
+answers from data/precomputed. That makes it usable for load-testing SSE
+fan-out with thousands of simulated runs at no API cost.
+
+Timing modes:
+    instant   every agent returns immediately
+    recorded  each agent takes as long as it did in a live run (timings.json)
+    scaled    recorded durations × scale (0.1 = ten times faster)
+"""
+
+import json
+from typing import Literal
+
+from app.config import settings
+from app.replay_client import SCHEMA_FIXTURES, FixedLatency, RecordedLatency, ReplayLLMClient, ReplayStore
+from app.services.data_cache import DEMO_TIMINGS, data_cache
+
+DemoTiming = Literal["instant", "recorded", "scaled"]
+
+# (demo ETag, store) — rebuilt only when the precomputed files change
+_store_cache: tuple[str, ReplayStore] | None = None
+
+
+def _demo_store() -> ReplayStore:
+    """Replay store over the cached precomputed outputs, shared by all demo runs."""
+    global _store_cache
+    etag = data_cache.demo_response().etag
+    if _store_cache is None or _store_cache[0] != etag:
+        store = ReplayStore()
+        for schema_name, stem in SCHEMA_FIXTURES.items():
+            store.add(schema_name, json.dumps(data_cache.get(f"precomputed/{stem}.json")))
+        _store_cache = (etag, store)
+    return _store_cache[1]
+
+
+def build_demo_client(timing: str, scale: float | None = None) -> ReplayLLMClient:
+    """LLM client for one demo-replay run. Raises ValueError for an unknown timing mode."""
+    if timing == "instant":
+        latency = FixedLatency(0.0)
+    elif timing == "recorded":
+        latency = RecordedLatency(data_cache.get(DEMO_TIMINGS))
+    elif timing == "scaled":
+        latency = RecordedLatency(
+            data_cache.get(DEMO_TIMINGS),
+            scale=settings.demo_replay_scale if scale is None else scale,
+        )
+    else:
+        raise ValueError(f"Unknown demo replay timing: {timing}")
+    return ReplayLLMClient(store=_demo_store(), latency=latency)
@@ -0,0 +1,208 @@
+"""Broadcast event log — a per-run, append-only ring buffer of SSE events.
+
+Replaces the single-consumer asyncio.Queue: any number of subscribers read
+the same log from their own cursor, so two tabs on one run both see every
+event and a reconnecting EventSource resumes from its Last-Event-ID. The
+buffer is bounded, so a run nobody watches can't grow without limit.
+
+Each event is serialized and framed exactly once at append time; every
+subscriber is handed the same bytes object. Run logs draw their ids from
+the orchestrator's firehose, so the firehose shares the run's frames as-is. Encoding is orjson, with agent
+outputs spliced in as the bytes Pydantic's model_dump_json produced — the
+output is never turned into a dict on the way to the wire.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import itertools
+from collections import deque
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+import orjson
+
+from app.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class LoggedEvent:
+    id: int
+    event_type: str
+    payload: dict  # Event fields except pre-encoded ones (an agent's output)
+    frame: bytes  # Complete SSE frame (id/event/data lines), shared by all subscribers
+    # Labels of the run the event belongs to — the multiplexed stream filters on them
+    tenant: str | None = None
+    batch: str | None = None
+
+
+def frame_event(event_id: int, event_type: str, data: bytes) -> bytes:
+    """Encode one SSE frame. `data` must be single-line (compact JSON is)."""
+    return b"id: %d\r\nevent: %b\r\ndata: %b\r\n\r\n" % (event_id, event_type.encode("utf-8"), data)
+
+
+def encode_event(event: dict, raw: dict[str, bytes] | None = None) -> bytes:
+    """Compact JSON for an event; `raw` values are already-encoded JSON, spliced in as-is.
+
+    WHY splice by hand: orjson 3.8 has no Fragment type for embedding encoded
+    JSON, and decoding an output just to re-encode it is the cost this avoids.
+    `event` always has an `id`, so the object is never empty.
+    """
+    body = orjson.dumps(event)
+    if not raw:
+        return body
+    parts = [body[:-1]]
+    for key, value in raw.items():
+        parts.append(b"," + orjson.dumps(key) + b":" + value)
+    parts.append(b"}")
+    return b"".join(parts)
+
+
+def content_hash(encoded: bytes | str) -> str:
+    """Hash of an output's JSON encoding — clients compare it to skip payloads they have.
+
+    Pydantic serializes fields in declaration order, so the same output
+    always encodes (and hashes) the same way.
+    """
+    if isinstance(encoded, str):
+        encoded = encoded.encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def frame_for(event: LoggedEvent, known_hashes: set[str] | None = None) -> bytes | None:
+    """The frame to send one subscriber, honouring the content hashes it already has.
+
+    Events whose content_hash is known are elided: chunk pages are dropped
+    (None) and output-carrying events are re-framed without their output.
+    Everything else is the shared pre-encoded frame.
+    """
+    digest = event.payload.get("content_hash")
+    if not known_hashes or digest not in known_hashes:
+        return event.frame
+    if event.event_type == "agent_output_chunk":
+        return None
+    stub = {**event.payload, "output": None, "unchanged": True}
+    stub.pop("chunked_fields", None)
+    return frame_event(event.id, event.event_type, encode_event(stub))
+
+
+class EventLog:
+    """Append-only ring buffer with independent async subscriber cursors.
+
+    WHY swap an asyncio.Event per append instead of asyncio.Condition: appends
+    happen from synchronous code (PipelineRun._emit), and Condition.notify_all
+    needs the lock held, which needs an await. Setting the old Event and
+    replacing it wakes every waiting subscriber without awaiting.
+    """
+
+    def __init__(self, capacity: int | None = None, ids_from: "EventLog | None" = None):
+        self._events: deque[LoggedEvent] = deque(maxlen=capacity or settings.event_log_capacity)
+        self._next_id = 1
+        # Log whose id sequence this one follows (a run's firehose); ids then
+        # increase but skip the ones other runs took
+        self._ids_from = ids_from
+        self._closed = False
+        self._wakeup = asyncio.Event()
+
+    @property
+    def next_id(self) -> int:
+        if self._ids_from is not None:
+            return max(self._ids_from.next_id, self._next_id)
+        return self._next_id
+
+    @property
+    def last_id(self) -> int:
+        return self._next_id - 1
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def append(
+        self,
+        event: dict,
+        raw: dict[str, bytes] | None = None,
+        *,
+        tenant: str | None = None,
+        batch: str | None = None,
+    ) -> LoggedEvent:
+        """Serialize, frame and store an event, then wake all subscribers.
+
+        The event dict must carry `id` (== next_id) and `event_type`. `raw`
+        holds fields that are already JSON-encoded (see encode_event); they
+        go into the frame but not the payload. `tenant` and `batch` label the
+        logged event for filtering; they aren't sent.
+        """
+        if self._closed:
+            raise RuntimeError("Event log is closed")
+        logged = LoggedEvent(
+            id=event["id"],
+            event_type=event["event_type"],
+            payload=event,
+            frame=frame_event(event["id"], event["event_type"], encode_event(event, raw)),
+            tenant=tenant,
+            batch=batch,
+        )
+        self._store(logged)
+        return logged
+
+    def relay(self, event: LoggedEvent) -> None:
+        """Log an event appended to a log that draws its ids from this one.
+
+        Used by the orchestrator's firehose, which interleaves every run's
+        events. The LoggedEvent itself is shared — same frame bytes, same id —
+        so relaying encodes and copies nothing.
+        """
+        if self._closed:
+            raise RuntimeError("Event log is closed")
+        if event.id < self._next_id:
+            raise ValueError(f"Event {event.id} is behind this log's next id {self._next_id}")
+        self._store(event)
+
+    def close(self) -> None:
+        """Mark the end of the stream — subscribers finish once they've caught up."""
+        self._closed = True
+        self._notify()
+
+    def events_after(self, cursor: int) -> list[LoggedEvent]:
+        """Retained events with id > cursor, oldest first.
+
+        If the cursor points at events already evicted from the ring buffer,
+        the subscriber resumes from the oldest event still retained.
+        """
+        if not self._events:
+            return []
+        if self._events[-1].id - self._events[0].id + 1 == len(self._events):
+            start = max(cursor - self._events[0].id + 1, 0)
+        else:
+            # Ids with gaps (a run log following the firehose) — still sorted
+            start = bisect.bisect_right(self._events, cursor, key=lambda event: event.id)
+        return list(itertools.islice(self._events, start, None))
+
+    async def subscribe(self, after_id: int = 0) -> AsyncIterator[LoggedEvent]:
+        """Yield every event after `after_id`, then new ones as they arrive, until closed."""
+        cursor = after_id
+        while True:
+            # Grab the waiter before reading so an append between the read and
+            # the wait can't be missed
+            waiter = self._wakeup
+            for event in self.events_after(cursor):
+                cursor = event.id
+                yield event
+            if cursor < self.last_id:
+                continue  # More arrived while we were yielding
+            if self._closed:
+                return
+            await waiter.wait()
+
+    def _store(self, logged: LoggedEvent) -> None:
+        self._events.append(logged)
+        self._next_id = logged.id + 1
+        self._notify()
+
+    def _notify(self) -> None:
+        self._wakeup.set()
+        self._wakeup = asyncio.Event()
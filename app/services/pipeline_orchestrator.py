@@ -2,17 +2,29 @@
 
 import asyncio
 import datetime
-import json
 import logging
+import time
 import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+
+import orjson
+from pydantic import BaseModel, ValidationError
 
 from app.agents.brief_parser import parse_brief
 from app.agents.audience_researcher import research_audience
 from app.agents.content_calendar import generate_calendar
 from app.agents.creative_brief import generate_creative_brief
-from app.agents.performance_reporter import generate_report
+from app.agents.performance_reporter import generate_report, refresh_report
+from app.config import settings
+from app.context_compaction import collect_reports
+from app.services.analytics_store import analytics_store
+from app.services.data_cache import SAMPLE_BRIEF, SAMPLE_METRICS, data_cache
+from app.services.demo_replay import build_demo_client
+from app.services.event_log import EventLog, LoggedEvent, content_hash
+from app.services.report_cache import report_cache
 from app.gemini_client import LLMClient
-from pydantic import ValidationError
+from app.text_normalization import normalize_brief
 
 from app.schemas import (
     AudienceOutput,
@@ -21,28 +33,70 @@ from app.schemas import (
     CalendarOutput,
     CalendarSummary,
     ChannelStrategy,
+    CompactionReport,
     CreativeBriefInput,
     CreativeBriefOutput,
+    NormalizationReport,
     PerformanceInput,
     PerformanceOutput,
     PipelineStatus,
+    ReportRefresh,
 )
 
 logger = logging.getLogger("agencyflow.pipeline")
 
 
+class DemoRunLimitReached(Exception):
+    """max_concurrent_demo_runs demo-replay runs are already in progress."""
+
+
 class PipelineRun:
     """Holds state for a single pipeline execution.
 
     WHY a class here but not for agents: the orchestrator manages mutable state
-    (status, outputs, event queue) across multiple async steps. A class groups
+    (status, outputs, event log) across multiple async steps. A class groups
     that state together. Agents are stateless pure functions — no state to group.
     """
 
-    def __init__(self, run_id: str, raw_text: str, source_filename: str | None = None):
+    def __init__(
+        self,
+        run_id: str,
+        raw_text: str,
+        source_filename: str | None = None,
+        *,
+        tenant: str | None = None,
+        batch: str | None = None,
+        compact: bool | None = None,
+        fast_report: bool | None = None,
+        incremental_report: bool | None = None,
+        calendar_fan_out: bool | None = None,
+        calendar_scheduler: bool | None = None,
+        metrics: PerformanceInput | None = None,
+        client: LLMClient | None = None,
+        firehose: EventLog | None = None,
+    ):
         self.run_id = run_id
         self.raw_text = raw_text
         self.source_filename = source_filename
+        # Optional labels the multiplexed stream filters on
+        self.tenant = tenant
+        self.batch = batch
+        # Compact mode pages large output lists into agent_output_chunk events
+        self.compact = settings.compact_events if compact is None else compact
+        # Fast report: Performance Reporter output computed from the metrics, no LLM call
+        self.fast_report = settings.performance_fast_report if fast_report is None else fast_report
+        # Incremental report: channel analyses and summary reused from report_cache where unchanged
+        self.incremental_report = (
+            settings.performance_incremental_report if incremental_report is None else incremental_report
+        )
+        # Fan-out calendar: a plan call, then per-channel entry calls in parallel
+        self.calendar_fan_out = settings.calendar_fan_out if calendar_fan_out is None else calendar_fan_out
+        # Scheduled calendar: rule-built grid, the LLM writes only topics, hooks and hashtags
+        self.calendar_scheduler = settings.calendar_scheduler if calendar_scheduler is None else calendar_scheduler
+        # Performance Reporter input; None uses the bundled sample metrics
+        self.metrics = metrics
+        # Per-run LLM client (demo replay); None uses the orchestrator's client
+        self.client = client
         self.status = PipelineStatus.IDLE
         self.start_time: float | None = None
 
@@ -55,24 +109,78 @@ class PipelineRun:
         self.error: str | None = None
         self.failed_agent: str | None = None
 
-        # SSE event queue — subscribers read from this
-        # WHY asyncio.Queue: it's an async-safe FIFO that lets the pipeline
-        # producer push events and the SSE endpoint consumer pull them
-        # without polling or shared mutable state.
-        self.event_queue: asyncio.Queue[dict | None] = asyncio.Queue()
-        self._event_counter = 0
+        # Per-agent prompt sizes before/after context compaction
+        self.compaction_reports: list[CompactionReport] = []
+        # Token saving from brief text normalization (set once the brief is parsed)
+        self.normalization: NormalizationReport | None = None
+        # What an incremental report reused (None for full and fast reports)
+        self.report_refresh: ReportRefresh | None = None
+
+        # SSE event log — any number of subscribers read it from their own cursor.
+        # Its ids come from the firehose, so one frame (and one id) serves both streams
+        self.events = EventLog(ids_from=firehose)
+        # Orchestrator-wide log every run's events are also relayed into
+        self._firehose = firehose
+
+    def _emit(self, event_type: str, raw: dict[str, bytes] | None = None, **data) -> None:
+        """Append an SSE event to the run's event log.
 
-    def _emit(self, event_type: str, **data) -> None:
-        """Push an SSE event onto the queue."""
-        self._event_counter += 1
+        `raw` fields are already-encoded JSON spliced into the frame as-is
+        (see event_log.encode_event).
+        """
         event = {
-            "id": self._event_counter,
+            "id": self.events.next_id,
             "run_id": self.run_id,
-            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            # orjson encodes datetimes natively, in the same ISO 8601 form
+            "timestamp": datetime.datetime.now(datetime.timezone.utc),
             "event_type": event_type,
             **data,
         }
-        self.event_queue.put_nowait(event)
+        logged = self.events.append(event, raw, tenant=self.tenant, batch=self.batch)
+        if self._firehose is not None:
+            self._firehose.relay(logged)
+
+    def _emit_output(
+        self, agent_name: str, output: BaseModel, event_type: str = "agent_complete", **data
+    ) -> None:
+        """Emit an agent's output, tagged with its content hash.
+
+        The output is encoded once with model_dump_json and those bytes are
+        both hashed and spliced into the frame — no intermediate dict.
+
+        In compact mode, top-level lists longer than `event_chunk_size` (e.g.
+        100 calendar entries) go out first as ordered agent_output_chunk pages;
+        the final event carries the rest of the output with those lists empty
+        and `chunked_fields` giving their lengths. Clients that already hold a
+        payload with the same hash can skip it (see event_log.frame_for).
+        """
+        encoded = output.model_dump_json().encode("utf-8")
+        digest = content_hash(encoded)
+
+        size = settings.event_chunk_size
+        if self.compact and any(
+            isinstance(value, list) and len(value) > size for value in output.__dict__.values()
+        ):
+            payload = output.model_dump(mode="json")
+            chunked_fields = {}
+            for field, value in payload.items():
+                if not isinstance(value, list) or len(value) <= size:
+                    continue
+                for offset in range(0, len(value), size):
+                    self._emit(
+                        "agent_output_chunk",
+                        agent_name=agent_name,
+                        content_hash=digest,
+                        field=field,
+                        offset=offset,
+                        total=len(value),
+                        items=value[offset:offset + size],
+                    )
+                chunked_fields[field] = len(value)
+            encoded = orjson.dumps({**payload, **{field: [] for field in chunked_fields}})
+            data["chunked_fields"] = chunked_fields
+
+        self._emit(event_type, raw={"output": encoded}, agent_name=agent_name, content_hash=digest, **data)
 
     def _emit_status(self, agent_name: str, status: PipelineStatus, elapsed_ms: int) -> None:
         """Emit a status_update event."""
@@ -88,50 +196,188 @@ class PipelineRun:
 
 
 class PipelineOrchestrator:
-    """Manages pipeline runs. Only one run at a time (single-user local demo).
+    """Manages pipeline runs. One run at a time by default (single-user local demo);
+    `max_concurrent_runs` raises the limit for load testing.
 
     WHY asyncio.Lock: without it, two near-simultaneous POST /run requests
     could both pass the "is idle?" check before either sets status to PARSING.
     The lock makes the check-and-set atomic.
     """
 
-    def __init__(self, client: LLMClient):
+    def __init__(
+        self,
+        client: LLMClient,
+        max_concurrent_runs: int | None = None,
+        *,
+        max_concurrent_demo_runs: int | None = None,
+        max_finished_runs: int | None = None,
+        finished_run_ttl_s: float | None = None,
+    ):
         self._client = client
+        self._max_concurrent_runs = max_concurrent_runs or settings.max_concurrent_runs
+        self._max_concurrent_demo_runs = max_concurrent_demo_runs or settings.max_concurrent_demo_runs
+        self._max_finished_runs = max_finished_runs or settings.max_finished_runs
+        self._finished_run_ttl_s = finished_run_ttl_s or settings.finished_run_ttl_s
         self._lock = asyncio.Lock()
         self._current_run: PipelineRun | None = None
         self._runs: dict[str, PipelineRun] = {}
+        # Finished run id → monotonic finish time, oldest first — evicted from _runs
+        # past the TTL or the count bound, so runs (and their event logs) don't pile up
+        self._finished: OrderedDict[str, float] = OrderedDict()
+        self._runs_started = 0
+        self._active_runs: set[str] = set()
+        # Demo-replay runs don't count toward max_concurrent_runs — they have their own cap
+        self._active_demo_runs: set[str] = set()
+        self._demo_runs_started = 0
+        # Strong references to background tasks — asyncio only keeps weak ones
+        self._tasks: set[asyncio.Task] = set()
+        self._completed_runs = 0
+        self._failed_runs = 0
+        # Every run's events, interleaved, for the multiplexed stream
+        self.firehose = EventLog(capacity=settings.firehose_capacity)
 
     @property
     def current_run(self) -> PipelineRun | None:
         return self._current_run
 
+    @property
+    def client(self) -> LLMClient:
+        return self._client
+
     def get_run(self, run_id: str) -> PipelineRun | None:
         return self._runs.get(run_id)
 
+    def stats(self) -> dict:
+        """Run counters for the metrics endpoint."""
+        return {
+            "runs_started": self._runs_started,
+            "retained_runs": len(self._runs),
+            "active_runs": len(self._active_runs),
+            "demo_runs_started": self._demo_runs_started,
+            "active_demo_runs": len(self._active_demo_runs),
+            "completed_runs": self._completed_runs,
+            "failed_runs": self._failed_runs,
+            "max_concurrent_runs": self._max_concurrent_runs,
+            "max_concurrent_demo_runs": self._max_concurrent_demo_runs,
+            "firehose_last_id": self.firehose.last_id,
+        }
+
+    async def watch(
+        self,
+        *,
+        run_ids: set[str] | None = None,
+        tenant: str | None = None,
+        batch: str | None = None,
+        event_types: set[str] | None = None,
+        active_only: bool = True,
+        after_id: int | None = None,
+    ) -> AsyncIterator[LoggedEvent]:
+        """Yield events from many runs, interleaved, filtered server-side.
+
+        Run filters (`run_ids`, `tenant`, `batch`) combine with AND; None means
+        "any". With `active_only`, retained history is replayed only for runs
+        that are still active, and runs started later are followed live.
+        `after_id` resumes from a firehose event id (Last-Event-ID); without it,
+        the stream starts from the oldest retained event.
+        """
+        if after_id is None:
+            cursor = 0
+            active_at_connect = self._active_runs | self._active_demo_runs
+            live_from = self.firehose.last_id
+        else:
+            # A resuming client already chose its runs — don't re-apply the snapshot
+            cursor = after_id
+            active_at_connect = set()
+            live_from = after_id
+
+        def wanted(event: LoggedEvent) -> bool:
+            if event_types and event.event_type not in event_types:
+                return False
+            run_id = event.payload["run_id"]
+            if run_ids and run_id not in run_ids:
+                return False
+            if active_only and event.id <= live_from and run_id not in active_at_connect:
+                return False
+            # Labels travel with the event — a run evicted from _runs still matches
+            return (tenant is None or event.tenant == tenant) and (batch is None or event.batch == batch)
+
+        async for event in self.firehose.subscribe(after_id=cursor):
+            if wanted(event):
+                yield event
+
     async def start_run(
-        self, raw_text: str, source_filename: str | None = None
+        self,
+        raw_text: str,
+        source_filename: str | None = None,
+        *,
+        tenant: str | None = None,
+        batch: str | None = None,
+        compact: bool | None = None,
+        fast_report: bool | None = None,
+        incremental_report: bool | None = None,
+        calendar_fan_out: bool | None = None,
+        calendar_scheduler: bool | None = None,
+        metrics: PerformanceInput | None = None,
     ) -> PipelineRun:
-        """Start a new pipeline run. Raises ValueError if one is already running."""
+        """Start a new pipeline run. Raises ValueError if the concurrency limit is reached."""
         async with self._lock:
-            if self._current_run and self._current_run.status not in (
-                PipelineStatus.COMPLETE,
-                PipelineStatus.FAILED,
-                PipelineStatus.IDLE,
-            ):
+            if len(self._active_runs) >= self._max_concurrent_runs:
                 raise ValueError("Pipeline is already running")
 
-            run_id = str(uuid.uuid4())
-            run = PipelineRun(run_id, raw_text, source_filename)
-            # Set status before the task starts so the 202 response shows "parsing"
-            run.status = PipelineStatus.PARSING
+            run = PipelineRun(
+                str(uuid.uuid4()), raw_text, source_filename,
+                tenant=tenant, batch=batch, compact=compact, fast_report=fast_report,
+                incremental_report=incremental_report, calendar_fan_out=calendar_fan_out,
+                calendar_scheduler=calendar_scheduler, metrics=metrics, firehose=self.firehose,
+            )
             self._current_run = run
-            self._runs[run_id] = run
+            self._active_runs.add(run.run_id)
+            self._launch(run)
+        return run
 
-        # Fire and forget — the pipeline runs in the background while
-        # the SSE endpoint streams events from the queue.
-        asyncio.create_task(self._execute(run))
+    async def start_demo_run(
+        self,
+        timing: str = "recorded",
+        scale: float | None = None,
+        *,
+        tenant: str | None = None,
+        batch: str | None = None,
+        compact: bool | None = None,
+        fast_report: bool | None = None,
+    ) -> PipelineRun:
+        """Start a demo-replay run: the sample brief through the real pipeline,
+        answered from precomputed outputs (see services/demo_replay.py).
+
+        Demo runs skip the concurrency limit — they make no LLM calls, and load
+        tests start thousands of them — but have their own, max_concurrent_demo_runs.
+        Raises ValueError for an unknown timing, DemoRunLimitReached at the cap.
+        """
+        if len(self._active_demo_runs) >= self._max_concurrent_demo_runs:
+            raise DemoRunLimitReached(f"{self._max_concurrent_demo_runs} demo runs already in progress")
+        client = build_demo_client(timing, scale)
+        run = PipelineRun(
+            str(uuid.uuid4()), data_cache.get(SAMPLE_BRIEF), SAMPLE_BRIEF,
+            tenant=tenant, batch=batch, compact=compact, fast_report=fast_report,
+            # Replayed answers are whole outputs, not the incremental/fan-out/scheduled pieces
+            incremental_report=False, calendar_fan_out=False, calendar_scheduler=False,
+            client=client, firehose=self.firehose,
+        )
+        self._active_demo_runs.add(run.run_id)
+        self._demo_runs_started += 1
+        self._launch(run)
         return run
 
+    def _launch(self, run: PipelineRun) -> None:
+        # Set status before the task starts so the 202 response shows "parsing"
+        run.status = PipelineStatus.PARSING
+        self._runs[run.run_id] = run
+        self._runs_started += 1
+        # Fire and forget — the pipeline runs in the background while
+        # the SSE endpoint streams events from the log.
+        task = asyncio.create_task(self._execute(run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
     async def _execute(self, run: PipelineRun) -> None:
         """Execute the full agent pipeline.
 
@@ -144,38 +390,81 @@ class PipelineOrchestrator:
         import time
         run.start_time = time.monotonic()
 
+        demo = run.run_id in self._active_demo_runs
+        try:
+            with collect_reports() as reports:
+                run.compaction_reports = reports
+                await self._run_agents(run)
+        finally:
+            self._active_runs.discard(run.run_id)
+            self._active_demo_runs.discard(run.run_id)
+            if run.status == PipelineStatus.COMPLETE:
+                self._completed_runs += 1
+            else:
+                self._failed_runs += 1
+            self._finish(run.run_id)
+        # WHY after the slot is released: a Parquet flush or compaction
+        # mustn't hold off the next run. Demo replays only repeat the bundled
+        # fixtures — keep them out of analytics.
+        if run.status == PipelineStatus.COMPLETE and not demo:
+            await self._record_analytics(run)
+
+    def _finish(self, run_id: str) -> None:
+        """Mark a run finished and evict finished runs past the TTL or over the bound."""
+        now = time.monotonic()
+        self._finished[run_id] = now
+        while self._finished:
+            oldest, finished_at = next(iter(self._finished.items()))
+            if len(self._finished) <= self._max_finished_runs and now - finished_at < self._finished_run_ttl_s:
+                break
+            del self._finished[oldest]
+            self._runs.pop(oldest, None)
+            if self._current_run is not None and self._current_run.run_id == oldest:
+                self._current_run = None
+
+    async def _record_analytics(self, run: PipelineRun) -> None:
+        """Append the run's output rows to the analytics store (if enabled)."""
+        if not analytics_store.enabled:
+            return
+        try:
+            await analytics_store.record_run(
+                run.run_id,
+                campaign_name=run.brief_output.campaign_name,
+                tenant=run.tenant,
+                batch=run.batch,
+                calendar=run.calendar_output,
+                audience=run.audience_output,
+                performance=run.performance_output,
+            )
+        except Exception:
+            # The run already completed for its clients — analytics is best-effort
+            logger.exception(f"Could not record analytics for run {run.run_id}")
+
+    async def _run_agents(self, run: PipelineRun) -> None:
+        """Run the agent DAG, emitting SSE events as each agent completes."""
+        client = run.client or self._client
         try:
             # Step 1: Brief Parser
             run._emit_status("brief_parser", PipelineStatus.PARSING, run._elapsed_ms())
+            raw_text, run.normalization = normalize_brief(run.raw_text)
             brief_input = BriefParserInput(
-                raw_text=run.raw_text, source_filename=run.source_filename
-            )
-            run.brief_output = await parse_brief(brief_input, self._client)
-            run._emit(
-                "agent_complete",
-                agent_name="brief_parser",
-                output=run.brief_output.model_dump(mode="json"),
+                raw_text=raw_text, source_filename=run.source_filename
             )
+            run.brief_output = await parse_brief(brief_input, client)
+            run._emit_output("brief_parser", run.brief_output)
 
             # Step 2: Audience Research
             run._emit_status("audience_researcher", PipelineStatus.RESEARCHING, run._elapsed_ms())
-            run.audience_output = await research_audience(run.brief_output, self._client)
-            run._emit(
-                "agent_complete",
-                agent_name="audience_researcher",
-                output=run.audience_output.model_dump(mode="json"),
-            )
+            run.audience_output = await research_audience(run.brief_output, client)
+            run._emit_output("audience_researcher", run.audience_output)
 
             # Step 3: Content Calendar
             run._emit_status("content_calendar", PipelineStatus.CALENDARING, run._elapsed_ms())
             run.calendar_output = await generate_calendar(
-                run.brief_output, run.audience_output, self._client
-            )
-            run._emit(
-                "agent_complete",
-                agent_name="content_calendar",
-                output=run.calendar_output.model_dump(mode="json"),
+                run.brief_output, run.audience_output, client,
+                fan_out=run.calendar_fan_out, scheduled=run.calendar_scheduler,
             )
+            run._emit_output("content_calendar", run.calendar_output)
 
             # Step 4 + 5: Creative Brief and Performance Reporter in parallel
             # WHY asyncio.gather: these two agents are independent — Creative Brief
@@ -185,43 +474,48 @@ class PipelineOrchestrator:
             run._emit_status("creative_brief", PipelineStatus.BRIEFING, run._elapsed_ms())
             run._emit("reporter_status", status=PipelineStatus.REPORTING.value, output=None)
 
-            calendar_summary = CalendarSummary(
+            # WHY model_construct: every value here is a field of an output that
+            # was already validated — re-validating would walk the same nested
+            # models again for nothing.
+            calendar_summary = CalendarSummary.model_construct(
                 campaign_duration=run.calendar_output.campaign_duration,
                 posting_frequency=run.calendar_output.posting_frequency,
                 channel_strategies=run.calendar_output.channel_strategies,
                 content_mix_rationale=run.calendar_output.content_mix_rationale,
             )
-            creative_input = CreativeBriefInput(
+            creative_input = CreativeBriefInput.model_construct(
                 brief_data=run.brief_output,
                 audience_data=run.audience_output,
                 calendar_summary=calendar_summary,
             )
 
-            # Load bundled metrics for Performance Reporter
-            metrics_input = _load_sample_metrics(run.brief_output.campaign_name)
+            # Uploaded metrics if the run has them, else the bundled sample
+            metrics_input = run.metrics or _load_sample_metrics(run.brief_output.campaign_name)
 
             creative_result, performance_result = await asyncio.gather(
-                generate_creative_brief(creative_input, self._client),
-                generate_report(metrics_input, self._client),
+                generate_creative_brief(creative_input, client),
+                _report(run, metrics_input, client),
             )
 
             run.creative_brief_output = creative_result
-            run._emit(
-                "agent_complete",
-                agent_name="creative_brief",
-                output=run.creative_brief_output.model_dump(mode="json"),
-            )
+            run._emit_output("creative_brief", run.creative_brief_output)
 
             run.performance_output = performance_result
-            run._emit(
-                "reporter_status",
+            run._emit_output(
+                "performance_reporter",
+                run.performance_output,
+                event_type="reporter_status",
                 status=PipelineStatus.COMPLETE.value,
-                output=run.performance_output.model_dump(mode="json"),
             )
 
             # Done
             run.status = PipelineStatus.COMPLETE
-            run._emit("pipeline_complete")
+            run._emit(
+                "pipeline_complete",
+                prompt_compaction=[r.model_dump() for r in run.compaction_reports],
+                text_normalization=run.normalization.model_dump(),
+                report_refresh=run.report_refresh.model_dump() if run.report_refresh else None,
+            )
             logger.info(f"Pipeline {run.run_id} completed in {run._elapsed_ms()}ms")
 
         except ValidationError as exc:
@@ -261,21 +555,25 @@ class PipelineOrchestrator:
             )
 
         finally:
-            # Signal end of stream — SSE endpoint stops when it reads None
-            run.event_queue.put_nowait(None)
+            # Signal end of stream — subscribers stop once they've caught up
+            run.events.close()
+
+
+async def _report(run: PipelineRun, metrics: PerformanceInput, client: LLMClient) -> PerformanceOutput:
+    """The run's performance report — fast, incremental (recording what it reused) or full."""
+    if run.incremental_report and not run.fast_report:
+        output, run.report_refresh = await refresh_report(metrics, client, report_cache)
+        return output
+    return await generate_report(metrics, client, fast=run.fast_report)
 
 
 def _load_sample_metrics(campaign_name: str) -> PerformanceInput:
-    """Load bundled sample_metrics.json for the Performance Reporter.
+    """Bundled sample_metrics.json for the Performance Reporter, from the data cache.
 
-    In v1, we always use bundled metrics (no user-provided metrics endpoint).
+    Used when a run has no uploaded metrics (see routers/performance.py).
     """
-    from pathlib import Path
-    metrics_path = Path(__file__).parent.parent.parent / "data" / "sample_metrics.json"
-    with open(metrics_path) as f:
-        data = json.load(f)
-    # Use the campaign name from the parsed brief
-    data["campaign_name"] = campaign_name
+    # Shallow copy — the cached dict is shared, only the top-level name changes
+    data = {**data_cache.get(SAMPLE_METRICS), "campaign_name": campaign_name}
     return PerformanceInput.model_validate(data)
 
 
@@ -0,0 +1,70 @@
+"""Report cache — Performance Reporter pieces reused across metrics refreshes.
+
+Metrics are re-sent whenever any number moves, but usually only a channel or
+two has changed. In incremental mode (app/agents/performance_reporter.py) each
+channel's ChannelAnalysis is cached under a hash of what its prompt was built
+from, and the executive summary under a hash of every channel's key plus the
+blended inputs — so a refresh regenerates only the channels that changed, and
+an identical refresh makes no LLM call at all.
+
+In-memory LRU bounded by entry count; values are validated models, shared
+read-only between runs.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+import orjson
+from pydantic import BaseModel
+
+from app.config import settings
+
+
+def cache_key(namespace: str, content: object) -> str:
+    """`<namespace>-<sha256 of content as sorted-key JSON>`."""
+    encoded = orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+    return f"{namespace}-{hashlib.sha256(encoded).hexdigest()}"
+
+
+class ReportCache:
+    def __init__(self, max_entries: int | None = None):
+        self.max_entries = settings.report_cache_max_entries if max_entries is None else max_entries
+        self._entries: OrderedDict[str, BaseModel] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> BaseModel | None:
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: str, value: BaseModel) -> None:
+        if self.max_entries == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+report_cache = ReportCache()
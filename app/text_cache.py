@@ -0,0 +1,149 @@
+"""Extracted-text cache — repeat uploads of the same file skip extraction.
+
+The same brief is often uploaded several times (retries, colleagues,
+resubmits after a failed run), and a 20-page PDF costs seconds of worker CPU
+each time. Text is keyed by the SHA-256 of the uploaded bytes plus the
+extractor version, so a changed extractor never serves stale text.
+
+Two tiers: an in-memory LRU bounded by total text size, and an optional
+directory (`text_cache_dir`) that survives restarts and is shared by every
+worker process pointed at it. A disk hit is promoted into memory.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO
+
+from app.config import settings
+
+logger = logging.getLogger("agencyflow.text_cache")
+
+
+# Read size when hashing a file — a spooled upload is never held in memory whole
+HASH_BLOCK_BYTES = 1024 * 1024
+
+
+def cache_key(data: bytes | BinaryIO, namespace: str) -> str:
+    """`<namespace>-<sha256 of data>` — namespace the extractor and its version.
+
+    A file is hashed block by block from the start and left rewound.
+    """
+    digest = hashlib.sha256()
+    if isinstance(data, bytes):
+        digest.update(data)
+    else:
+        data.seek(0)
+        while block := data.read(HASH_BLOCK_BYTES):
+            digest.update(block)
+        data.seek(0)
+    return f"{namespace}-{digest.hexdigest()}"
+
+
+class ExtractedTextCache:
+    def __init__(self, max_bytes: int | None = None, disk_dir: str | Path | None = None):
+        self.max_bytes = settings.text_cache_max_bytes if max_bytes is None else max_bytes
+        disk_dir = settings.text_cache_dir if disk_dir is None else disk_dir
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> str | None:
+        text = self._entries.get(key)
+        if text is not None:
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return text
+        if self.disk_dir is not None:
+            text = await asyncio.to_thread(self._read_disk, key)
+            if text is not None:
+                self.disk_hits += 1
+                self._remember(key, text)
+                return text
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, text: str) -> None:
+        self._remember(key, text)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._write_disk, key, text)
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is left alone)."""
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    def _remember(self, key: str, text: str) -> None:
+        size = _size(text)
+        if size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= _size(previous)
+        self._entries[key] = text
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= _size(evicted)
+            self.evictions += 1
+
+    def _path(self, key: str) -> Path:
+        # Two-character fan-out keeps directories small
+        digest = key.rsplit("-", 1)[-1]
+        return self.disk_dir / digest[:2] / f"{key}.txt"  # type: ignore[operator]
+
+    def _read_disk(self, key: str) -> str | None:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        except (OSError, UnicodeDecodeError) as exc:
+            logger.warning(f"Unreadable text cache entry {key}: {exc}")
+            return None
+
+    def _write_disk(self, key: str, text: str) -> None:
+        path = self._path(key)
+        tmp: str | None = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename so a concurrent reader never sees a partial file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        except (OSError, UnicodeError) as exc:
+            # The cache is an optimization — a full or read-only disk mustn't fail the upload
+            logger.warning(f"Could not write text cache entry {key}: {exc}")
+            if tmp is not None:
+                with contextlib.suppress(OSError):
+                    os.unlink(tmp)
+
+
+def _size(text: str) -> int:
+    # Characters, not encoded bytes — close enough for a memory bound, and O(1)
+    return len(text)
+
+
+text_cache = ExtractedTextCache()
@@ -0,0 +1,146 @@
+"""Brief text normalization — strips extraction noise before the brief parser sees it.
+
+Extracted PDF text carries page headers and footers on every page, page
+numbers, words hyphenated across line breaks, hard-wrapped sentences and runs
+of whitespace. None of it helps the parser, and all of it counts against the
+prompt's tokens. `normalize_brief` removes it and reports the saving.
+
+PDF pages arrive separated by form feeds (see app/pdf_extraction.py); plain
+text briefs are one "page" and only get the line and whitespace passes.
+
+A number alone on a line is only a page number when it sits at the same edge
+of several pages and counts up with them — on one page, or out of step, it's
+content ("Budget (USD):" / "150000") and stays.
+"""
+
+import logging
+import math
+import re
+
+from app.context_compaction import estimate_tokens
+from app.schemas import NormalizationReport
+
+logger = logging.getLogger("agencyflow.normalization")
+
+PAGE_BREAK = "\f"
+# Lines at the top and bottom of each page checked for repeated boilerplate
+EDGE_LINES = 3
+# A header/footer must repeat on at least this share of pages (and on 2+ pages)
+BOILERPLATE_PAGE_SHARE = 0.5
+MIN_PAGES_FOR_BOILERPLATE = 3
+MIN_PAGES_FOR_PAGE_NUMBERS = 2
+
+_DIGITS = re.compile(r"\d+")
+# After digits become "#": "#", "page #", "page # of #", "#/#", "- # -"
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?[-–—\s]*#(?:\s*(?:of|/)\s*#)?[-–—\s]*$")
+_HYPHENATED = re.compile(r"(?<=[a-z])-\n(?=[a-z])")
+# A line break inside a sentence: mid-clause punctuation or a word, then a lowercase word
+_WRAPPED = re.compile(r"(?<=[a-z0-9,;])[ \t]*\n(?=[a-z])")
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def normalize_brief(text: str) -> tuple[str, NormalizationReport]:
+    """Normalize extracted brief text.
+
+    Returns:
+        The normalized text and a report of what was removed and the token saving.
+    """
+    pages = text.split(PAGE_BREAK)
+    boilerplate = _boilerplate_keys(pages) if len(pages) >= MIN_PAGES_FOR_BOILERPLATE else set()
+    page_numbers = _page_number_lines(pages) if len(pages) >= MIN_PAGES_FOR_PAGE_NUMBERS else set()
+
+    removed = 0
+    cleaned_pages = []
+    for page_index, page in enumerate(pages):
+        lines = page.split("\n")
+        top, bottom = _edges(lines)
+        kept = []
+        for i, line in enumerate(lines):
+            if (i in top or i in bottom) and (
+                _edge_key(line) in boilerplate or (page_index, i) in page_numbers
+            ):
+                removed += 1
+                continue
+            kept.append(line)
+        cleaned_pages.append("\n".join(kept))
+
+    normalized = "\n\n".join(page.strip() for page in cleaned_pages if page.strip())
+    normalized = _SPACES.sub(" ", normalized)
+    normalized = "\n".join(line.strip() for line in normalized.split("\n"))
+    normalized, hyphenations = _HYPHENATED.subn("", normalized)
+    normalized, wraps = _WRAPPED.subn(" ", normalized)
+    normalized = _BLANK_RUNS.sub("\n\n", normalized).strip()
+
+    report = NormalizationReport(
+        chars_before=len(text),
+        chars_after=len(normalized),
+        tokens_before=estimate_tokens(text),
+        tokens_after=estimate_tokens(normalized),
+        pages=len(pages),
+        boilerplate_lines_removed=removed,
+        hyphenations_joined=hyphenations,
+        wrapped_lines_joined=wraps,
+    )
+    logger.info(
+        f"Normalized brief: {report.tokens_before} → {report.tokens_after} tokens "
+        f"({removed} boilerplate lines, {hyphenations} hyphenations, {wraps} wrapped lines)"
+    )
+    return normalized, report
+
+
+def _edge_key(line: str) -> str:
+    # Digits vary per page ("Page 3", "Confidential — 2026-05-03"), so they don't count
+    return _DIGITS.sub("#", " ".join(line.casefold().split()))
+
+
+def _is_page_number(line: str) -> bool:
+    key = _edge_key(line)
+    return bool(key) and _PAGE_NUMBER.match(key) is not None
+
+
+def _edges(lines: list[str]) -> tuple[list[int], list[int]]:
+    """Indexes of the first and last EDGE_LINES non-blank lines of a page."""
+    content = [i for i, line in enumerate(lines) if line.strip()]
+    return content[:EDGE_LINES], content[-EDGE_LINES:]
+
+
+def _page_threshold(pages: list[str]) -> int:
+    return max(2, math.ceil(len(pages) * BOILERPLATE_PAGE_SHARE))
+
+
+def _page_number_lines(pages: list[str]) -> set[tuple[int, int]]:
+    """(page, line) positions of page numbers: page-number-shaped edge lines
+    whose number runs in step with the page index, at the same edge of enough pages."""
+    # (edge, number - page index) → positions; a numbering sequence shares one offset
+    runs: dict[tuple[str, int], set[tuple[int, int]]] = {}
+    for page_index, page in enumerate(pages):
+        lines = page.split("\n")
+        for edge, indexes in zip(("top", "bottom"), _edges(lines)):
+            for i in indexes:
+                if _is_page_number(lines[i]):
+                    number = int(_DIGITS.search(lines[i]).group())
+                    runs.setdefault((edge, number - page_index), set()).add((page_index, i))
+    threshold = _page_threshold(pages)
+    return {
+        position for positions in runs.values()
+        if len({page for page, _ in positions}) >= threshold
+        for position in positions
+    }
+
+
+def _boilerplate_keys(pages: list[str]) -> set[str]:
+    """Edge lines that repeat on enough pages to be a running header or footer.
+
+    Page-number-shaped lines are left to _page_number_lines — as digit-blind
+    keys, unrelated figures on different pages would look like a repeat.
+    """
+    counts: dict[str, int] = {}
+    for page in pages:
+        lines = page.split("\n")
+        top, bottom = _edges(lines)
+        for key in {_edge_key(lines[i]) for i in top + bottom}:
+            if not _PAGE_NUMBER.match(key):
+                counts[key] = counts.get(key, 0) + 1
+    threshold = _page_threshold(pages)
+    return {key for key, count in counts.items() if count >= threshold}
@@ -0,0 +1,232 @@
+"""Streaming request-form reader for POST /run.
+
+WHY not FastAPI's File()/Form() parameters: FastAPI parses (and Starlette
+spools) the whole multipart body before the endpoint runs, so an oversized
+upload was fully received — and the size checked only afterwards. Here the
+body is parsed chunk by chunk as it arrives: the upload is rejected the moment
+it crosses `max_upload_size_bytes`, its extension and magic bytes are checked
+as soon as the first bytes are in, and anything past `upload_spool_bytes`
+goes to a temp file instead of RAM.
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+from dataclasses import dataclass, field
+from typing import BinaryIO
+from urllib.parse import parse_qsl
+
+from fastapi import Request
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.config import settings
+from app.file_parser import PDF_MAGIC_BYTES, check_file_header
+
+# Non-file form fields (brief text, labels) — generous for a pasted brief
+FIELD_MAX_BYTES = 1024 * 1024
+# Multipart boundaries and part headers on top of the payload itself
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    """The request body crossed a size limit — maps to 413."""
+
+
+class SpoolFile:
+    """Upload buffer: in memory up to `max_size` bytes, then a named temp file.
+
+    WHY not tempfile.SpooledTemporaryFile: it rolls over to an anonymous
+    file, and PDF extraction workers (separate processes) can only open a
+    spooled upload by path — otherwise its bytes would be read back and
+    pickled to them.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._file: BinaryIO = io.BytesIO()
+        self.path: str | None = None  # Set once rolled over to disk
+
+    def write(self, data: bytes) -> int:
+        if self.path is None and self._file.tell() + len(data) > self.max_size:
+            self._rollover()
+        return self._file.write(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+        if self.path is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(self.path)
+
+    def _rollover(self) -> None:
+        fd, path = tempfile.mkstemp(prefix="agencyflow-upload-")
+        disk = os.fdopen(fd, "w+b")
+        try:
+            disk.write(self._file.getvalue())
+        except BaseException:
+            disk.close()
+            os.unlink(path)
+            raise
+        self._file, self.path = disk, path
+
+
+@dataclass
+class SpooledUpload:
+    filename: str
+    file: SpoolFile  # Positioned at 0 once read_form returns
+    size: int = 0
+
+    def close(self) -> None:
+        self.file.close()
+
+
+@dataclass
+class FormData:
+    fields: dict[str, str] = field(default_factory=dict)
+    upload: SpooledUpload | None = None
+
+    def close(self) -> None:
+        if self.upload is not None:
+            self.upload.close()
+
+
+async def read_form(request: Request, file_field: str = "file") -> FormData:
+    """Read a multipart or urlencoded form from the request stream.
+
+    Raises:
+        UploadTooLarge: A file or field exceeded its limit (checked per chunk).
+        ValueError: Malformed form, or the file failed the header check.
+    """
+    max_upload = settings.max_upload_size_bytes
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_upload + FORM_OVERHEAD_BYTES:
+        # Rejected before reading a single byte of the body
+        raise UploadTooLarge("File exceeds 10MB size limit")
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type == b"multipart/form-data":
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise ValueError("Missing multipart boundary")
+        return await _read_multipart(request, boundary, file_field, max_upload)
+    if content_type in (b"application/x-www-form-urlencoded", b""):
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > FIELD_MAX_BYTES:
+                raise UploadTooLarge("Form exceeds size limit")
+        return FormData(fields=dict(parse_qsl(body.decode("utf-8"), keep_blank_values=True)))
+    raise ValueError(f"Unsupported content type: {content_type.decode('latin-1')}")
+
+
+async def _read_multipart(request: Request, boundary: bytes, file_field: str, max_upload: int) -> FormData:
+    form = FormData()
+    # The parser's callbacks are synchronous, so they only record what happened;
+    # the async loop below does the (possibly disk-backed) writes.
+    events: list[tuple[str, bytes]] = []
+    header_field = bytearray()
+    header_value = bytearray()
+    headers: dict[bytes, bytes] = {}
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished() -> None:
+        events.append(("begin", headers.get(b"content-disposition", b"")))
+        headers.clear()
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        events.append(("data", data[start:end]))
+
+    def on_part_end() -> None:
+        events.append(("end", b""))
+
+    parser = MultipartParser(boundary, {
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    name = ""
+    field_value = bytearray()
+    upload: SpooledUpload | None = None
+    head = bytearray()  # First bytes of the upload, until the header check has run
+    checked = False
+
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, data in events:
+                if kind == "begin":
+                    _, disposition = parse_options_header(data)
+                    name = disposition.get(b"name", b"").decode("utf-8")
+                    filename = disposition.get(b"filename")
+                    if name == file_field and filename is not None:
+                        form.close()  # Only one file per request — the last one wins
+                        upload = SpooledUpload(
+                            filename=filename.decode("utf-8"),
+                            file=SpoolFile(settings.upload_spool_bytes),
+                        )
+                        form.upload = upload
+                        head.clear()
+                        checked = False
+                    else:
+                        upload = None
+                        field_value.clear()
+                elif kind == "data" and upload is not None:
+                    upload.size += len(data)
+                    if upload.size > max_upload:
+                        raise UploadTooLarge("File exceeds 10MB size limit")
+                    if not checked:
+                        head.extend(data)
+                        if len(head) >= len(PDF_MAGIC_BYTES):
+                            check_file_header(upload.filename, bytes(head))
+                            checked = True
+                    await _write(upload.file, data)
+                elif kind == "data":
+                    field_value.extend(data)
+                    if len(field_value) > FIELD_MAX_BYTES:
+                        raise UploadTooLarge(f"Form field '{name}' exceeds size limit")
+                elif kind == "end" and upload is not None:
+                    if not checked:
+                        check_file_header(upload.filename, bytes(head))
+                        checked = True
+                    upload.file.seek(0)
+                    upload = None
+                elif kind == "end":
+                    form.fields[name] = field_value.decode("utf-8")
+            events.clear()
+        parser.finalize()
+    except BaseException:
+        form.close()
+        raise
+    return form
+
+
+async def _write(file: SpoolFile, data: bytes) -> None:
+    # Once rolling over to disk, keep file writes off the event loop
+    if file.path is not None or file.tell() + len(data) > file.max_size:
+        await asyncio.to_thread(file.write, data)
+    else:
+        file.write(data)
@@ -0,0 +1,111 @@
+"""Analytics store benchmark — group-by latency over a large synthetic history.
+
+Writes --runs completed calendars (each with the sample calendar's entries,
+channels and hashtags shuffled) into a temporary store, then times the
+group-bys the analytics endpoint serves:
+
+    python -m benchmarks.analytics
+    python -m benchmarks.analytics --runs 20000 --max-ms 1000
+
+Exits non-zero if any query's best time exceeds --max-ms.
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import payloads
+from benchmarks.common import write_results
+
+DEFAULT_MAX_MS = 1000.0
+QUERIES = [
+    ("calendar_entries", ["channel"]),
+    ("calendar_entries", ["channel", "content_type"]),
+    ("calendar_entries", ["hashtags"]),
+    ("calendar_entries", ["date", "channel"]),
+]
+CHANNELS = ["Instagram", "TikTok", "YouTube", "LinkedIn", "X", "Pinterest", "Facebook", "Snapchat"]
+CONTENT_TYPES = ["Reel", "Carousel", "Story", "Short", "Post", "Live", "Thread"]
+
+
+def synthetic_calendar(rng: random.Random):
+    from app.schemas import CalendarOutput
+
+    calendar = CalendarOutput.model_validate(payloads.calendar_output())
+    hashtags = [f"#tag{i}" for i in range(200)]
+    entries = [
+        entry.model_copy(update={
+            "channel": rng.choice(CHANNELS),
+            "content_type": rng.choice(CONTENT_TYPES),
+            "hashtags": rng.sample(hashtags, 4),
+        })
+        for entry in calendar.entries
+    ]
+    return calendar.model_copy(update={"entries": entries})
+
+
+async def populate(store, runs: int, days: int, seed: int) -> int:
+    rng = random.Random(seed)
+    calendars = [synthetic_calendar(rng) for _ in range(32)]
+    start = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+    rows = 0
+    for i in range(runs):
+        calendar = calendars[i % len(calendars)]
+        await store.record_run(
+            f"run-{i}", campaign_name="Benchmark", tenant=f"tenant-{i % 10}", calendar=calendar,
+            completed_at=start + datetime.timedelta(days=i * days // runs),
+        )
+        rows += len(calendar.entries)
+    await store.close()
+    return rows
+
+
+async def run(args) -> dict:
+    from app.services.analytics_store import AnalyticsStore
+
+    with tempfile.TemporaryDirectory() as root:
+        store = AnalyticsStore(Path(root), flush_rows=args.flush_rows)
+        start = time.perf_counter()
+        rows = await populate(store, args.runs, args.days, args.seed)
+        write_s = time.perf_counter() - start
+        print(f"wrote {rows} calendar rows in {store.files_written} files ({write_s:.1f} s)")
+
+        queries = {}
+        for table, keys in QUERIES:
+            best = float("inf")
+            for _ in range(args.repeats):
+                result = await store.group_by(table, keys)
+                best = min(best, result["elapsed_ms"])
+            name = f"{table}:{','.join(keys)}"
+            queries[name] = {"best_ms": best, "groups": result["groups"], "rows_scanned": result["rows_scanned"]}
+            print(f"{name:40} {best:>8.1f} ms  {result['groups']:>6} groups  {result['rows_scanned']} rows")
+        return {"rows": rows, "files": store.files_written, "write_s": round(write_s, 2), "queries": queries}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=90, help="Date partitions the runs are spread over")
+    parser.add_argument("--flush-rows", type=int, default=5_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ms", type=float, default=DEFAULT_MAX_MS)
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    path = write_results("analytics", results, args.output)
+    print(f"results written to {path}")
+    slow = [name for name, row in results["queries"].items() if row["best_ms"] > args.max_ms]
+    if slow:
+        print(f"{len(slow)} quer(ies) slower than {args.max_ms} ms: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
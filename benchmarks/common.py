@@ -0,0 +1,59 @@
+"""Shared helpers for benchmark scripts: percentiles and result files."""
+
+import datetime
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent.parent / "bench_results"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Linear-interpolated percentile (same method as numpy's default)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: list[float]) -> dict:
+    """p50/p95/p99 (+ count and mean) for a list of measurements."""
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(name: str, results: dict, output: Path | None = None) -> Path:
+    """Write results as JSON with run metadata so releases can be compared."""
+    now = datetime.datetime.now(datetime.timezone.utc)
+    if output is None:
+        output = RESULTS_DIR / f"{name}-{now:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "benchmark": name,
+        "timestamp": now.isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        **results,
+    }
+    output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    return output
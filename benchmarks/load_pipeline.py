@@ -0,0 +1,285 @@
+"""End-to-end load benchmark for the pipeline API.
+
+Starts `app.main:app` under uvicorn in a subprocess with the replay LLM backend,
+pushes N concurrent POST /run + GET /stream/{run_id} sessions through it, and
+writes throughput and latency percentiles to a JSON file:
+
+    python -m benchmarks.load_pipeline --runs 50 --concurrency 10 --latency-ms 200
+    python -m benchmarks.load_pipeline --runs 2000 --concurrency 500 --demo-replay instant
+
+With --demo-replay, runs are started as demo replays (no LLM client at all,
+no concurrency limit), which isolates SSE fan-out and event-path cost.
+
+Reported: runs/min, end-to-end and per-agent p50/p95/p99 (seconds), time to
+first SSE event, rate limiter wait share and server peak RSS.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import summarize, write_results
+
+ROOT = Path(__file__).parent.parent
+SAMPLE_BRIEF = ROOT / "data" / "sample_brief.txt"
+
+
+@dataclass
+class SessionResult:
+    ok: bool
+    error: str | None = None
+    e2e_s: float = 0.0
+    first_event_s: float = 0.0
+    agent_s: dict[str, float] = field(default_factory=dict)
+    rejected: int = 0
+
+
+async def iter_sse(response: httpx.Response) -> AsyncIterator[dict]:
+    """Parse an SSE byte stream into {"event", "id", "data"} dicts."""
+    event: dict = {}
+    async for line in response.aiter_lines():
+        if not line:
+            if "data" in event:
+                yield event
+            event = {}
+            continue
+        if line.startswith(":"):
+            continue  # comment / keep-alive ping
+        name, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if name == "data":
+            event["data"] = event["data"] + "\n" + value if "data" in event else value
+        elif name in ("event", "id"):
+            event[name] = value
+
+
+async def run_session(http: httpx.AsyncClient, form: dict) -> SessionResult:
+    """One user session: start a run with `form` fields, then stream it to completion."""
+    start = time.monotonic()
+    rejected = 0
+    for attempt in range(20):
+        response = await http.post("/api/v1/pipeline/run", data=form)
+        if response.status_code != 409:
+            break
+        # Another session's run hasn't released its slot yet
+        rejected += 1
+        await asyncio.sleep(0.05 * (attempt + 1))
+    if response.status_code != 202:
+        return SessionResult(ok=False, error=f"POST /run returned {response.status_code}", rejected=rejected)
+    run_id = response.json()["run_id"]
+
+    result = SessionResult(ok=False, rejected=rejected)
+    # Per-agent durations use the server's event timestamps — the stream connects
+    # after POST returns, so client arrival times would skew the first agent.
+    agent_start: dict[str, float] = {}
+    async with http.stream("GET", f"/api/v1/pipeline/stream/{run_id}") as stream:
+        async for event in iter_sse(stream):
+            if not result.first_event_s:
+                result.first_event_s = time.monotonic() - start
+            data = json.loads(event["data"])
+            event_type = event.get("event")
+            now = datetime.datetime.fromisoformat(data["timestamp"]).timestamp()
+
+            if event_type == "status_update":
+                agent_start[data["agent_name"]] = now
+            elif event_type == "agent_complete" and data["agent_name"] in agent_start:
+                result.agent_s[data["agent_name"]] = now - agent_start[data["agent_name"]]
+            elif event_type == "reporter_status":
+                if data.get("output") is None:
+                    agent_start["performance_reporter"] = now
+                elif "performance_reporter" in agent_start:
+                    result.agent_s["performance_reporter"] = now - agent_start["performance_reporter"]
+            elif event_type == "pipeline_complete":
+                result.ok = True
+                break
+            elif event_type == "pipeline_failed":
+                result.error = data.get("error", {}).get("error_type", "pipeline_failed")
+                break
+
+    result.e2e_s = time.monotonic() - start
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _peak_rss_mb(pid: int) -> float | None:
+    """High-water RSS of a live process (Linux /proc)."""
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def start_server(args: argparse.Namespace, port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "LLM_PROVIDER": "replay",
+        "MAX_CONCURRENT_RUNS": str(args.concurrency),
+        "MAX_CONCURRENT_DEMO_RUNS": str(args.concurrency),
+        "REPLAY_LATENCY_MODEL": args.latency_model,
+        "REPLAY_LATENCY_MS": str(args.latency_ms),
+        "REPLAY_LATENCY_SIGMA": str(args.latency_sigma),
+        "REPLAY_ERROR_RATE_429": str(args.error_rate_429),
+        "REPLAY_ERROR_RATE_503": str(args.error_rate_503),
+        "REPLAY_RPM_LIMIT": str(args.rpm),
+        "REPLAY_SEED": str(args.seed),
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env,
+    )
+
+
+async def wait_until_healthy(http: httpx.AsyncClient, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await http.get("/api/v1/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("Server did not become healthy in time")
+
+
+async def run_benchmark(args: argparse.Namespace) -> dict:
+    port = _free_port()
+    server = start_server(args, port)
+    if args.demo_replay:
+        form = {"demo_replay": args.demo_replay}
+        if args.demo_replay_scale is not None:
+            form["demo_replay_scale"] = str(args.demo_replay_scale)
+    else:
+        form = {"text": SAMPLE_BRIEF.read_text(encoding="utf-8")}
+    limits = httpx.Limits(max_connections=args.concurrency * 2 + 4)
+    timeout = httpx.Timeout(args.timeout)
+
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=timeout
+        ) as http:
+            await wait_until_healthy(http)
+
+            semaphore = asyncio.Semaphore(args.concurrency)
+
+            async def bounded() -> SessionResult:
+                async with semaphore:
+                    try:
+                        return await run_session(http, form)
+                    except httpx.HTTPError as exc:
+                        return SessionResult(ok=False, error=type(exc).__name__)
+
+            wall_start = time.monotonic()
+            results = await asyncio.gather(*(bounded() for _ in range(args.runs)))
+            wall_s = time.monotonic() - wall_start
+
+            server_metrics = (await http.get("/api/v1/metrics")).json()
+        peak_rss_mb = _peak_rss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    if peak_rss_mb is None:
+        # Non-Linux fallback: max RSS over terminated children (KB on Linux, bytes on macOS)
+        maxrss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak_rss_mb = round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+    succeeded = [r for r in results if r.ok]
+    agents = sorted({name for r in succeeded for name in r.agent_s})
+    total_run_s = sum(r.e2e_s for r in succeeded)
+    limiter_wait_s = server_metrics.get("llm", {}).get("rate_limit_wait_s", 0.0)
+
+    errors: dict[str, int] = {}
+    for r in results:
+        if not r.ok:
+            errors[r.error or "unknown"] = errors.get(r.error or "unknown", 0) + 1
+
+    return {
+        "config": {
+            "runs": args.runs,
+            "concurrency": args.concurrency,
+            "latency_model": args.latency_model,
+            "latency_ms": args.latency_ms,
+            "latency_sigma": args.latency_sigma,
+            "error_rate_429": args.error_rate_429,
+            "error_rate_503": args.error_rate_503,
+            "rpm_limit": args.rpm,
+            "seed": args.seed,
+            "demo_replay": args.demo_replay,
+            "demo_replay_scale": args.demo_replay_scale,
+        },
+        "wall_s": round(wall_s, 3),
+        "runs_succeeded": len(succeeded),
+        "runs_failed": len(results) - len(succeeded),
+        "errors": errors,
+        "rejected_409": sum(r.rejected for r in results),
+        "runs_per_min": round(len(succeeded) / wall_s * 60, 2) if wall_s else 0.0,
+        "e2e_s": summarize([r.e2e_s for r in succeeded]),
+        "time_to_first_event_s": summarize([r.first_event_s for r in results if r.first_event_s]),
+        "per_agent_s": {
+            name: summarize([r.agent_s[name] for r in succeeded if name in r.agent_s])
+            for name in agents
+        },
+        "rate_limit_wait_s": limiter_wait_s,
+        "rate_limit_wait_share": round(limiter_wait_s / total_run_s, 4) if total_run_s else 0.0,
+        "peak_rss_mb": peak_rss_mb,
+        "server_metrics": server_metrics,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="Total pipeline runs")
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent sessions")
+    parser.add_argument("--latency-model", choices=["fixed", "lognormal", "histogram"], default="fixed")
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Fixed latency or lognormal median")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate-429", type=float, default=0.0)
+    parser.add_argument("--error-rate-503", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="Simulated provider RPM limit (0 = off)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--demo-replay", choices=["instant", "recorded", "scaled"], default=None,
+                        help="Start demo-replay runs instead of replay-backend runs")
+    parser.add_argument("--demo-replay-scale", type=float, default=None)
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args))
+    path = write_results("load_pipeline", results, args.output)
+
+    e2e = results["e2e_s"]
+    print(f"{results['runs_succeeded']}/{args.runs} runs succeeded in {results['wall_s']}s "
+          f"({results['runs_per_min']} runs/min)")
+    print(f"end-to-end p50/p95/p99: {e2e['p50']}/{e2e['p95']}/{e2e['p99']}s")
+    ttfe = results["time_to_first_event_s"]
+    print(f"time to first event p50/p95: {ttfe['p50']}/{ttfe['p95']}s")
+    for name, stats in results["per_agent_s"].items():
+        print(f"  {name:22} p50/p95/p99: {stats['p50']}/{stats['p95']}/{stats['p99']}s")
+    print(f"rate limiter wait share: {results['rate_limit_wait_share']:.1%}  "
+          f"peak RSS: {results['peak_rss_mb']} MB")
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
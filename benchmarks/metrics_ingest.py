@@ -0,0 +1,119 @@
+"""Metrics ingestion benchmark — rows/sec and memory for a large streamed export.
+
+Writes a synthetic per-post, per-day CSV (or NDJSON) export to a temp file,
+then streams it through the ingestion path in 64 KiB chunks, the way request
+bodies arrive:
+
+    python -m benchmarks.metrics_ingest
+    python -m benchmarks.metrics_ingest --rows 5000000 --format ndjson --python-baseline
+
+--python-baseline also times a csv.DictReader loop over the same file, for
+comparison. Peak RSS is reported to show memory doesn't grow with the export.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import random
+import resource
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import write_results
+
+CHANNELS = ["Instagram", "TikTok", "YouTube Shorts", "Twitter/X", "Pinterest", "LinkedIn"]
+COLUMNS = ["date", "platform", "post_id", "impressions", "reach", "clicks", "purchases", "spend", "engagements"]
+READ_CHUNK = 64 * 1024
+
+
+def write_export(path: Path, rows: int, format: str, seed: int) -> None:
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8") as f:
+        if format == "csv":
+            f.write(",".join(COLUMNS) + "\n")
+        for i in range(rows):
+            impressions = rng.randint(100, 5_000)
+            values = [
+                f"2026-05-{i % 30 + 1:02d}", CHANNELS[i % len(CHANNELS)], f"p{i}", impressions,
+                impressions * 2 // 3, impressions // 100, impressions // 1000,
+                round(impressions * 0.01, 2), impressions // 20,
+            ]
+            if format == "csv":
+                f.write(",".join(map(str, values)) + "\n")
+            else:
+                f.write(json.dumps(dict(zip(COLUMNS, values))) + "\n")
+
+
+async def file_chunks(path: Path):
+    with path.open("rb") as f:
+        while chunk := f.read(READ_CHUNK):
+            yield chunk
+
+
+def python_baseline(path: Path) -> float:
+    """Seconds for a plain csv.DictReader aggregation of the same export."""
+    start = time.perf_counter()
+    totals: dict[str, list[float]] = {}
+    with path.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            sums = totals.setdefault(row["platform"], [0.0] * 6)
+            for i, name in enumerate(("impressions", "reach", "clicks", "purchases", "spend", "engagements")):
+                sums[i] += float(row[name])
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--block-bytes", type=int, default=8 * 1024 * 1024)
+    parser.add_argument("--python-baseline", action="store_true", help="Also time a csv.DictReader loop (CSV only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path")
+    args = parser.parse_args()
+
+    from app.metrics_ingestion import ingest_stream
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"export.{args.format}"
+        write_export(path, args.rows, args.format, args.seed)
+        size = path.stat().st_size
+        print(f"export: {args.rows:,} rows, {size / 1e6:.1f} MB ({args.format})")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        aggregator = asyncio.run(ingest_stream(
+            file_chunks(path), args.format, block_bytes=args.block_bytes, max_bytes=size + 1,
+        ))
+        wall_s = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        metrics = aggregator.to_performance_input("Benchmark")
+
+        results = {
+            "rows": aggregator.rows,
+            "bytes": size,
+            "blocks": aggregator.blocks,
+            "channels": len(metrics.channel_metrics),
+            "wall_s": round(wall_s, 3),
+            "rows_per_s": round(aggregator.rows / wall_s),
+            "mb_per_s": round(size / 1e6 / wall_s, 1),
+            # ru_maxrss is KiB on Linux
+            "peak_rss_growth_mb": round((rss_after - rss_before) / 1024, 1),
+        }
+        print(f"ingest: {wall_s:.2f} s, {results['rows_per_s']:,} rows/s, {results['mb_per_s']} MB/s, "
+              f"peak RSS +{results['peak_rss_growth_mb']} MB")
+
+        if args.python_baseline and args.format == "csv":
+            baseline_s = python_baseline(path)
+            results["python_baseline_s"] = round(baseline_s, 3)
+            results["speedup"] = round(baseline_s / wall_s, 1)
+            print(f"csv.DictReader: {baseline_s:.2f} s ({results['speedup']}x slower)")
+
+    path = write_results("metrics_ingest", results, args.output)
+    print(f"results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
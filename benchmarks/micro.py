@@ -0,0 +1,188 @@
+"""Micro benchmarks for the pipeline's hot CPU paths, with a regression baseline.
+
+Covers schema validation of maximal outputs (from dicts and from raw JSON
+text), model_dump for agent_complete events, SSE event serialization, the
+cached demo response and every agent's prompt rendering.
+
+    python -m benchmarks.micro                   # compare against the baseline
+    python -m benchmarks.micro --save-baseline   # record a new baseline
+    python -m benchmarks.micro --threshold 1.3 --filter validate
+
+A case fails when it is more than `threshold` times slower than its baseline
+(default 1.5x — a schema change that doubles validation cost fails).
+Exits non-zero on any failure so it can gate CI.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import sys
+import time
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks import payloads
+from benchmarks.common import write_results
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "micro.json"
+DEFAULT_THRESHOLD = 1.5
+
+
+def build_cases() -> dict[str, Callable[[], object]]:
+    """Name → zero-argument callable. Inputs are built once, outside the timed code."""
+    from app.agents import audience_researcher, brief_parser, content_calendar
+    from app.agents import creative_brief, performance_reporter
+    from app.metrics_engine import derive_metrics
+    from app.metrics_timeseries import SERIES_METRICS, MetricsTimeSeries
+    from app.schemas import (
+        AudienceOutput,
+        BriefParserInput,
+        BriefParserOutput,
+        CalendarOutput,
+        CalendarSummary,
+        CreativeBriefInput,
+        PerformanceInput,
+        PerformanceOutput,
+    )
+    from app.services.data_cache import data_cache
+    from app.services.pipeline_orchestrator import PipelineRun
+
+    calendar_dict = payloads.calendar_output()
+    performance_dict = payloads.performance_output()
+    calendar = CalendarOutput.model_validate(calendar_dict)
+    calendar_json = json.dumps(calendar_dict)
+    performance = PerformanceOutput.model_validate(performance_dict)
+    brief = BriefParserOutput.model_validate(payloads.brief_output())
+    audience = AudienceOutput.model_validate(payloads.audience_output())
+    creative_input = CreativeBriefInput(
+        brief_data=brief,
+        audience_data=audience,
+        calendar_summary=CalendarSummary(
+            campaign_duration=calendar.campaign_duration,
+            posting_frequency=calendar.posting_frequency,
+            channel_strategies=calendar.channel_strategies,
+            content_mix_rationale=calendar.content_mix_rationale,
+        ),
+    )
+    brief_input = BriefParserInput(raw_text=payloads._text(40_000), source_filename="brief.pdf")
+    metrics_input = PerformanceInput.model_validate(payloads.performance_input())
+    run = PipelineRun("00000000-0000-0000-0000-000000000000", "benchmark")
+    data_cache.preload()
+    # A year of daily metrics for the maximum 20 channels
+    rng = np.random.default_rng(0)
+    daily = rng.normal(1_000, 50, (20, 365, len(SERIES_METRICS))).clip(min=1)
+    year = MetricsTimeSeries([f"channel-{i}" for i in range(20)], datetime.date(2026, 1, 1), daily)
+
+    def emit_calendar() -> None:
+        # The full agent_complete path: model_dump_json → hash → orjson splice + frame once
+        run._emit_output("content_calendar", calendar)
+
+    def emit_calendar_via_dict() -> None:
+        # The previous path, for comparison: model_dump → canonical json hash → json.dumps
+        payload = calendar.model_dump(mode="json")
+        digest = hashlib.sha256(json.dumps(
+            payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")).hexdigest()
+        event = {"id": 1, "run_id": run.run_id, "timestamp": "2026-01-01T00:00:00+00:00",
+                 "event_type": "agent_complete", "content_hash": digest, "output": payload}
+        f"id: 1\r\nevent: agent_complete\r\ndata: {json.dumps(event)}\r\n\r\n".encode("utf-8")
+
+    return {
+        "validate.calendar_output": lambda: CalendarOutput.model_validate(calendar_dict),
+        "validate.performance_output": lambda: PerformanceOutput.model_validate(performance_dict),
+        # Provider text → model: the old json.loads + model_validate path vs generate_raw's
+        "validate.calendar_text_via_dict": lambda: CalendarOutput.model_validate(json.loads(calendar_json)),
+        "validate.calendar_text_json": lambda: CalendarOutput.model_validate_json(calendar_json),
+        "dump.calendar_output": lambda: calendar.model_dump(mode="json"),
+        "dump.performance_output": lambda: performance.model_dump(mode="json"),
+        "event.agent_complete_calendar": emit_calendar,
+        "event.agent_complete_calendar_via_dict": emit_calendar_via_dict,
+        "data.demo_response": data_cache.demo_response,
+        "prompt.brief_parser": lambda: brief_parser.build_prompt(brief_input),
+        "prompt.audience_researcher": lambda: audience_researcher.build_prompt(brief),
+        "prompt.content_calendar": lambda: content_calendar.build_prompt(brief, audience),
+        "prompt.creative_brief": lambda: creative_brief.build_prompt(creative_input),
+        "prompt.performance_reporter": lambda: performance_reporter.build_prompt(metrics_input),
+        "metrics.derive": lambda: derive_metrics(metrics_input),
+        "report.fast": lambda: performance_reporter.build_fast_report(metrics_input),
+        "timeseries.summarize_year": year.summarize,
+    }
+
+
+def measure(fn: Callable[[], object], repeats: int = 5) -> float:
+    """Best-of-`repeats` CPU time per call in microseconds.
+
+    WHY process time and min: these paths are pure CPU, and on a shared machine
+    noise only ever makes them slower — so the fastest repeat of CPU time (not
+    wall time) is the most stable estimate of their real cost.
+    """
+    timer = timeit.Timer(fn, timer=time.process_time)
+    number, _ = timer.autorange()
+    number *= 2  # autorange stops at ~0.2s; longer repeats smooth out scheduler noise
+    return min(timer.repeat(repeat=repeats, number=number)) / number * 1e6
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> dict[str, dict]:
+    """Per-case ratio against the baseline; `passed` is False above the threshold."""
+    report = {}
+    for name, current in results.items():
+        base = baseline.get(name)
+        ratio = current / base if base else None
+        report[name] = {
+            "us_per_op": round(current, 3),
+            "baseline_us_per_op": base,
+            "ratio": round(ratio, 3) if ratio is not None else None,
+            # Cases with no baseline yet are reported but never fail
+            "passed": ratio is None or ratio <= threshold,
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--filter", default="", help="Only run cases containing this substring")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path")
+    args = parser.parse_args()
+
+    cases = {name: fn for name, fn in build_cases().items() if args.filter in name}
+    results = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, args.repeats)
+        print(f"{name:36} {results[name]:>12.2f} µs/op")
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        existing = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        existing.update({name: round(us, 3) for name, us in results.items()})
+        args.baseline.write_text(json.dumps(dict(sorted(existing.items())), indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    report = compare(results, baseline, args.threshold)
+    failed = [name for name, row in report.items() if not row["passed"]]
+
+    print()
+    for name, row in report.items():
+        ratio = f"{row['ratio']:.2f}x" if row["ratio"] is not None else "new"
+        print(f"{'FAIL' if not row['passed'] else 'ok  '} {name:36} {ratio}")
+
+    path = write_results("micro", {"threshold": args.threshold, "cases": report}, args.output)
+    print(f"results written to {path}")
+    if failed:
+        print(f"{len(failed)} case(s) slower than {args.threshold}x baseline: {', '.join(failed)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
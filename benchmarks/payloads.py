@@ -0,0 +1,203 @@
+"""Realistic maximal payloads — every list at its schema max_length, text near its limits.
+
+Shared by the micro benchmarks so timings reflect the worst case the pipeline
+can legitimately produce (100 calendar entries, 20 channels, 5 personas).
+"""
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+CHANNELS = [
+    "Instagram", "TikTok", "YouTube Shorts", "Twitter/X", "LinkedIn", "Pinterest",
+    "Facebook", "Snapchat", "Threads", "Reddit", "Twitch", "Discord", "BeReal",
+    "Tumblr", "WhatsApp", "Telegram", "Spotify", "Podcast", "Email", "Blog",
+]
+CONTENT_TYPES = ["Reel", "Carousel", "Story", "Static Post", "Thread", "Short", "Live"]
+
+SENTENCE = "Sun-soaked product moments that feel native to the feed and drive saves. "
+
+
+def _text(chars: int) -> str:
+    return (SENTENCE * (chars // len(SENTENCE) + 1))[:chars].strip()
+
+
+def brief_output() -> dict:
+    return {
+        "campaign_name": "Summer Vibes 2026 — Sunset Beverages Sparkling Launch",
+        "client_name": "Sunset Beverages Co.",
+        "objectives": [f"Objective {i}: {_text(120)}" for i in range(10)],
+        "target_audience": _text(1800),
+        "budget": "$150,000 across paid social, influencer and production",
+        "timeline": "8 weeks, May 1 - June 30, 2026, with a 2-week teaser phase",
+        "kpis": [f"KPI {i}: {_text(60)}" for i in range(10)],
+        "channels": CHANNELS[:10],
+        "key_messages": [f"Message {i}: {_text(100)}" for i in range(10)],
+        "constraints": [f"Constraint {i}: {_text(80)}" for i in range(10)],
+        "raw_summary": _text(900),
+        "missing_fields": [],
+    }
+
+
+def audience_output() -> dict:
+    return {
+        "personas": [
+            {
+                "name": f"Persona {i}",
+                "age_range": "25-34",
+                "description": _text(480),
+                "motivations": [_text(60) for _ in range(10)],
+                "pain_points": [_text(60) for _ in range(10)],
+                "preferred_channels": CHANNELS[:10],
+                "content_preferences": CONTENT_TYPES + ["UGC", "Tutorial", "Behind the scenes"],
+            }
+            for i in range(5)
+        ],
+        "targeting_recommendations": [_text(150) for _ in range(10)],
+        "audience_size_estimate": "12-15M reachable users across the target demographic",
+        "key_insights": [_text(150) for _ in range(10)],
+        "suggested_tone": "Casual, energetic and authentic — playful but never preachy",
+    }
+
+
+def calendar_output() -> dict:
+    return {
+        "campaign_duration": "8 weeks (May 1 - June 30, 2026)",
+        "posting_frequency": "12 posts per week across all channels",
+        "entries": [
+            {
+                "week": i // 12 + 1,
+                "day": DAYS[i % 7],
+                "channel": CHANNELS[i % 10],
+                "content_type": CONTENT_TYPES[i % len(CONTENT_TYPES)],
+                "topic": _text(150),
+                "caption_hook": _text(300),
+                "hashtags": [f"#Tag{i}_{j}" for j in range(10)],
+                "notes": _text(300),
+            }
+            for i in range(100)
+        ],
+        "channel_strategies": [
+            {"channel": channel, "strategy": _text(450)} for channel in CHANNELS[:10]
+        ],
+        "content_mix_rationale": _text(950),
+    }
+
+
+def performance_input() -> dict:
+    return {
+        "campaign_name": "Summer Vibes 2026 — Sunset Beverages",
+        "reporting_period": "May 1 - June 30, 2026 (8 weeks)",
+        "channel_metrics": [
+            {
+                "channel": channel,
+                "impressions": 2_800_000 + i * 10_000,
+                "reach": 1_400_000 + i * 5_000,
+                "engagement_rate": 4.7,
+                "clicks": 28_000 + i * 100,
+                "conversions": 4_200 + i * 10,
+                "spend": 32_000.0 + i * 500,
+            }
+            for i, channel in enumerate(CHANNELS)
+        ],
+        "goals": [f"Goal {i}: 5M social impressions" for i in range(10)],
+    }
+
+
+def performance_output() -> dict:
+    return {
+        "executive_summary": _text(1900),
+        "overall_performance": "Exceeding targets",
+        "channel_analysis": [
+            {
+                "channel": channel,
+                "performance_rating": "Strong",
+                "key_metric": _text(150),
+                "insight": _text(450),
+                "recommendation": _text(450),
+            }
+            for channel in CHANNELS
+        ],
+        "top_performing_content": [_text(120) for _ in range(10)],
+        "recommendations": [_text(200) for _ in range(10)],
+        "next_steps": [_text(200) for _ in range(10)],
+        "key_metrics_summary": [
+            {"metric_name": f"Metric {i}", "value": "7.4M", "trend": "up"} for i in range(20)
+        ],
+    }
+
+
+def creative_brief_output() -> dict:
+    return {
+        "project_name": "Summer Vibes 2026 Campaign",
+        "prepared_for": "Sunset Beverages Co.",
+        "date": "2026-03-01",
+        "background": _text(1900),
+        "objective": _text(900),
+        "target_audience_summary": _text(900),
+        "key_message": _text(450),
+        "supporting_messages": [_text(150) for _ in range(10)],
+        "tone_and_voice": _text(450),
+        "visual_direction": _text(900),
+        "deliverables": [_text(80) for _ in range(20)],
+        "timeline_summary": _text(450),
+        "success_metrics": [_text(80) for _ in range(10)],
+        "mandatory_inclusions": [_text(80) for _ in range(10)],
+    }
+
+
+def make_pdf(pages: list[str]) -> bytes:
+    """A minimal valid PDF with one Helvetica text line per entry in each page.
+
+    Lines are split on newlines. No external PDF writer needed — the xref
+    offsets are computed here.
+    """
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", b""]  # Pages filled in below
+    font_id = 3
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    page_ids = []
+    for text in pages:
+        lines = []
+        for line in text.split("\n"):
+            escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            lines.append(f"({escaped}) Tj 0 -14 Td")
+        stream = f"BT /F1 11 Tf 50 780 Td {' '.join(lines)} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_id, content_id)
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def pdf_corpus() -> dict[str, bytes]:
+    """Sample briefs as PDFs, from one page to past MAX_PDF_PAGES."""
+    from pathlib import Path
+
+    sample = (Path(__file__).parent.parent / "data" / "sample_brief.txt").read_text(encoding="utf-8")
+    # make_pdf writes Latin-1 strings; swap anything else (em dashes etc.) for "?"
+    sample = sample.encode("latin-1", "replace").decode("latin-1")
+    lines = [line[:90] for line in sample.splitlines()]
+
+    def pages(count: int, lines_per_page: int = 45) -> list[str]:
+        body = (lines * (count * lines_per_page // len(lines) + 1))[:count * lines_per_page]
+        return ["\n".join(body[i:i + lines_per_page]) for i in range(0, len(body), lines_per_page)]
+
+    return {
+        "sample_brief": make_pdf(["\n".join(lines)]),
+        "brief_5p": make_pdf(pages(5)),
+        "brief_20p": make_pdf(pages(20)),
+        "brief_30p": make_pdf(pages(30)),
+        "sparse_pages": make_pdf(["Appendix", "", "Notes: see page 1"]),
+    }
@@ -0,0 +1,100 @@
+"""PDF extraction benchmark — tiered fast pass vs pdfplumber, speed and parity.
+
+Runs both paths in-process (no pool, so timings are pure extraction cost)
+over a corpus of sample briefs, plus any PDFs in --corpus:
+
+    python -m benchmarks.pdf_extraction
+    python -m benchmarks.pdf_extraction --corpus ~/briefs --repeats 5
+
+Parity is the similarity of the two outputs after whitespace is collapsed
+(1.0 = identical words in identical order). Exits non-zero if any document
+falls below --min-parity, so an extractor change that loses text fails.
+"""
+
+import argparse
+import difflib
+import sys
+import time
+from pathlib import Path
+
+from benchmarks import payloads
+from benchmarks.common import write_results
+
+DEFAULT_MIN_PARITY = 0.98
+
+
+def load_corpus(directory: Path | None) -> dict[str, bytes]:
+    corpus = payloads.pdf_corpus()
+    if directory is not None:
+        corpus.update({path.name: path.read_bytes() for path in sorted(directory.glob("*.pdf"))})
+    return corpus
+
+
+def best_time(fn, repeats: int) -> tuple[float, object]:
+    """Fastest of `repeats` wall-clock runs in ms, with the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def parity(a: str, b: str) -> float:
+    return difflib.SequenceMatcher(None, " ".join(a.split()), " ".join(b.split()), autojunk=False).ratio()
+
+
+def bench_document(data: bytes, repeats: int) -> dict:
+    from app.pdf_extraction import MAX_PDF_PAGES, _extract_pages, _page_count
+
+    pages = min(_page_count(data), MAX_PDF_PAGES)
+    plumber_ms, (plumber_texts, _) = best_time(lambda: _extract_pages(data, 0, pages, fast=False), repeats)
+    tiered_ms, (tiered_texts, fallback) = best_time(lambda: _extract_pages(data, 0, pages, fast=True), repeats)
+    return {
+        "pages": pages,
+        "fallback_pages": fallback,
+        "pdfplumber_ms": round(plumber_ms, 2),
+        "tiered_ms": round(tiered_ms, 2),
+        "speedup": round(plumber_ms / tiered_ms, 2) if tiered_ms else None,
+        "parity": round(parity("\n\n".join(plumber_texts), "\n\n".join(tiered_texts)), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, default=None, help="Directory of extra PDFs to include")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--min-parity", type=float, default=DEFAULT_MIN_PARITY)
+    parser.add_argument("--output", type=Path, default=None, help="Results JSON path")
+    args = parser.parse_args()
+
+    documents = {}
+    for name, data in load_corpus(args.corpus).items():
+        documents[name] = row = bench_document(data, args.repeats)
+        print(
+            f"{name:24} {row['pages']:>3}p  pdfplumber {row['pdfplumber_ms']:>9.2f} ms  "
+            f"tiered {row['tiered_ms']:>8.2f} ms  {row['speedup'] or 0:>6.1f}x  "
+            f"parity {row['parity']:.4f}  fallback {row['fallback_pages']}"
+        )
+
+    plumber_total = sum(row["pdfplumber_ms"] for row in documents.values())
+    tiered_total = sum(row["tiered_ms"] for row in documents.values())
+    summary = {
+        "pdfplumber_ms": round(plumber_total, 2),
+        "tiered_ms": round(tiered_total, 2),
+        "speedup": round(plumber_total / tiered_total, 2) if tiered_total else None,
+        "min_parity": min((row["parity"] for row in documents.values()), default=1.0),
+    }
+    print(f"\ntotal: pdfplumber {plumber_total:.1f} ms, tiered {tiered_total:.1f} ms ({summary['speedup']}x)")
+
+    path = write_results("pdf_extraction", {"summary": summary, "documents": documents}, args.output)
+    print(f"results written to {path}")
+    below = [name for name, row in documents.items() if row["parity"] < args.min_parity]
+    if below:
+        print(f"{len(below)} document(s) below parity {args.min_parity}: {', '.join(below)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Tests for the columnar analytics store: partitioned writes and vectorized group-bys."""
+
+import asyncio
+import datetime
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.schemas import AudienceOutput, CalendarOutput, PerformanceOutput
+from app.services.analytics_store import COMPACT_FILES, AnalyticsStore
+from benchmarks import payloads
+
+DAY = datetime.datetime(2026, 5, 1, 12, tzinfo=datetime.timezone.utc)
+
+
+def _calendar(channels: list[str], hashtags: list[str]) -> CalendarOutput:
+    entry = payloads.calendar_output()["entries"][0]
+    return CalendarOutput.model_validate({
+        **payloads.calendar_output(),
+        "entries": [{**entry, "channel": channel, "hashtags": hashtags} for channel in channels],
+    })
+
+
+async def _record(store: AnalyticsStore, run_id: str, calendar: CalendarOutput, **kwargs) -> None:
+    await store.record_run(run_id, campaign_name="Summer Vibes", calendar=calendar, **kwargs)
+
+
+class TestAnalyticsStore:
+
+    @pytest.mark.asyncio
+    async def test_rows_are_written_partitioned_by_date(self, tmp_path):
+        store = AnalyticsStore(tmp_path, flush_rows=1)
+        await _record(store, "r1", _calendar(["TikTok"], ["#a"]), completed_at=DAY)
+        await _record(store, "r2", _calendar(["TikTok"], ["#a"]),
+                      completed_at=DAY + datetime.timedelta(days=1))
+
+        partitions = sorted(p.name for p in (tmp_path / "calendar_entries").iterdir())
+        assert partitions == ["date=2026-05-01", "date=2026-05-02"]
+        assert store.stats()["rows_written"] == 2
+
+    @pytest.mark.asyncio
+    async def test_buffers_until_flush_threshold(self, tmp_path):
+        store = AnalyticsStore(tmp_path, flush_rows=1000)
+        await _record(store, "r1", _calendar(["TikTok", "Instagram"], ["#a"]))
+
+        assert store.stats()["buffered_rows"] == 2
+        assert not (tmp_path / "calendar_entries").exists()
+
+        # Queries see buffered rows, read from memory — no flush
+        result = await store.group_by("calendar_entries", ["channel"])
+        assert result["rows_scanned"] == 2
+        assert not (tmp_path / "calendar_entries").exists()
+
+    @pytest.mark.asyncio
+    async def test_query_combines_written_and_buffered_rows(self, tmp_path):
+        store = AnalyticsStore(tmp_path, flush_rows=2)
+        for run_id in ("r1", "r2", "r3"):
+            await _record(store, run_id, _calendar(["TikTok"], ["#a"]), completed_at=DAY, tenant="acme")
+
+        result = await store.group_by("calendar_entries", ["date", "channel", "channel"], tenant="acme")
+
+        stats = store.stats()
+        assert (stats["rows_written"], stats["buffered_rows"]) == (2, 1)
+        assert result["group_by"] == ["date", "channel"]
+        assert result["rows"] == [{"date": "2026-05-01", "channel": "TikTok", "count": 3, "runs": 3}]
+
+    @pytest.mark.asyncio
+    async def test_recording_does_not_wait_for_file_io(self, tmp_path):
+        store = AnalyticsStore(tmp_path, flush_rows=1000)
+
+        with store._files_lock:  # A scan or compaction running in a worker thread
+            await asyncio.wait_for(_record(store, "r1", _calendar(["TikTok"], ["#a"])), timeout=1)
+
+        assert store.stats()["buffered_rows"] == 1
+
+    @pytest.mark.asyncio
+    async def test_partition_files_are_compacted(self, tmp_path):
+        store = AnalyticsStore(tmp_path, flush_rows=1)
+        for i in range(COMPACT_FILES + 1):
+            await _record(store, f"r{i}", _calendar(["TikTok"], ["#a"]), completed_at=DAY)
+
+        parts = list((tmp_path / "calendar_entries" / "date=2026-05-01").glob("*.parquet"))
+        assert len(parts) == 2
+        assert store.stats()["compactions"] == 1
+        result = await store.group_by("calendar_entries", ["channel"])
+        assert result["rows"] == [{"channel": "TikTok", "count": COMPACT_FILES + 1, "runs": COMPACT_FILES + 1}]
+
+    @pytest.mark.asyncio
+    async def test_interrupted_compaction_is_finished_on_restart(self, tmp_path, monkeypatch):
+        store = AnalyticsStore(tmp_path, flush_rows=1)
+
+        def crash(tmp):
+            # Killed after removing the first part, before the merged file is renamed in
+            part = sorted(tmp.parent.glob("part-*.parquet"))[0]
+            part.unlink()
+            raise SystemExit
+
+        monkeypatch.setattr(store, "_finish_compaction", crash)
+        with pytest.raises(SystemExit):
+            for i in range(COMPACT_FILES):
+                await _record(store, f"r{i}", _calendar(["TikTok"], ["#a"]), completed_at=DAY)
+
+        restarted = AnalyticsStore(tmp_path, flush_rows=1)
+        directory = tmp_path / "calendar_entries" / "date=2026-05-01"
+        assert [p.name.split("-")[0] for p in directory.iterdir()] == ["part"]
+        result = await restarted.group_by("calendar_entries", ["channel"])
+        assert result["rows"] == [{"channel": "TikTok", "count": COMPACT_FILES, "runs": COMPACT_FILES}]
+
+    @pytest.mark.asyncio
+    async def test_incomplete_compaction_is_dropped_on_restart(self, tmp_path):
+        store = AnalyticsStore(tmp_path, flush_rows=1)
+        await _record(store, "r1", _calendar(["TikTok"], ["#a"]), completed_at=DAY)
+        directory = tmp_path / "calendar_entries" / "date=2026-05-01"
+        (directory / "_compacting-cut.parquet").write_bytes(b"PAR1 truncated")
+
+        restarted = AnalyticsStore(tmp_path, flush_rows=1)
+        assert not (directory / "_compacting-cut.parquet").exists()
+        result = await restarted.group_by("calendar_entries", ["channel"])
+        assert result["rows"][0]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_group_by_counts_rows_and_runs(self, tmp_path):
+        store = AnalyticsStore(tmp_path)
+        await _record(store, "r1", _calendar(["TikTok", "TikTok", "Instagram"], ["#a"]))
+        await _record(store, "r2", _calendar(["TikTok"], ["#a"]))
+
+        result = await store.group_by("calendar_entries", ["channel"])
+
+        assert result["rows"] == [
+            {"channel": "TikTok", "count": 3, "runs": 2},
+            {"channel": "Instagram", "count": 1, "runs": 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_group_by_list_column_explodes_items(self, tmp_path):
+        store = AnalyticsStore(tmp_path)
+        await _record(store, "r1", _calendar(["TikTok"], ["#summer", "#fizz"]))
+        await _record(store, "r2", _calendar(["Instagram"], ["#summer"]))
+
+        result = await store.group_by("calendar_entries", ["hashtags"])
+
+        assert result["rows"] == [
+            {"hashtags": "#summer", "count": 2, "runs": 2},
+            {"hashtags": "#fizz", "count": 1, "runs": 1},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_filters_by_date_and_tenant(self, tmp_path):
+        store = AnalyticsStore(tmp_path)
+        await _record(store, "r1", _calendar(["TikTok"], []), completed_at=DAY, tenant="acme")
+        await _record(store, "r2", _calendar(["TikTok"], []),
+                      completed_at=DAY + datetime.timedelta(days=3), tenant="acme")
+        await _record(store, "r3", _calendar(["TikTok"], []), completed_at=DAY, tenant="other")
+
+        result = await store.group_by(
+            "calendar_entries", ["date"], since=DAY.date(), until=DAY.date(), tenant="acme"
+        )
+
+        assert result["rows"] == [{"date": "2026-05-01", "count": 1, "runs": 1}]
+
+    @pytest.mark.asyncio
+    async def test_records_personas_and_performance_tables(self, tmp_path):
+        store = AnalyticsStore(tmp_path)
+        await store.record_run(
+            "r1", campaign_name="Summer Vibes",
+            audience=AudienceOutput.model_validate(payloads.audience_output()),
+            performance=PerformanceOutput.model_validate(payloads.performance_output()),
+        )
+
+        personas = await store.group_by("personas", ["preferred_channels"])
+        trends = await store.group_by("metric_summaries", ["trend"])
+        analysis = await store.group_by("channel_analysis", ["performance_rating"])
+
+        assert personas["rows_scanned"] == 5
+        assert sum(row["count"] for row in trends["rows"]) == 20
+        assert analysis["groups"] >= 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_columns_and_tables(self, tmp_path):
+        store = AnalyticsStore(tmp_path)
+        with pytest.raises(ValueError, match="Unknown analytics table"):
+            await store.group_by("nope", ["channel"])
+        with pytest.raises(ValueError, match="Unknown column"):
+            await store.group_by("calendar_entries", ["spend"])
+
+    @pytest.mark.asyncio
+    async def test_disabled_store_records_nothing(self):
+        store = AnalyticsStore("")
+        await _record(store, "r1", _calendar(["TikTok"], []))
+        assert store.stats()["enabled"] is False
+        assert store.stats()["rows_written"] == 0
+
+
+class TestAnalyticsRoute:
+
+    @pytest.mark.asyncio
+    async def test_group_by_endpoint(self, tmp_path, monkeypatch):
+        from app.main import app
+        from app.routers import analytics
+
+        store = AnalyticsStore(tmp_path)
+        monkeypatch.setattr(analytics, "analytics_store", store)
+        await _record(store, "r1", _calendar(["TikTok", "Instagram"], ["#a"]))
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            ok = await client.get("/api/v1/analytics/calendar_entries", params={"group_by": "channel"})
+            bad_column = await client.get("/api/v1/analytics/calendar_entries", params={"group_by": "spend"})
+            bad_table = await client.get("/api/v1/analytics/nope", params={"group_by": "channel"})
+            repeated = await client.get("/api/v1/analytics/calendar_entries", params={"group_by": "channel,channel"})
+
+        assert ok.status_code == 200
+        assert {row["channel"] for row in ok.json()["rows"]} == {"TikTok", "Instagram"}
+        assert bad_column.status_code == 422
+        assert bad_table.status_code == 404
+        assert repeated.json()["rows"] == ok.json()["rows"]
@@ -0,0 +1,76 @@
+"""Tests for benchmark helpers (the benchmarks themselves run outside pytest)."""
+
+import httpx
+import pytest
+
+from app.schemas import CalendarOutput, CreativeBriefOutput, PerformanceInput, PerformanceOutput
+from benchmarks import payloads
+from benchmarks.common import percentile, summarize
+from benchmarks.load_pipeline import iter_sse
+from benchmarks.micro import build_cases, compare
+
+
+class TestStats:
+
+    def test_percentile_interpolates(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 50) == 2.5
+        assert percentile(values, 100) == 4.0
+
+    def test_percentile_empty(self):
+        assert percentile([], 95) == 0.0
+
+    def test_summarize(self):
+        stats = summarize([float(i) for i in range(1, 101)])
+        assert stats["count"] == 100
+        assert stats["p50"] == 50.5
+        assert stats["p99"] == pytest.approx(99.01)
+
+
+class TestSSEParsing:
+
+    @pytest.mark.asyncio
+    async def test_iter_sse_parses_events_and_skips_pings(self):
+        body = (
+            b": ping\r\n\r\n"
+            b"event: status_update\r\nid: 1\r\ndata: {\"a\": 1}\r\n\r\n"
+            b"event: pipeline_complete\r\nid: 2\r\ndata: {}\r\n\r\n"
+        )
+        response = httpx.Response(200, content=body)
+
+        events = [event async for event in iter_sse(response)]
+
+        assert events == [
+            {"event": "status_update", "id": "1", "data": '{"a": 1}'},
+            {"event": "pipeline_complete", "id": "2", "data": "{}"},
+        ]
+
+
+class TestMicroBenchmarks:
+
+    def test_payloads_are_valid_and_maximal(self):
+        calendar = CalendarOutput.model_validate(payloads.calendar_output())
+        metrics = PerformanceInput.model_validate(payloads.performance_input())
+        PerformanceOutput.model_validate(payloads.performance_output())
+        CreativeBriefOutput.model_validate(payloads.creative_brief_output())
+
+        assert len(calendar.entries) == 100
+        assert len(metrics.channel_metrics) == 20
+
+    def test_every_case_runs(self):
+        for fn in build_cases().values():
+            fn()
+
+    def test_compare_flags_regressions_over_threshold(self):
+        report = compare(
+            {"fast": 10.0, "slow": 25.0, "new": 5.0},
+            {"fast": 10.0, "slow": 10.0},
+            threshold=1.5,
+        )
+
+        assert report["fast"]["passed"] is True
+        assert report["slow"]["passed"] is False
+        assert report["slow"]["ratio"] == 2.5
+        assert report["new"]["passed"] is True
+        assert report["new"]["ratio"] is None
@@ -0,0 +1,83 @@
+"""Tests for the calendar slot scheduler: timeline parsing, posting frequency and format rotation."""
+
+import pytest
+
+from app.calendar_scheduler import DEFAULT_WEEKS, channel_rule, schedule_calendar, timeline_weeks
+from app.schemas import AudienceOutput, BriefParserOutput, Persona
+
+
+def _brief(channels: list[str], timeline: str = "4 weeks", key_messages: list[str] | None = None) -> BriefParserOutput:
+    return BriefParserOutput(
+        campaign_name="Summer Splash", client_name="FreshCo", objectives=["Awareness"],
+        target_audience="Gen Z", key_messages=["Real fruit", "Zero sugar"] if key_messages is None else key_messages,
+        timeline=timeline, budget=None, channels=channels, kpis=[], constraints=[], raw_summary="",
+    )
+
+
+def _audience(preferred_channels: list[str] = (), content_preferences: list[str] = ()) -> AudienceOutput:
+    return AudienceOutput(
+        personas=[Persona(
+            name="Wellness Wendy", age_range="22-28", description="Health-conscious professional",
+            motivations=[], pain_points=[], preferred_channels=list(preferred_channels),
+            content_preferences=list(content_preferences),
+        )],
+        targeting_recommendations=[], audience_size_estimate="2M", key_insights=[], suggested_tone="Upbeat",
+    )
+
+
+class TestTimeline:
+
+    @pytest.mark.parametrize(("timeline", "weeks"), [
+        ("8 weeks, May-June 2026", 8),
+        ("A 6-week push", 6),
+        ("3 months from launch", 13),
+        ("Launch in May", DEFAULT_WEEKS),
+        ("104 weeks", 52),
+    ])
+    def test_timeline_weeks(self, timeline, weeks):
+        assert timeline_weeks(timeline) == weeks
+
+    def test_channel_rules_match_by_name(self):
+        assert channel_rule("Instagram Reels") is channel_rule("instagram")
+        assert channel_rule("X") is channel_rule("Twitter")
+        assert len(channel_rule("Snapchat").days) == 3
+
+
+class TestSchedule:
+
+    def test_grid_order_frequency_and_focus(self):
+        schedule = schedule_calendar(_brief(["TikTok", "Instagram"]), _audience())
+
+        assert schedule.weeks == 4
+        assert schedule.posting_frequency() == "TikTok 5/week, Instagram 4/week"
+        assert len(schedule.slots) == 4 * 9
+        # Week, weekday, then brief channel order
+        assert [(s.day, s.channel) for s in schedule.slots[:3]] == [
+            ("Monday", "Instagram"), ("Tuesday", "TikTok"), ("Wednesday", "TikTok"),
+        ]
+        assert [s.focus for s in schedule.slots if s.day == "Monday"] == ["Real fruit", "Zero sugar"] * 2
+
+    def test_preferences_lead_the_rotation_and_add_a_day(self):
+        audience = _audience(preferred_channels=["Instagram"], content_preferences=["Carousel posts"])
+        schedule = schedule_calendar(_brief(["Instagram"]), audience)
+
+        week_one = [s for s in schedule.slots if s.week == 1]
+        assert [s.day for s in week_one] == ["Monday", "Wednesday", "Friday", "Saturday", "Sunday"]
+        types = [s.content_type for s in schedule.slots]
+        assert types[:3] == ["Carousel", "Carousel", "Reel"]
+        assert types.count("Carousel") == 2 * types.count("Reel")
+        assert all(s.preferred == (s.content_type == "Carousel") for s in schedule.slots)
+
+    def test_long_timeline_trimmed_to_the_entry_limit(self):
+        schedule = schedule_calendar(_brief(["Instagram", "TikTok", "X"], "6 months"), _audience())
+
+        # 14 posts a week — 7 whole weeks fit in 100 entries
+        assert schedule.weeks == 7
+        assert len(schedule.slots) == 98
+        assert schedule.campaign_duration() == "7 weeks (of 26, capped at 100 posts)"
+
+    def test_deterministic_with_channels_deduplicated(self):
+        args = (_brief(["TikTok", "LinkedIn", "tiktok"]), _audience(["LinkedIn"], ["Short-form video"]))
+        first = schedule_calendar(*args)
+        assert first == schedule_calendar(*args)
+        assert [name for name, _, _ in first.channels] == ["TikTok", "LinkedIn"]
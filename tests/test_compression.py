@@ -0,0 +1,157 @@
+"""Tests for negotiated response compression on JSON and streaming SSE responses."""
+
+import zlib
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.compression import CompressionMiddleware, CompressionStats, _Gzip, negotiate
+
+
+def _sse_app(chunks: list[bytes]):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream; charset=utf-8")]})
+        for chunk in chunks:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+    return app
+
+
+def _json_app(body: bytes):
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+    return app
+
+
+async def _call(app, accept_encoding: str = "gzip") -> list[dict]:
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {"type": "http", "method": "GET", "path": "/test",
+             "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    await app(scope, receive, send)
+    return sent
+
+
+class TestNegotiate:
+
+    ENCODINGS = {"zstd": object, "br": object, "gzip": object}
+
+    def test_server_preference_breaks_ties(self):
+        assert negotiate("gzip, br, zstd", self.ENCODINGS) == "zstd"
+
+    def test_client_q_values_win(self):
+        assert negotiate("gzip;q=1.0, br;q=0.5", self.ENCODINGS) == "gzip"
+
+    def test_unsupported_or_refused_means_identity(self):
+        assert negotiate("deflate", self.ENCODINGS) is None
+        assert negotiate("gzip;q=0", {"gzip": object}) is None
+        assert negotiate("", self.ENCODINGS) is None
+
+    def test_wildcard(self):
+        assert negotiate("*", {"gzip": object}) == "gzip"
+
+
+class TestCompressionMiddleware:
+
+    @pytest.mark.asyncio
+    async def test_each_sse_event_is_flushed_on_its_own(self):
+        events = [f"event: status_update\r\ndata: {{\"n\": {i}}}\r\n\r\n".encode() for i in range(3)]
+        sent = await _call(CompressionMiddleware(_sse_app(events), min_bytes=512, stats=CompressionStats()))
+
+        headers = dict(sent[0]["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert b"content-length" not in headers
+
+        # Every chunk decodes to exactly its event without waiting for later chunks
+        decompressor = zlib.decompressobj(31)
+        bodies = [m["body"] for m in sent[1:-1]]
+        assert [decompressor.decompress(body) for body in bodies] == events
+        decompressor.decompress(sent[-1]["body"])
+        assert decompressor.eof
+
+    @pytest.mark.asyncio
+    async def test_small_json_skips_compression(self):
+        body = b'{"status": "healthy"}'
+        sent = await _call(CompressionMiddleware(_json_app(body), min_bytes=512, stats=CompressionStats()))
+
+        headers = dict(sent[0]["headers"])
+        assert b"content-encoding" not in headers
+        assert headers[b"vary"] == b"Accept-Encoding"
+        assert sent[1]["body"] == body
+
+    @pytest.mark.asyncio
+    async def test_large_json_is_compressed_with_length(self):
+        body = b'{"entries": [' + b'{"topic": "Launch teaser"},' * 200 + b'{}]}'
+        stats = CompressionStats()
+        sent = await _call(CompressionMiddleware(_json_app(body), min_bytes=512, stats=stats))
+
+        headers = dict(sent[0]["headers"])
+        assert headers[b"content-encoding"] == b"gzip"
+        assert int(headers[b"content-length"]) == len(sent[1]["body"])
+        assert zlib.decompress(sent[1]["body"], 31) == body
+        assert stats.snapshot()["/test"]["ratio"] > 5
+
+    @pytest.mark.asyncio
+    async def test_identity_when_client_does_not_accept(self):
+        body = b"x" * 2000
+        sent = await _call(CompressionMiddleware(_json_app(body), min_bytes=0), accept_encoding="identity")
+
+        assert b"content-encoding" not in dict(sent[0]["headers"])
+        assert sent[1]["body"] == body
+
+    @pytest.mark.asyncio
+    async def test_response_with_etag_passes_through(self):
+        body = b"x" * 2000
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"application/json"), (b"etag", b'"abc"')]})
+            await send({"type": "http.response.body", "body": body})
+
+        sent = await _call(CompressionMiddleware(app, min_bytes=0), accept_encoding="br, gzip")
+
+        assert b"content-encoding" not in dict(sent[0]["headers"])
+        assert sent[1]["body"] == body
+
+    @pytest.mark.asyncio
+    async def test_disconnected_stream_is_still_counted(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-type", b"text/event-stream")]})
+            await send({"type": "http.response.body", "body": b"data: {}\r\n\r\n" * 50, "more_body": True})
+            raise OSError("client went away")
+
+        stats = CompressionStats()
+        with pytest.raises(OSError):
+            await _call(CompressionMiddleware(app, min_bytes=0, stats=stats))
+
+        assert stats.snapshot()["/test"]["raw_bytes"] == 600
+
+    def test_gzip_sync_flush_round_trips(self):
+        gzip = _Gzip()
+        data = gzip.compress(b"hello ") + gzip.compress(b"world") + gzip.finish()
+        assert zlib.decompress(data, 31) == b"hello world"
+
+
+@pytest.mark.asyncio
+async def test_demo_endpoint_is_gzipped():
+    from app.main import app
+    from app.replay_client import ReplayLLMClient
+    from app.services.pipeline_orchestrator import PipelineOrchestrator
+
+    app.state.orchestrator = PipelineOrchestrator(ReplayLLMClient())
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/api/v1/pipeline/demo", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["demo"] is True
@@ -0,0 +1,147 @@
+"""Tests for token-budgeted context compaction of agent prompts."""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.agents.creative_brief import TOKEN_BUDGET as CREATIVE_BUDGET, generate_creative_brief
+from app.context_compaction import (
+    PromptField,
+    collect_reports,
+    compact_prompt,
+    estimate_tokens,
+    first_sentence,
+)
+from app.schemas import (
+    AudienceOutput,
+    BriefParserOutput,
+    CalendarSummary,
+    ChannelStrategy,
+    CreativeBriefInput,
+)
+from tests.test_agents import (
+    SAMPLE_AUDIENCE_OUTPUT,
+    SAMPLE_BRIEF_OUTPUT,
+    SAMPLE_CREATIVE_BRIEF_OUTPUT,
+)
+
+TEMPLATE = "Header text.\n<data>\nA: {a}\nB: {b}\n</data>"
+
+
+class TestEstimateTokens:
+
+    def test_rounds_up(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abcd") == 1
+        assert estimate_tokens("abcde") == 2
+
+    def test_first_sentence(self):
+        assert first_sentence("One. Two. Three.") == "One."
+        assert first_sentence("No break here") == "No break here"
+        assert first_sentence("Version 2.0 ships. Later.") == "Version 2.0 ships."
+
+
+class TestCompactPrompt:
+
+    def test_under_budget_is_unchanged(self):
+        fields = {"a": "fixed", "b": PromptField(["x", "y"])}
+        prompt = compact_prompt("test", TEMPLATE, 1_000, fields)
+        assert prompt == TEMPLATE.format(a="fixed", b="x, y")
+
+    def test_over_budget_drops_lowest_ranked_items(self):
+        items = [f"item-{i:02d}-" + "z" * 40 for i in range(20)]
+        prompt = compact_prompt("test", TEMPLATE, 100, {"a": "fixed", "b": PromptField(items)})
+
+        assert estimate_tokens(prompt) <= 100
+        assert "item-00" in prompt
+        assert "item-19" not in prompt
+
+    def test_summaries_swapped_before_items_dropped(self):
+        field = PromptField(
+            ["alpha " + "long " * 30, "beta " + "long " * 30],
+            summaries=["alpha", "beta"],
+            min_items=1,
+        )
+        prompt = compact_prompt("test", TEMPLATE, 30, {"a": "fixed", "b": field})
+
+        assert "alpha" in prompt
+        assert "beta" in prompt
+        assert "long" not in prompt
+
+    def test_min_items_and_fixed_fields_respected(self):
+        fixed = "keep " * 100
+        field = PromptField(["one", "two", "three"], min_items=3, truncatable=False)
+        prompt = compact_prompt("test", TEMPLATE, 10, {"a": fixed, "b": field})
+
+        # Nothing left to compact — the prompt goes out over budget, intact
+        assert fixed in prompt
+        assert "one, two, three" in prompt
+
+    def test_truncates_single_text_field(self):
+        field = PromptField(["word " * 500], min_chars=100)
+        prompt = compact_prompt("test", TEMPLATE, 100, {"a": "fixed", "b": field})
+
+        assert estimate_tokens(prompt) <= 100
+        assert "…" in prompt
+
+    def test_report_collected_inside_context(self):
+        items = ["x" * 50 for _ in range(20)]
+        with collect_reports() as reports:
+            compact_prompt("agent_one", TEMPLATE, 100, {"a": "a", "b": PromptField(items)})
+            compact_prompt("agent_two", TEMPLATE, 1_000, {"a": "a", "b": "b"})
+
+        assert [r.agent_name for r in reports] == ["agent_one", "agent_two"]
+        assert reports[0].tokens_before > reports[0].tokens_after
+        assert reports[0].compacted_fields == ["b"]
+        assert reports[1].tokens_before == reports[1].tokens_after
+        assert reports[1].compacted_fields == []
+
+    def test_no_report_outside_context(self):
+        with collect_reports() as reports:
+            pass
+        compact_prompt("agent", TEMPLATE, 1_000, {"a": "a", "b": "b"})
+        assert reports == []
+
+
+class TestAgentBudgets:
+
+    @pytest.mark.asyncio
+    async def test_creative_brief_prompt_fits_budget_with_large_inputs(self):
+        client = AsyncMock()
+        client.generate_raw = AsyncMock(return_value=json.dumps(SAMPLE_CREATIVE_BRIEF_OUTPUT, default=str))
+
+        audience = dict(SAMPLE_AUDIENCE_OUTPUT)
+        audience["personas"] = [
+            {**SAMPLE_AUDIENCE_OUTPUT["personas"][0],
+             "name": f"Persona {i}",
+             "description": "Short lead sentence. " + "Detail " * 60}
+            for i in range(5)
+        ]
+        audience["key_insights"] = [f"Insight {i} " + "x" * 150 for i in range(10)]
+        input_data = CreativeBriefInput(
+            brief_data=BriefParserOutput.model_validate(SAMPLE_BRIEF_OUTPUT),
+            audience_data=AudienceOutput.model_validate(audience),
+            calendar_summary=CalendarSummary(
+                campaign_duration="8 weeks",
+                posting_frequency="5 posts per week",
+                channel_strategies=[
+                    ChannelStrategy(channel=f"Channel {i}", strategy="Lead. " + "More " * 80)
+                    for i in range(10)
+                ],
+                content_mix_rationale="Rationale " * 90,
+            ),
+        )
+
+        with collect_reports() as reports:
+            await generate_creative_brief(input_data, client)
+
+        prompt_arg = client.generate_raw.call_args[0][0]
+        assert estimate_tokens(prompt_arg) <= CREATIVE_BUDGET
+        # Every persona and channel is still named after compaction
+        for i in range(5):
+            assert f"Persona {i}" in prompt_arg
+        for i in range(10):
+            assert f"Channel {i}" in prompt_arg
+        assert reports[0].tokens_before > CREATIVE_BUDGET
+        assert "persona_summaries" in reports[0].compacted_fields
@@ -0,0 +1,78 @@
+"""Tests for the bundled data cache: preload, pre-encoded demo body, mtime reload."""
+
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from app.services.data_cache import DATA_DIR, DEMO_DOCUMENTS, SAMPLE_METRICS, DataCache
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    shutil.copytree(DATA_DIR / "precomputed", tmp_path / "precomputed")
+    shutil.copy(DATA_DIR / SAMPLE_METRICS, tmp_path / SAMPLE_METRICS)
+    return tmp_path
+
+
+def _touch_with(path, data: dict) -> None:
+    stat = path.stat()
+    path.write_text(json.dumps(data))
+    # Force a distinct mtime even on filesystems with coarse timestamps
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestDataCache:
+
+    def test_preload_builds_demo_response(self, data_dir):
+        cache = DataCache(data_dir, check_interval_s=60)
+        cache.preload()
+
+        demo = cache.demo_response()
+        body = json.loads(demo.body)
+        assert body["demo"] is True
+        assert list(body["outputs"]) == list(DEMO_DOCUMENTS)
+        assert gzip.decompress(demo.gzip_body) == demo.body
+        assert demo.etag.startswith('"') and demo.gzip_etag.endswith('-gzip"')
+
+    def test_served_from_memory_between_checks(self, data_dir):
+        cache = DataCache(data_dir, check_interval_s=60)
+        cache.preload()
+        first = cache.demo_response()
+
+        _touch_with(data_dir / DEMO_DOCUMENTS["audience"], {"changed": True})
+
+        assert cache.demo_response() is first
+
+    def test_reloads_on_mtime_change(self, data_dir):
+        cache = DataCache(data_dir, check_interval_s=0)
+        cache.preload()
+        old_etag = cache.demo_response().etag
+
+        _touch_with(data_dir / SAMPLE_METRICS, {"channel_metrics": []})
+        _touch_with(data_dir / DEMO_DOCUMENTS["audience"], {"changed": True})
+
+        assert cache.get(SAMPLE_METRICS) == {"channel_metrics": []}
+        demo = cache.demo_response()
+        assert json.loads(demo.body)["outputs"]["audience"] == {"changed": True}
+        assert demo.etag != old_etag
+        assert cache.reloads == 2
+
+    def test_keeps_old_copy_when_reload_fails(self, data_dir):
+        cache = DataCache(data_dir, check_interval_s=0)
+        cache.preload()
+        original = cache.get(SAMPLE_METRICS)
+
+        path = data_dir / SAMPLE_METRICS
+        path.write_text("{ half-written")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000_000))
+
+        assert cache.get(SAMPLE_METRICS) is original
+
+    def test_missing_demo_file_raises(self, tmp_path):
+        cache = DataCache(tmp_path, check_interval_s=60)
+        cache.preload()
+        with pytest.raises(FileNotFoundError):
+            cache.demo_response()
@@ -0,0 +1,133 @@
+"""Tests for the broadcast event log: fan-out, resume, eviction, framing."""
+
+import asyncio
+import json
+
+import pytest
+
+from app.services.event_log import EventLog, content_hash, frame_event, frame_for
+
+
+def _append(log: EventLog, event_type: str = "status_update", **data) -> None:
+    log.append({"id": log.next_id, "event_type": event_type, **data})
+
+
+async def _drain(log: EventLog, after_id: int = 0) -> list[int]:
+    async def collect() -> list[int]:
+        return [event.id async for event in log.subscribe(after_id=after_id)]
+    return await asyncio.wait_for(collect(), timeout=2)
+
+
+class TestEventLog:
+
+    def test_frame_format(self):
+        frame = frame_event(7, "agent_complete", b'{"a": 1}')
+        assert frame == b'id: 7\r\nevent: agent_complete\r\ndata: {"a": 1}\r\n\r\n'
+
+    def test_append_serializes_once(self):
+        log = EventLog(capacity=8)
+        logged = log.append({"id": 1, "event_type": "status_update", "agent_name": "brief_parser"})
+
+        data = logged.frame.decode().split("data: ", 1)[1].strip()
+        assert json.loads(data) == logged.payload
+        assert log.next_id == 2 and log.last_id == 1
+
+    def test_append_after_close_raises(self):
+        log = EventLog(capacity=8)
+        log.close()
+        with pytest.raises(RuntimeError):
+            _append(log)
+
+    @pytest.mark.asyncio
+    async def test_every_subscriber_sees_every_event(self):
+        log = EventLog(capacity=8)
+        for _ in range(3):
+            _append(log)
+        log.close()
+
+        first, second = await asyncio.gather(_drain(log), _drain(log))
+        assert first == second == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_subscribers_share_frame_bytes(self):
+        log = EventLog(capacity=8)
+        _append(log)
+        log.close()
+
+        frames = []
+        for _ in range(2):
+            frames.extend([event.frame async for event in log.subscribe()])
+        assert frames[0] is frames[1]
+
+    @pytest.mark.asyncio
+    async def test_resume_after_id(self):
+        log = EventLog(capacity=8)
+        for _ in range(5):
+            _append(log)
+        log.close()
+
+        assert await _drain(log, after_id=3) == [4, 5]
+
+    @pytest.mark.asyncio
+    async def test_evicted_cursor_resumes_from_oldest_retained(self):
+        log = EventLog(capacity=3)
+        for _ in range(6):
+            _append(log)
+        log.close()
+
+        assert len(log) == 3
+        assert await _drain(log, after_id=1) == [4, 5, 6]
+
+    @pytest.mark.asyncio
+    async def test_waiting_subscriber_wakes_on_append_and_close(self):
+        log = EventLog(capacity=8)
+        task = asyncio.create_task(_drain(log))
+        await asyncio.sleep(0)
+
+        _append(log)
+        await asyncio.sleep(0)
+        _append(log)
+        log.close()
+
+        assert await task == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_relay_shares_the_run_frame(self):
+        firehose = EventLog(capacity=8)
+        run_a, run_b = EventLog(capacity=8, ids_from=firehose), EventLog(capacity=8, ids_from=firehose)
+        for log in (run_a, run_b, run_a):
+            firehose.relay(log.append({"id": log.next_id, "event_type": "status_update"}, tenant="acme"))
+        run_a.close()
+
+        assert [event.id for event in firehose.events_after(0)] == [1, 2, 3]
+        assert firehose.events_after(0)[2] is run_a.events_after(0)[1]
+        assert firehose.events_after(0)[0].tenant == "acme"
+        # Run ids skip the other run's, and still resume by Last-Event-ID
+        assert await _drain(run_a) == [1, 3]
+        assert await _drain(run_a, after_id=2) == [3]
+
+    def test_content_hash_of_encoding(self):
+        assert content_hash('{"a":1}') == content_hash(b'{"a":1}')
+        assert content_hash(b'{"a":1}') != content_hash(b'{"a":2}')
+
+    def test_raw_fields_spliced_into_frame(self):
+        log = EventLog(capacity=8)
+        logged = log.append({"id": 1, "event_type": "agent_complete"}, raw={"output": b'{"x":[1,2]}'})
+
+        data = json.loads(logged.frame.decode().split("data: ", 1)[1])
+        assert data == {"id": 1, "event_type": "agent_complete", "output": {"x": [1, 2]}}
+        assert "output" not in logged.payload
+
+    def test_frame_for_elides_known_hashes(self):
+        log = EventLog(capacity=8)
+        chunk = log.append({"id": 1, "event_type": "agent_output_chunk", "content_hash": "h1", "items": [1]})
+        complete = log.append({"id": 2, "event_type": "agent_complete", "content_hash": "h1",
+                               "output": {"entries": []}, "chunked_fields": {"entries": 1}})
+
+        assert frame_for(complete) is complete.frame
+        assert frame_for(complete, {"other"}) is complete.frame
+        assert frame_for(chunk, {"h1"}) is None
+
+        stub = json.loads(frame_for(complete, {"h1"}).decode().split("data: ", 1)[1])
+        assert stub["output"] is None and stub["unchanged"] is True
+        assert "chunked_fields" not in stub
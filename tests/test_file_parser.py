@@ -35,3 +35,46 @@ class TestFileParser:
         fake_exe = b"MZ" + b"\x00" * 100  # PE executable magic bytes
         with pytest.raises(ValueError, match="does not appear to be a valid PDF"):
             await parse_file("malicious.pdf", fake_exe)
+
+    @pytest.mark.asyncio
+    async def test_parse_txt_from_spooled_file(self):
+        import tempfile
+
+        with tempfile.SpooledTemporaryFile() as spooled:
+            spooled.write(b"  Brief text from a spooled upload  ")
+            spooled.seek(0)
+            result = await parse_file("brief.txt", spooled)
+        assert result == "Brief text from a spooled upload"
+
+    @pytest.mark.asyncio
+    async def test_parse_pdf_file(self):
+        from benchmarks.payloads import make_pdf
+
+        result = await parse_file("brief.pdf", make_pdf(["Campaign brief", "Budget: $50,000"]))
+        assert "Campaign brief" in result
+        assert result.index("Campaign brief") < result.index("Budget: $50,000")
+
+    @pytest.mark.asyncio
+    async def test_pdf_spooled_to_disk_is_extracted_by_path(self, monkeypatch):
+        from app.pdf_extraction import pdf_pool
+        from app.uploads import SpoolFile
+        from benchmarks.payloads import make_pdf
+
+        spool = SpoolFile(max_size=16)
+        spool.write(make_pdf(["Brief spooled to disk", "Read by the worker itself"]))
+        spool.seek(0)
+        sources = []
+        extract = pdf_pool.extract
+
+        async def record(source):
+            sources.append(source)
+            return await extract(source)
+
+        monkeypatch.setattr(pdf_pool, "extract", record)
+        try:
+            result = await parse_file("brief.pdf", spool)
+        finally:
+            spool.close()
+
+        assert sources == [spool.path]
+        assert "Read by the worker itself" in result
@@ -83,6 +83,18 @@ class TestGeminiClient:
 
         assert result == {"name": "Test Campaign", "score": 95}
 
+    @pytest.mark.asyncio
+    async def test_generate_raw_returns_unparsed_text(self):
+        client = self._make_client()
+        mock_response = MagicMock()
+        mock_response.text = '{"name": "Test Campaign", "score": 95}'
+        client._client.aio.models.generate_content = AsyncMock(return_value=mock_response)
+
+        raw = await client.generate_raw("test prompt", SampleOutput)
+
+        assert raw == mock_response.text
+        assert SampleOutput.model_validate_json(raw).score == 95
+
     @pytest.mark.asyncio
     async def test_generate_retries_on_429(self):
         client = self._make_client()
@@ -183,4 +195,5 @@ class TestLLMClientProtocol:
         """A mock with the right signature should satisfy LLMClient."""
         mock = MagicMock()
         mock.generate = AsyncMock(return_value={"test": "data"})
+        mock.generate_raw = AsyncMock(return_value='{"test": "data"}')
         assert isinstance(mock, LLMClient)
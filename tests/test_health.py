@@ -15,3 +15,21 @@ async def test_health_endpoint():
     data = response.json()
     assert data["status"] == "healthy"
     assert "version" in data
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_pipeline_and_llm_counters():
+    from app.main import app
+    from app.replay_client import ReplayLLMClient
+    from app.services.pipeline_orchestrator import PipelineOrchestrator
+
+    app.state.orchestrator = PipelineOrchestrator(ReplayLLMClient(rpm_limit=60))
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/api/v1/metrics")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["pipeline"]["active_runs"] == 0
+    assert data["llm"]["calls"] == 0
+    assert data["llm"]["rate_limit_wait_s"] == 0.0
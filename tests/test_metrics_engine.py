@@ -0,0 +1,95 @@
+"""Tests for the metrics engine: derived KPIs, goal attainment and channel ratings."""
+
+import pytest
+
+from app.metrics_engine import derive_metrics, parse_goal
+from app.schemas import ChannelMetrics, PerformanceInput
+
+
+def _channel(channel: str, impressions: int, clicks: int, conversions: int, spend: float,
+             engagement_rate: float = 3.0) -> ChannelMetrics:
+    return ChannelMetrics(
+        channel=channel, impressions=impressions, reach=impressions // 2,
+        engagement_rate=engagement_rate, clicks=clicks, conversions=conversions, spend=spend,
+    )
+
+
+def _input(*channels: ChannelMetrics, goals: list[str] | None = None) -> PerformanceInput:
+    return PerformanceInput(
+        campaign_name="Summer Vibes", reporting_period="May 2026",
+        channel_metrics=list(channels), goals=goals or [],
+    )
+
+
+class TestDerivedKPIs:
+
+    def test_per_channel_and_blended(self):
+        derived = derive_metrics(_input(
+            _channel("Instagram", 1_000_000, 10_000, 500, 10_000.0, engagement_rate=4.0),
+            _channel("TikTok", 3_000_000, 30_000, 3_000, 15_000.0, engagement_rate=6.0),
+        ))
+
+        instagram = derived.channels[0]
+        assert instagram.ctr == 1.0
+        assert instagram.cpc == 1.0
+        assert instagram.cpa == 20.0
+        assert instagram.cpm == 10.0
+        assert instagram.conversion_rate == 5.0
+
+        total = derived.total
+        assert total.impressions == 4_000_000
+        assert total.spend == 25_000.0
+        assert total.cpa == pytest.approx(25_000 / 3_500, abs=1e-4)
+        # Impression-weighted, not averaged
+        assert total.engagement_rate == 5.5
+
+    def test_zero_denominators_are_none(self):
+        derived = derive_metrics(_input(_channel("Pinterest", 0, 0, 0, 0.0)))
+
+        kpis = derived.channels[0]
+        assert (kpis.ctr, kpis.cpc, kpis.cpa, kpis.cpm, kpis.conversion_rate) == (None,) * 5
+        assert derived.ratings == ["Moderate"]
+
+    def test_no_channels(self):
+        derived = derive_metrics(_input())
+        assert derived.channels == []
+        assert derived.total.impressions == 0
+
+    def test_ratings_relative_to_blend(self):
+        derived = derive_metrics(_input(
+            _channel("Good", 1_000_000, 20_000, 2_000, 5_000.0, engagement_rate=6.0),
+            _channel("Average", 1_000_000, 10_000, 1_000, 10_000.0, engagement_rate=4.0),
+            _channel("Poor", 1_000_000, 5_000, 100, 20_000.0, engagement_rate=1.0),
+        ))
+        assert derived.ratings == ["Strong", "Moderate", "Weak"]
+        assert derived.scores[0] > derived.scores[1] > derived.scores[2]
+
+
+class TestGoalAttainment:
+
+    @pytest.mark.parametrize("goal,expected", [
+        ("5M social impressions", ("impressions", 5_000_000)),
+        ("50,000 website visits from social", ("clicks", 50_000)),
+        ("10,000 first-time purchases via influencer codes", ("conversions", 10_000)),
+        (">4% engagement rate across platforms", ("engagement_rate", 4.0)),
+        ("CPA under $12", ("cpa", 12.0)),
+        ("2.5% conversion rate", ("conversion_rate", 2.5)),
+        ("Grow brand love", (None, None)),
+    ])
+    def test_parse_goal(self, goal, expected):
+        assert parse_goal(goal) == expected
+
+    def test_attainment_and_cost_goals(self):
+        derived = derive_metrics(_input(
+            _channel("Instagram", 2_000_000, 10_000, 1_000, 10_000.0),
+            goals=["1M impressions", "CPA under $5", "Be memorable"],
+        ))
+
+        impressions, cpa, unmeasurable = derived.goals
+        assert impressions.attainment == 2.0
+        assert impressions.met
+        # Lower is better: $10 actual against a $5 target is half way there
+        assert cpa.attainment == 0.5
+        assert not cpa.met
+        assert unmeasurable.attainment is None
+        assert unmeasurable.met is None
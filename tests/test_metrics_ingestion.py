@@ -0,0 +1,193 @@
+"""Tests for streaming metrics ingestion: block-wise CSV/NDJSON aggregation and the ingest route."""
+
+import json
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.metrics_ingestion import ingest_stream, normalize_header
+from app.uploads import UploadTooLarge
+
+CSV_HEADER = b"Date,Platform,Impressions,Reach,Link clicks,Purchases,Amount spent (USD),Engagements\n"
+
+
+def _csv_export(days: int = 30) -> bytes:
+    rows = [
+        f"2026-05-{day:02d},{channel},1000,600,{clicks},2,{spend},40\n".encode()
+        for day in range(1, days + 1)
+        for channel, clicks, spend in (("Instagram", 10, 5.5), ("TikTok", 20, 4.0))
+    ]
+    return CSV_HEADER + b"".join(rows)
+
+
+async def _chunks(data: bytes, size: int = 97):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _ingest(data: bytes, format: str = "csv", block_bytes: int = 512, max_bytes: int = 10**9):
+    return await ingest_stream(_chunks(data), format, block_bytes=block_bytes, max_bytes=max_bytes)
+
+
+class TestMetricsAggregator:
+
+    def test_normalize_header(self):
+        assert normalize_header("Amount spent (USD)") == "amount_spent_usd"
+        assert normalize_header(" Link Clicks ") == "link_clicks"
+
+    @pytest.mark.asyncio
+    async def test_csv_aggregates_per_channel_across_blocks(self):
+        aggregator = await _ingest(_csv_export())
+        metrics = aggregator.to_performance_input("Summer Vibes", goals=["5M impressions"])
+
+        assert aggregator.stats()["blocks"] > 1
+        assert aggregator.rows == 60
+        # Largest spend first
+        instagram, tiktok = metrics.channel_metrics
+        assert instagram.channel == "Instagram"
+        assert (instagram.impressions, instagram.clicks, instagram.conversions) == (30_000, 300, 60)
+        assert instagram.spend == 165.0
+        assert tiktok.clicks == 600
+        # Engagements / impressions
+        assert instagram.engagement_rate == 4.0
+        assert metrics.reporting_period == "2026-05-01 – 2026-05-30"
+        assert metrics.goals == ["5M impressions"]
+
+    @pytest.mark.asyncio
+    async def test_block_size_does_not_change_totals(self):
+        data = _csv_export()
+        small = (await _ingest(data, block_bytes=64)).to_performance_input("X")
+        whole = (await _ingest(data, block_bytes=10**6)).to_performance_input("X")
+        assert small == whole
+
+    @pytest.mark.asyncio
+    async def test_quoted_line_breaks_across_blocks(self):
+        rows = b"".join(
+            f'{channel},"Spring sale\ncarousel, {day}",1000,10,{spend}\n'.encode()
+            for day in range(1, 31)
+            for channel, spend in (("Instagram", 5.5), ("TikTok", 4.0))
+        )
+        data = b"channel,creative,impressions,clicks,spend\n" + rows
+
+        small = (await _ingest(data, block_bytes=64)).to_performance_input("X")
+        whole = (await _ingest(data, block_bytes=10**6)).to_performance_input("X")
+
+        assert small == whole
+        assert [(c.channel, c.impressions, c.spend) for c in small.channel_metrics] == [
+            ("Instagram", 30_000, 165.0), ("TikTok", 30_000, 120.0),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_ndjson_with_engagement_rate_and_missing_keys(self):
+        lines = [
+            {"channel": "TikTok", "impressions": 1000, "clicks": 10, "spend": 4.0, "engagement_rate": 6.0},
+            {"channel": "TikTok", "impressions": 3000, "clicks": 30, "spend": 12.0, "engagement_rate": 2.0},
+            {"channel": "TikTok", "impressions": 500, "clicks": 5, "spend": 1.0},
+            {"channel": "", "impressions": 999, "clicks": 9, "spend": 9.0},
+        ]
+        data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+        aggregator = await _ingest(data, "ndjson", block_bytes=100)
+        (tiktok,) = aggregator.to_performance_input("X").channel_metrics
+
+        assert tiktok.impressions == 4500
+        # Impression-weighted over rows that carry a rate: (6×1000 + 2×3000) / 4000
+        assert tiktok.engagement_rate == 3.0
+        assert aggregator.rows_skipped == 1
+
+    @pytest.mark.asyncio
+    async def test_ndjson_types_and_keys_may_change_between_rows(self):
+        lines = [{"channel": "TikTok", "impressions": 1000, "clicks": 10, "spend": 4} for _ in range(6)]
+        # Spend as a string, then a float; reach only turns up in a later block
+        lines += [
+            {"channel": "TikTok", "impressions": 1000, "clicks": 10, "spend": "12.50"},
+            {"channel": "TikTok", "impressions": 1000, "clicks": 10, "spend": 0.5, "reach": 700},
+        ]
+        data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+        small = await _ingest(data, "ndjson", block_bytes=100)
+        whole = await _ingest(data, "ndjson", block_bytes=10**6)
+
+        for aggregator in (small, whole):
+            (tiktok,) = aggregator.to_performance_input("X").channel_metrics
+            assert (tiktok.impressions, tiktok.reach, tiktok.spend) == (8000, 700, 37.0)
+            assert aggregator.stats()["columns"]["reach"] == "reach"
+
+    @pytest.mark.asyncio
+    async def test_ndjson_non_numeric_value(self):
+        for data in (
+            b'{"channel": "TikTok", "impressions": 100, "clicks": 1, "spend": 1}\n'
+            b'{"channel": "TikTok", "impressions": "n/a", "clicks": 1, "spend": 1}\n',
+            b'{"channel": "TikTok", "impressions": 100, "clicks": 1, "spend": {"usd": 1}}\n',
+        ):
+            with pytest.raises(ValueError, match="Could not parse NDJSON"):
+                await _ingest(data, "ndjson")
+        with pytest.raises(ValueError, match="Missing required column"):
+            await _ingest(b'{"channel": "TikTok", "impressions": 100}\n', "ndjson")
+
+    @pytest.mark.asyncio
+    async def test_missing_required_column(self):
+        with pytest.raises(ValueError, match="Missing required column"):
+            await _ingest(b"channel,impressions\nTikTok,100\n")
+
+    @pytest.mark.asyncio
+    async def test_unparseable_rows(self):
+        with pytest.raises(ValueError, match="Could not parse CSV"):
+            await _ingest(b"channel,impressions,clicks,spend\nTikTok,lots,1,2\n")
+
+    @pytest.mark.asyncio
+    async def test_too_many_channels(self):
+        rows = b"".join(f"ch{i},100,1,1\n".encode() for i in range(25))
+        aggregator = await _ingest(b"channel,impressions,clicks,spend\n" + rows)
+        with pytest.raises(ValueError, match="at most 20"):
+            aggregator.to_performance_input("X")
+
+    @pytest.mark.asyncio
+    async def test_reporting_period_from_parsed_dates_only(self):
+        data = (
+            b"date,channel,impressions,clicks,spend\n"
+            b"12/31/2025,TikTok,100,1,1\n2026-05-03,TikTok,100,1,1\n2026-05-01,TikTok,100,1,1\n"
+        )
+        us_only = b"date,channel,impressions,clicks,spend\n05/01/2026,TikTok,100,1,1\n12/31/2025,TikTok,100,1,1\n"
+
+        assert (await _ingest(data)).to_performance_input("X").reporting_period == "2026-05-01 – 2026-05-03"
+        assert (await _ingest(us_only)).to_performance_input("X").reporting_period == "Uploaded export"
+
+    @pytest.mark.asyncio
+    async def test_size_limit_checked_while_streaming(self):
+        with pytest.raises(UploadTooLarge):
+            await _ingest(_csv_export(), max_bytes=1000)
+
+
+class TestIngestRoute:
+
+    @pytest.mark.asyncio
+    async def test_ingest_csv(self):
+        from app.main import app
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.post(
+                "/api/v1/performance/ingest",
+                params={"campaign_name": "Summer Vibes", "goals": ["5M impressions", ">4% engagement"]},
+                content=_csv_export(),
+                headers={"Content-Type": "text/csv"},
+            )
+            unknown_type = await client.post(
+                "/api/v1/performance/ingest", params={"campaign_name": "X"},
+                content=b"a,b\n", headers={"Content-Type": "application/pdf"},
+            )
+            bad_columns = await client.post(
+                "/api/v1/performance/ingest", params={"campaign_name": "X", "format": "csv"},
+                content=b"a,b\n1,2\n",
+            )
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [m["channel"] for m in body["metrics"]["channel_metrics"]] == ["Instagram", "TikTok"]
+        assert body["metrics"]["goals"] == ["5M impressions", ">4% engagement"]
+        assert body["ingest"]["rows"] == 60
+        assert body["ingest"]["rows_per_s"] > 0
+        assert body["metrics"]["trends"]["days"] == 30
+        assert len(body["weekly"]) == 10  # 5 weeks × 2 channels
+        assert unknown_type.status_code == 415
+        assert bad_columns.status_code == 422
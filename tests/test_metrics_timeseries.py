@@ -0,0 +1,196 @@
+"""Tests for the metrics time series: rollups, anomaly and changepoint detection, trend deltas."""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from app.agents.performance_reporter import build_fast_report, build_prompt
+from app.metrics_ingestion import ingest_stream
+from app.metrics_timeseries import SERIES_METRICS, MetricsTimeSeries, changepoints, rolling_zscore
+from app.schemas import ChannelMetrics, PerformanceInput
+
+START = datetime.date(2026, 5, 1)
+
+
+def _series(days: int, channels: tuple[str, ...] = ("Instagram", "TikTok"), seed: int = 0) -> MetricsTimeSeries:
+    """Noisy but steady daily metrics: ~10k impressions, 1% CTR, ~20 conversions, ~$100 spend."""
+    rng = np.random.default_rng(seed)
+    values = np.zeros((len(channels), days, len(SERIES_METRICS)))
+    values[..., 0] = rng.normal(10_000, 200, (len(channels), days))
+    values[..., 1] = values[..., 0] * 0.6
+    values[..., 2] = values[..., 0] * 0.01
+    values[..., 3] = rng.normal(20, 1, (len(channels), days))
+    values[..., 4] = rng.normal(100, 2, (len(channels), days))
+    return MetricsTimeSeries(list(channels), START, values)
+
+
+def _performance_input(trends=None) -> PerformanceInput:
+    return PerformanceInput(
+        campaign_name="Summer Vibes", reporting_period="May 2026",
+        channel_metrics=[ChannelMetrics(
+            channel="Instagram", impressions=300_000, reach=180_000, engagement_rate=4.0,
+            clicks=3_000, conversions=600, spend=3_000.0,
+        )],
+        goals=[], trends=trends,
+    )
+
+
+class TestRollups:
+
+    def test_from_daily_fills_gaps_with_zeros(self):
+        sums = np.arange(len(SERIES_METRICS), dtype=float)
+        series = MetricsTimeSeries.from_daily({
+            ("TikTok", START): sums,
+            ("Instagram", START + datetime.timedelta(days=3)): sums * 2,
+        })
+
+        assert series.channels == ["Instagram", "TikTok"]
+        assert series.values.shape == (2, 4, len(SERIES_METRICS))
+        assert series.end == START + datetime.timedelta(days=3)
+        assert series.values[0, :3].sum() == 0
+
+    def test_weekly_and_period(self):
+        series = _series(10)
+        weekly = series.weekly()
+
+        # One full week and a partial one, summing back to the period
+        assert weekly.shape == (2, 2, len(SERIES_METRICS))
+        assert np.allclose(weekly[:, 0], series.values[:, :7].sum(axis=1))
+        assert np.allclose(weekly.sum(axis=1), series.period())
+        rows = series.weekly_rollup()
+        assert [(row["week_start"], row["channel"]) for row in rows[:3]] == [
+            ("2026-05-01", "Instagram"), ("2026-05-01", "TikTok"), ("2026-05-08", "Instagram"),
+        ]
+
+
+class TestDetection:
+
+    def test_rolling_zscore_flags_a_spike_not_noise(self):
+        values = _series(60).values
+        values[1, 40, 0] *= 3
+        z, mean = rolling_zscore(values, 14)
+
+        flagged = np.argwhere(np.abs(z[..., 0]) >= 4)
+        assert flagged.tolist() == [[1, 40]]
+        assert mean[1, 40, 0] == pytest.approx(10_000, rel=0.02)
+        # No score before a full window
+        assert not z[:, :14].any()
+
+    def test_changepoint_finds_the_step(self):
+        values = _series(60).values[..., 4]
+        values[0, 35:] *= 1.5
+        split, t, before, after = changepoints(values[..., None], 5)
+
+        assert split[0, 0] == 35
+        assert after[0, 0] / before[0, 0] == pytest.approx(1.5, rel=0.02)
+        assert t[0, 0] > t[1, 0] * 5
+
+    def test_summarize_reports_step_spike_and_deltas(self):
+        series = _series(56)
+        series.values[1, 30:, 4] *= 1.6  # TikTok spend steps up
+        series.values[0, 52, 2] *= 4  # Instagram clicks spike (CTR with it)
+        trends = series.summarize()
+
+        assert trends.days == 56
+        assert trends.comparison == "last full week vs the week before"
+        assert (trends.changepoints[0].channel, trends.changepoints[0].metric) in {("TikTok", "spend"), ("TikTok", "cpa")}
+        assert trends.changepoints[0].date == START + datetime.timedelta(days=30)
+        spikes = {(a.channel, a.metric, a.date) for a in trends.anomalies}
+        assert ("Instagram", "clicks", START + datetime.timedelta(days=52)) in spikes
+        # Blended deltas lead; the clicks spike sits in the last full week
+        assert trends.deltas[0].channel == "Total"
+        clicks = next(d for d in trends.deltas if d.channel == "Instagram" and d.metric == "clicks")
+        assert clicks.change_pct > 20
+
+    def test_undefined_days_are_left_out_not_zeroed(self):
+        cpa = np.full((1, 60, 1), 5.0) + np.random.default_rng(0).normal(0, 0.1, (1, 60, 1))
+        cpa[0, ::3] = np.nan  # No conversions every third day
+        z, mean = rolling_zscore(cpa, 14)
+        split, t, before, after = changepoints(cpa, 5)
+
+        assert mean[0, 20, 0] == pytest.approx(5.0, abs=0.1)
+        assert not np.abs(z).max() >= 4
+        assert t[0, 0] < 8
+        assert before[0, 0] == pytest.approx(after[0, 0], abs=0.2)
+
+    def test_launch_mid_period_has_no_percentage(self):
+        series = _series(28)
+        series.values[1, :12] = 0  # TikTok launches on day 13
+        trends = series.summarize()
+
+        launch = [c for c in trends.changepoints if c.channel == "TikTok"]
+        assert launch and {c.date for c in launch} == {START + datetime.timedelta(days=12)}
+        assert all(c.change_pct is None and c.before == 0 for c in launch)
+        assert {c.metric for c in launch}.isdisjoint({"ctr", "cpa"})
+        assert "inf" not in build_prompt(_performance_input(trends))
+
+    def test_short_period_compares_halves(self):
+        trends = _series(10).summarize()
+        assert trends.comparison == "second half vs first half"
+        assert trends.changepoints == []
+
+    def test_caps_hold_for_a_long_noisy_period(self):
+        trends = _series(365, channels=tuple(f"ch{i}" for i in range(20)), seed=1).summarize()
+        assert len(trends.anomalies) <= 10
+        assert len(trends.changepoints) <= 8
+        assert len(trends.deltas) <= 12
+
+
+class TestReporterTrends:
+
+    def test_prompt_size_does_not_grow_with_period(self):
+        month = build_prompt(_performance_input(_series(30).summarize()))
+        year = build_prompt(_performance_input(_series(365, seed=2).summarize()))
+
+        assert "Trends (2026-05-01 – 2026-05-30, 30 days" in month
+        assert "- Total Impressions:" in month
+        assert abs(len(year) - len(month)) < len(month) * 0.25
+
+    def test_prompt_without_trends(self):
+        assert "Trends (no daily data):\n- none — totals only" in build_prompt(_performance_input())
+
+    def test_fast_report_uses_deltas_and_anomalies(self):
+        series = _series(28)
+        series.values[:, 21:, 0] *= 1.2  # Impressions up 20% in the last week
+        series.values[0, 25, 3] *= 5
+        report = build_fast_report(_performance_input(series.summarize()))
+
+        metrics = {m.metric_name: m for m in report.key_metrics_summary}
+        direction, change, basis = metrics["Impressions"].trend.split(" ", 2)
+        assert (direction, basis) == ("up", "week over week")
+        assert float(change.rstrip("%")) == pytest.approx(20, abs=2)
+        assert any(step.startswith("Investigate 2026-05-26 Instagram Conversions spike") for step in report.next_steps)
+
+
+class TestIngestedSeries:
+
+    @pytest.mark.asyncio
+    async def test_dated_export_carries_trends(self):
+        rows = [
+            f"2026-05-{day:02d}T00:00:00,{channel},{1000 * (3 if (channel, day) == ('TikTok', 25) else 1)},600,10,2,5.0\n".encode()
+            for day in range(1, 31)
+            for channel in ("Instagram", "TikTok")
+        ]
+        data = b"date,channel,impressions,reach,clicks,conversions,spend\n" + b"".join(rows)
+
+        async def chunks():
+            yield data
+
+        aggregator = await ingest_stream(chunks(), "csv", block_bytes=256, max_bytes=10**9)
+        series = aggregator.timeseries()
+        trends = aggregator.to_performance_input("X").trends
+
+        assert series.values.shape == (2, 30, len(SERIES_METRICS))
+        assert series.period()[0, 0] == 30_000
+        assert trends.start == START
+        assert ("TikTok", "impressions") in {(a.channel, a.metric) for a in trends.anomalies}
+
+    @pytest.mark.asyncio
+    async def test_undated_export_has_no_trends(self):
+        async def chunks():
+            yield b"channel,impressions,clicks,spend\nTikTok,100,1,1\n"
+
+        aggregator = await ingest_stream(chunks(), "csv", block_bytes=256, max_bytes=10**9)
+        assert aggregator.timeseries() is None
+        assert aggregator.to_performance_input("X").trends is None
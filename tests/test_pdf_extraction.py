@@ -0,0 +1,134 @@
+"""Tests for process-pool PDF extraction: page splitting, ordering, hard timeouts."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.pdf_extraction import (
+    MAX_PDF_PAGES,
+    PdfExtractionPool,
+    _extract_pages,
+    fast_text_usable,
+    garbled_ratio,
+    page_ranges,
+)
+from benchmarks.payloads import make_pdf
+
+
+def _hang(seconds: float) -> None:
+    # Module-level so spawned workers can unpickle it
+    time.sleep(seconds)
+
+
+def _echo_after(seconds: float, value: str) -> str:
+    time.sleep(seconds)
+    return value
+
+
+@pytest.fixture
+def pool():
+    pool = PdfExtractionPool(max_workers=2, timeout_s=30)
+    yield pool
+    pool.shutdown()
+
+
+class TestPageRanges:
+
+    def test_splits_into_contiguous_ranges(self):
+        assert page_ranges(5, 2) == [(0, 3), (3, 5)]
+        assert page_ranges(4, 4) == [(0, 1), (1, 2), (2, 3), (3, 4)]
+
+    def test_fewer_pages_than_workers(self):
+        assert page_ranges(2, 8) == [(0, 1), (1, 2)]
+
+    def test_no_pages(self):
+        assert page_ranges(0, 4) == []
+
+
+class TestTieredExtraction:
+
+    def test_quality_check(self):
+        assert fast_text_usable("Campaign brief for the summer launch")
+        assert not fast_text_usable("Page 3")  # Too sparse
+        assert not fast_text_usable("\ue000\ue001\ue002 garbled glyphs without ToUnicode")
+
+    def test_garbled_ratio_ignores_whitespace(self):
+        assert garbled_ratio("ab\ufffd\ufffd   \n") == 0.5
+        assert garbled_ratio("   ") == 0.0
+
+    def test_fast_pass_matches_pdfplumber(self):
+        pdf = make_pdf(["Campaign brief: Summer Vibes\nBudget: $150,000", "Channels: Instagram, TikTok"])
+
+        fast, fast_fallback = _extract_pages(pdf, 0, 2, fast=True)
+        slow, slow_fallback = _extract_pages(pdf, 0, 2, fast=False)
+
+        assert fast == slow
+        assert fast_fallback == 0 and slow_fallback == 2
+
+    def test_sparse_pages_fall_back(self):
+        pdf = make_pdf(["A full page of ordinary brief text", "Notes"])
+
+        texts, fallback = _extract_pages(pdf, 0, 2)
+
+        assert texts == ["A full page of ordinary brief text", "Notes"]
+        assert fallback == 1
+
+
+class TestPdfExtractionPool:
+
+    @pytest.mark.asyncio
+    async def test_extracts_pages_in_order(self, pool):
+        pdf = make_pdf([f"Page {n} of the campaign brief" for n in range(1, 6)])
+
+        text = await pool.extract(pdf)
+
+        assert [line for line in text.splitlines() if line] == [f"Page {n} of the campaign brief" for n in range(1, 6)]
+        stats = pool.stats()
+        assert stats["documents"] == 1
+        assert stats["pages"] == 5 and stats["fallback_pages"] == 0
+        assert stats["pending_tasks"] == 0 and stats["active_documents"] == 0
+
+    @pytest.mark.asyncio
+    async def test_caps_page_count(self, pool):
+        pdf = make_pdf([f"Page {n}" for n in range(1, MAX_PDF_PAGES + 3)])
+
+        text = await pool.extract(pdf)
+
+        assert f"Page {MAX_PDF_PAGES}" in text
+        assert f"Page {MAX_PDF_PAGES + 1}" not in text
+
+    @pytest.mark.asyncio
+    async def test_timeout_replaces_pool_and_recovers(self, pool):
+        pool.timeout_s = 0.5
+        original = pool._extract_pages
+        pool._extract_pages = lambda source: pool._submit(_hang, 60)
+
+        with pytest.raises(ValueError, match="timed out"):
+            await pool.extract(b"%PDF-")
+
+        assert pool.stats()["timeouts"] == 1 and pool.stats()["restarts"] == 1
+
+        # A fresh pool serves the next document
+        pool._extract_pages = original
+        pool.timeout_s = 30
+        assert await pool.extract(make_pdf(["Still working"])) == "Still working"
+
+    @pytest.mark.asyncio
+    async def test_running_extraction_survives_another_files_timeout(self, pool):
+        # Start both workers before timing anything
+        await asyncio.gather(pool._submit(_hang, 0.2), pool._submit(_hang, 0.2))
+        pool.timeout_s = 1.0
+        pool._extract_pages = lambda source: pool._submit(_hang, 60)
+
+        stuck = asyncio.create_task(pool.extract(b"%PDF-"))
+        await asyncio.sleep(0.5)
+        # Still running on the old pool when the stuck document times out at 1s
+        other = asyncio.create_task(pool._submit(_echo_after, 0.8, "unrelated"))
+
+        with pytest.raises(ValueError, match="timed out"):
+            await stuck
+        assert not other.done()
+        assert await other == "unrelated"
+        assert pool.stats()["restarts"] == 1
+        assert pool.stats()["resubmitted"] == 0
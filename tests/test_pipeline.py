@@ -8,8 +8,12 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 
 from app.main import app
-from app.schemas import PipelineStatus
+from app.schemas import CalendarOutput, PipelineStatus
+from app.services.data_cache import DATA_DIR
+from app.services.demo_replay import build_demo_client
+from app.services.event_log import content_hash
 from app.services.pipeline_orchestrator import PipelineOrchestrator, PipelineRun
+from app.services.report_cache import report_cache
 
 # Sample outputs — reused from test_agents.py patterns
 SAMPLE_BRIEF = {"campaign_name": "Test Campaign", "client_name": "Test Co",
@@ -49,10 +53,17 @@ SAMPLE_PERFORMANCE = {"executive_summary": "Campaign exceeded targets.",
     {"metric_name": "Impressions", "value": "2M", "trend": "up"}]}
 
 
+async def _collect_events(run: PipelineRun, timeout: float = 10) -> list[dict]:
+    """Subscribe to a run's event log and return every event, as sent on the wire, once the run ends."""
+    async def collect() -> list[dict]:
+        return [json.loads(event.frame.split(b"data: ", 1)[1]) async for event in run.events.subscribe()]
+    return await asyncio.wait_for(collect(), timeout)
+
+
 def _make_mock_client(responses: list[dict]) -> AsyncMock:
-    """Create a mock LLM client that returns different responses for each call."""
+    """Create a mock LLM client that returns different raw JSON responses for each call."""
     client = AsyncMock()
-    client.generate = AsyncMock(side_effect=responses)
+    client.generate_raw = AsyncMock(side_effect=[json.dumps(r, default=str) for r in responses])
     return client
 
 
@@ -73,12 +84,7 @@ class TestPipelineOrchestrator:
         run = await orchestrator.start_run("A" * 100)
 
         # Drain events until pipeline completes
-        events = []
-        while True:
-            event = await asyncio.wait_for(run.event_queue.get(), timeout=10)
-            if event is None:
-                break
-            events.append(event)
+        events = await _collect_events(run)
 
         assert run.status == PipelineStatus.COMPLETE
         assert run.brief_output is not None
@@ -103,12 +109,7 @@ class TestPipelineOrchestrator:
 
         run = await orchestrator.start_run("A" * 100)
 
-        events = []
-        while True:
-            event = await asyncio.wait_for(run.event_queue.get(), timeout=10)
-            if event is None:
-                break
-            events.append(event)
+        events = await _collect_events(run)
 
         # Extract agent_complete events in order
         completions = [e["agent_name"] for e in events if e["event_type"] == "agent_complete"]
@@ -116,22 +117,63 @@ class TestPipelineOrchestrator:
         assert completions.index("brief_parser") < completions.index("audience_researcher")
         assert completions.index("audience_researcher") < completions.index("content_calendar")
 
+    @pytest.mark.asyncio
+    async def test_fast_report_skips_reporter_llm_call(self):
+        """fast_report: four LLM calls, the performance report computed from the metrics."""
+        client = _make_mock_client([SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE])
+        orchestrator = PipelineOrchestrator(client)
+
+        run = await orchestrator.start_run("A" * 100, fast_report=True)
+        await _collect_events(run)
+
+        assert run.status == PipelineStatus.COMPLETE
+        assert client.generate_raw.call_count == 4
+        channels = [a.channel for a in run.performance_output.channel_analysis]
+        assert channels == ["Instagram", "TikTok", "YouTube Shorts", "Twitter/X"]
+
+    @pytest.mark.asyncio
+    async def test_incremental_report_reuses_cached_channels(self):
+        """incremental_report: a second run on the same metrics reuses every analysis and the summary."""
+        report_cache.clear()
+        analyses = {"channel_analysis": [SAMPLE_PERFORMANCE["channel_analysis"][0]] * 4}
+        summary = {k: v for k, v in SAMPLE_PERFORMANCE.items() if k != "channel_analysis"}
+        client = _make_mock_client([
+            SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE, analyses, summary,
+            SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE,
+        ])
+        orchestrator = PipelineOrchestrator(client, max_concurrent_runs=2)
+
+        first = await orchestrator.start_run("A" * 100, incremental_report=True)
+        await _collect_events(first)
+        second = await orchestrator.start_run("A" * 100, incremental_report=True)
+        events = await _collect_events(second)
+
+        assert second.status == PipelineStatus.COMPLETE
+        assert first.report_refresh.regenerated == 4
+        assert client.generate_raw.call_count == 10
+        complete = next(e for e in events if e["event_type"] == "pipeline_complete")
+        assert complete["report_refresh"] == {
+            "channels": 4, "reused": 4, "regenerated": 0, "summary_reused": True, "llm_calls": 0,
+        }
+        channels = [a.channel for a in second.performance_output.channel_analysis]
+        assert channels == ["Instagram", "TikTok", "YouTube Shorts", "Twitter/X"]
+
     @pytest.mark.asyncio
     async def test_rejects_concurrent_run(self):
         """Starting a second run while one is active should raise ValueError."""
-        # Use a client whose generate() blocks forever
+        # Use a client whose generate_raw() blocks forever
         block = asyncio.Event()
 
         async def hang(*args, **kwargs):
             await block.wait()
-            return SAMPLE_BRIEF
+            return json.dumps(SAMPLE_BRIEF)
 
         client = AsyncMock()
-        client.generate = hang
+        client.generate_raw = hang
         orchestrator = PipelineOrchestrator(client)
 
         await orchestrator.start_run("A" * 100)
-        # Give the background task time to reach the first generate() call
+        # Give the background task time to reach the first generate_raw() call
         await asyncio.sleep(0.05)
 
         with pytest.raises(ValueError, match="already running"):
@@ -144,17 +186,12 @@ class TestPipelineOrchestrator:
     async def test_pipeline_handles_agent_failure(self):
         """Pipeline should emit failure event when an agent raises."""
         client = AsyncMock()
-        client.generate = AsyncMock(side_effect=RuntimeError("LLM failed"))
+        client.generate_raw = AsyncMock(side_effect=RuntimeError("LLM failed"))
         orchestrator = PipelineOrchestrator(client)
 
         run = await orchestrator.start_run("A" * 100)
 
-        events = []
-        while True:
-            event = await asyncio.wait_for(run.event_queue.get(), timeout=10)
-            if event is None:
-                break
-            events.append(event)
+        events = await _collect_events(run)
 
         assert run.status == PipelineStatus.FAILED
         assert run.failed_agent == "brief_parser"
@@ -171,20 +208,301 @@ class TestPipelineOrchestrator:
         orchestrator = PipelineOrchestrator(client)
 
         run1 = await orchestrator.start_run("A" * 100)
-        while True:
-            event = await asyncio.wait_for(run1.event_queue.get(), timeout=10)
-            if event is None:
-                break
+        await _collect_events(run1)
 
         # Should not raise
         run2 = await orchestrator.start_run("B" * 100)
         assert run2.run_id != run1.run_id
 
 
+    @pytest.mark.asyncio
+    async def test_analytics_recording_does_not_hold_the_run_slot(self):
+        """A slow analytics flush after completion must not block the next run."""
+        flushing = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_record(*args, **kwargs):
+            flushing.set()
+            await release.wait()
+
+        client = _make_mock_client([SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE] * 2)
+        orchestrator = PipelineOrchestrator(client)
+        with patch("app.services.pipeline_orchestrator.analytics_store") as store:
+            store.enabled = True
+            store.record_run = slow_record
+            first = await orchestrator.start_run("A" * 100, fast_report=True)
+            await asyncio.wait_for(flushing.wait(), timeout=10)
+
+            second = await orchestrator.start_run("B" * 100, fast_report=True)
+            release.set()
+            await _collect_events(second)
+
+        assert first.status == PipelineStatus.COMPLETE
+        assert second.status == PipelineStatus.COMPLETE
+
+
 # ---------------------------------------------------------------------------
 # API Route tests
 # ---------------------------------------------------------------------------
 
+class TestDemoReplay:
+
+    @pytest.mark.asyncio
+    async def test_instant_replay_streams_precomputed_outputs(self):
+        orchestrator = PipelineOrchestrator(AsyncMock())
+        run = await orchestrator.start_demo_run("instant")
+        events = await _collect_events(run)
+
+        assert run.status == PipelineStatus.COMPLETE
+        completed = [e["agent_name"] for e in events if e["event_type"] == "agent_complete"]
+        assert completed[:3] == ["brief_parser", "audience_researcher", "content_calendar"]
+        expected = json.loads((DATA_DIR / "precomputed" / "calendar.json").read_text())
+        assert run.calendar_output.model_dump(mode="json") == CalendarOutput.model_validate(expected).model_dump(mode="json")
+        orchestrator.client.generate_raw.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_scaled_replay_follows_recorded_timings(self):
+        orchestrator = PipelineOrchestrator(AsyncMock())
+        timings = json.loads((DATA_DIR / "precomputed" / "timings.json").read_text())
+        # Creative Brief and Performance Reporter overlap, so the critical path skips the shorter
+        critical_path_s = (
+            timings["BriefParserOutput"] + timings["AudienceOutput"] + timings["CalendarOutput"]
+            + max(timings["CreativeBriefOutput"], timings["PerformanceOutput"])
+        )
+
+        start = asyncio.get_running_loop().time()
+        run = await orchestrator.start_demo_run("scaled", scale=0.002)
+        await _collect_events(run)
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert run.status == PipelineStatus.COMPLETE
+        assert elapsed >= critical_path_s * 0.002
+
+    @pytest.mark.asyncio
+    async def test_demo_runs_skip_concurrency_limit(self):
+        block = asyncio.Event()
+
+        async def hang(*args, **kwargs):
+            await block.wait()
+            return json.dumps(SAMPLE_BRIEF)
+
+        client = AsyncMock()
+        client.generate_raw = hang
+        orchestrator = PipelineOrchestrator(client, max_concurrent_runs=1)
+        await orchestrator.start_run("A" * 100)
+
+        demo_runs = [await orchestrator.start_demo_run("instant") for _ in range(3)]
+        for run in demo_runs:
+            await _collect_events(run)
+
+        assert all(run.status == PipelineStatus.COMPLETE for run in demo_runs)
+        assert orchestrator.stats()["demo_runs_started"] == 3
+        block.set()
+
+    @pytest.mark.asyncio
+    async def test_demo_runs_have_their_own_cap(self):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = PipelineOrchestrator(AsyncMock(), max_concurrent_demo_runs=1)
+            form = {"demo_replay": "scaled", "demo_replay_scale": "0.01"}
+            first = await client.post("/api/v1/pipeline/run", data=form)
+            second = await client.post("/api/v1/pipeline/run", data=form)
+            await _collect_events(app.state.orchestrator.get_run(first.json()["run_id"]))
+            third = await client.post("/api/v1/pipeline/run", data=form)
+            await _collect_events(app.state.orchestrator.get_run(third.json()["run_id"]))
+
+        assert first.status_code == 202
+        assert second.status_code == 429
+        assert third.status_code == 202
+
+    @pytest.mark.asyncio
+    async def test_finished_runs_are_evicted(self):
+        orchestrator = PipelineOrchestrator(AsyncMock(), max_finished_runs=2)
+        runs = [await orchestrator.start_demo_run("instant") for _ in range(4)]
+        for run in runs:
+            await _collect_events(run)
+        await asyncio.sleep(0)
+
+        assert [orchestrator.get_run(run.run_id) for run in runs] == [None, None, runs[2], runs[3]]
+        assert orchestrator.stats()["runs_started"] == 4
+        assert orchestrator.stats()["retained_runs"] == 2
+
+        expiring = PipelineOrchestrator(AsyncMock(), finished_run_ttl_s=0.05)
+        old = await expiring.start_demo_run("instant")
+        await _collect_events(old)
+        await asyncio.sleep(0.1)
+        new = await expiring.start_demo_run("instant")
+        await _collect_events(new)
+        await asyncio.sleep(0)
+
+        assert expiring.get_run(old.run_id) is None
+        assert expiring.get_run(new.run_id) is new
+
+    def test_unknown_timing_raises(self):
+        with pytest.raises(ValueError):
+            build_demo_client("sometimes")
+
+
+class TestCompactEvents:
+
+    def _large_calendar(self, entries: int = 45) -> dict:
+        entry = SAMPLE_CALENDAR["entries"][0]
+        return {**SAMPLE_CALENDAR, "entries": [{**entry, "week": i // 7 + 1} for i in range(entries)]}
+
+    async def _run(self, compact: bool) -> list[dict]:
+        responses = [SAMPLE_BRIEF, SAMPLE_AUDIENCE, self._large_calendar(),
+                     SAMPLE_CREATIVE, SAMPLE_PERFORMANCE]
+        orchestrator = PipelineOrchestrator(_make_mock_client(responses))
+        run = await orchestrator.start_run("A" * 100, compact=compact)
+        return await _collect_events(run)
+
+    @pytest.mark.asyncio
+    async def test_full_mode_sends_whole_output_with_hash(self):
+        events = await self._run(compact=False)
+
+        assert not [e for e in events if e["event_type"] == "agent_output_chunk"]
+        calendar = next(e for e in events if e.get("agent_name") == "content_calendar"
+                        and e["event_type"] == "agent_complete")
+        assert len(calendar["output"]["entries"]) == 45
+        assert calendar["content_hash"] == content_hash(
+            CalendarOutput.model_validate(calendar["output"]).model_dump_json()
+        )
+
+    @pytest.mark.asyncio
+    async def test_compact_mode_pages_large_lists(self):
+        events = await self._run(compact=True)
+
+        chunks = [e for e in events if e["event_type"] == "agent_output_chunk"]
+        complete = next(e for e in events if e.get("agent_name") == "content_calendar"
+                        and e["event_type"] == "agent_complete")
+        assert [c["offset"] for c in chunks] == [0, 20, 40]
+        assert all(c["id"] < complete["id"] for c in chunks)
+        assert complete["chunked_fields"] == {"entries": 45}
+        assert complete["output"]["entries"] == []
+
+        # Reassembling the pages reproduces the full output and its hash
+        output = {**complete["output"], "entries": [i for c in chunks for i in c["items"]]}
+        assert content_hash(CalendarOutput.model_validate(output).model_dump_json()) == complete["content_hash"]
+
+    @pytest.mark.asyncio
+    async def test_stream_elides_outputs_client_already_has(self):
+        responses = [SAMPLE_BRIEF, SAMPLE_AUDIENCE, self._large_calendar(),
+                     SAMPLE_CREATIVE, SAMPLE_PERFORMANCE]
+        orchestrator = PipelineOrchestrator(_make_mock_client(responses))
+        run = await orchestrator.start_run("A" * 100, compact=True)
+        events = await _collect_events(run)
+        calendar_hash = next(e["content_hash"] for e in events
+                             if e["event_type"] == "agent_output_chunk")
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = orchestrator
+            response = await client.get(
+                f"/api/v1/pipeline/stream/{run.run_id}", params={"known": calendar_hash}
+            )
+
+        payloads = [json.loads(line[6:]) for line in response.text.splitlines()
+                    if line.startswith("data: ")]
+        assert not [p for p in payloads if p["event_type"] == "agent_output_chunk"]
+        calendar = next(p for p in payloads if p.get("agent_name") == "content_calendar"
+                        and p["event_type"] == "agent_complete")
+        assert calendar["output"] is None and calendar["unchanged"] is True
+
+
+class TestMultiplexedWatch:
+
+    async def _take(self, events, count: int) -> list:
+        async def take() -> list:
+            taken = []
+            async for event in events:
+                taken.append(event)
+                if len(taken) == count:
+                    return taken
+        return await asyncio.wait_for(take(), timeout=5)
+
+    async def _two_finished_runs(self) -> tuple[PipelineOrchestrator, PipelineRun, PipelineRun]:
+        responses = [SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR,
+                     SAMPLE_CREATIVE, SAMPLE_PERFORMANCE] * 3  # Room for one more run
+        orchestrator = PipelineOrchestrator(_make_mock_client(responses))
+        run_a = await orchestrator.start_run("A" * 100, tenant="acme", batch="b1")
+        await _collect_events(run_a)
+        run_b = await orchestrator.start_run("B" * 100, tenant="globex", batch="b1")
+        await _collect_events(run_b)
+        return orchestrator, run_a, run_b
+
+    @pytest.mark.asyncio
+    async def test_firehose_interleaves_all_runs(self):
+        orchestrator, run_a, run_b = await self._two_finished_runs()
+        firehose = orchestrator.firehose.events_after(0)
+
+        assert len(firehose) == len(run_a.events) + len(run_b.events)
+        # The firehose holds the runs' own events — one frame per event, not a copy per log
+        assert firehose[0] is run_a.events.events_after(0)[0]
+        assert firehose[-1] is run_b.events.events_after(0)[-1]
+
+    @pytest.mark.asyncio
+    async def test_evicted_runs_still_match_tenant_filter(self):
+        responses = [SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE, SAMPLE_PERFORMANCE] * 2
+        orchestrator = PipelineOrchestrator(_make_mock_client(responses), finished_run_ttl_s=1e-9)
+        run_a = await orchestrator.start_run("A" * 100, tenant="acme")
+        await _collect_events(run_a)
+        run_b = await orchestrator.start_run("B" * 100, tenant="globex")
+        await _collect_events(run_b)
+        assert orchestrator.get_run(run_a.run_id) is None
+
+        events = await self._take(
+            orchestrator.watch(tenant="acme", event_types={"pipeline_complete"}, active_only=False), 1
+        )
+
+        assert events[0].payload["run_id"] == run_a.run_id
+
+    @pytest.mark.asyncio
+    async def test_filters_by_tenant_and_event_type(self):
+        orchestrator, run_a, _ = await self._two_finished_runs()
+
+        events = await self._take(
+            orchestrator.watch(tenant="acme", event_types={"agent_complete"}, active_only=False), 3
+        )
+
+        assert {e.payload["run_id"] for e in events} == {run_a.run_id}
+        assert [e.payload["agent_name"] for e in events] == [
+            "brief_parser", "audience_researcher", "content_calendar"]
+
+    @pytest.mark.asyncio
+    async def test_filters_by_batch_across_runs(self):
+        orchestrator, run_a, run_b = await self._two_finished_runs()
+
+        events = await self._take(
+            orchestrator.watch(batch="b1", event_types={"pipeline_complete"}, active_only=False), 2
+        )
+
+        assert [e.payload["run_id"] for e in events] == [run_a.run_id, run_b.run_id]
+
+    @pytest.mark.asyncio
+    async def test_active_scope_skips_finished_history_and_follows_new_runs(self):
+        orchestrator, _, _ = await self._two_finished_runs()
+        watcher = orchestrator.watch(event_types={"pipeline_complete"})
+        pending = asyncio.create_task(self._take(watcher, 1))
+        await asyncio.sleep(0)
+
+        run_c = await orchestrator.start_run("C" * 100)
+        events = await pending
+
+        assert events[0].payload["run_id"] == run_c.run_id
+
+    @pytest.mark.asyncio
+    async def test_resume_from_firehose_id(self):
+        orchestrator, _, run_b = await self._two_finished_runs()
+        resume_from = orchestrator.firehose.last_id - 2
+
+        events = await self._take(orchestrator.watch(after_id=resume_from), 2)
+
+        assert [e.id for e in events] == [resume_from + 1, resume_from + 2]
+        assert events[-1].payload["event_type"] == "pipeline_complete"
+
+
 class TestPipelineRoutes:
 
     @pytest.mark.asyncio
@@ -210,6 +528,106 @@ class TestPipelineRoutes:
         assert "run_id" in body
         assert body["status"] == "parsing"
 
+    @pytest.mark.asyncio
+    async def test_run_with_demo_replay_ignores_input(self):
+        """POST /run with demo_replay should start a replay run without any brief."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = PipelineOrchestrator(AsyncMock())
+
+            response = await client.post("/api/v1/pipeline/run", data={"demo_replay": "instant"})
+            invalid = await client.post("/api/v1/pipeline/run", data={"demo_replay": "sometimes"})
+
+        assert response.status_code == 202
+        run = app.state.orchestrator.get_run(response.json()["run_id"])
+        assert run.source_filename == "sample_brief.txt"
+        assert invalid.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_run_records_tenant_and_batch_labels(self):
+        """POST /run should attach tenant/batch labels for the multiplexed stream."""
+        responses = [SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR,
+                     SAMPLE_CREATIVE, SAMPLE_PERFORMANCE]
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = PipelineOrchestrator(_make_mock_client(responses))
+
+            response = await client.post(
+                "/api/v1/pipeline/run",
+                data={"text": "A" * 100, "tenant": "acme", "batch": "nightly"},
+            )
+
+        run = app.state.orchestrator.get_run(response.json()["run_id"])
+        assert (run.tenant, run.batch) == ("acme", "nightly")
+
+    @pytest.mark.asyncio
+    async def test_run_reports_on_uploaded_metrics(self):
+        """POST /run with a metrics JSON field should report on it instead of the sample."""
+        metrics = {
+            "campaign_name": "Uploaded", "reporting_period": "May 2026", "goals": [],
+            "channel_metrics": [{"channel": "Pinterest", "impressions": 1000, "reach": 500,
+                                 "engagement_rate": 2.0, "clicks": 10, "conversions": 1, "spend": 5.0}],
+        }
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = PipelineOrchestrator(_make_mock_client(
+                [SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE]
+            ))
+
+            response = await client.post(
+                "/api/v1/pipeline/run",
+                data={"text": "A" * 100, "metrics": json.dumps(metrics), "fast_report": "true"},
+            )
+            invalid = await client.post(
+                "/api/v1/pipeline/run", data={"text": "A" * 100, "metrics": "{not json"},
+            )
+
+        run = app.state.orchestrator.get_run(response.json()["run_id"])
+        await _collect_events(run)
+        assert run.status == PipelineStatus.COMPLETE
+        assert [a.channel for a in run.performance_output.channel_analysis] == ["Pinterest"]
+        assert invalid.status_code == 422
+
+    @pytest.mark.asyncio
+    async def test_ingested_metrics_with_a_mid_period_launch_round_trip(self):
+        """A channel launching mid-period has a zero baseline — its trends must still validate on /run."""
+        rows = [
+            f"2026-05-{day:02d},{channel},1000,600,10,2,5.0\n".encode()
+            for day in range(1, 29)
+            for channel in ("Instagram", "TikTok")
+            if channel == "Instagram" or day >= 13
+        ]
+        export = b"date,channel,impressions,reach,clicks,conversions,spend\n" + b"".join(rows)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = PipelineOrchestrator(_make_mock_client(
+                [SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR, SAMPLE_CREATIVE]
+            ))
+            ingested = await client.post(
+                "/api/v1/performance/ingest", params={"campaign_name": "Launch"},
+                content=export, headers={"Content-Type": "text/csv"},
+            )
+            metrics = ingested.json()["metrics"]
+            response = await client.post(
+                "/api/v1/pipeline/run",
+                data={"text": "A" * 100, "metrics": json.dumps(metrics), "fast_report": "true"},
+            )
+
+        launch = [c for c in metrics["trends"]["changepoints"] if c["channel"] == "TikTok"]
+        assert launch and all(c["change_pct"] is None for c in launch)
+        assert {c["date"] for c in launch} == {"2026-05-13"}
+        assert response.status_code == 202
+        run = app.state.orchestrator.get_run(response.json()["run_id"])
+        await _collect_events(run)
+        assert run.status == PipelineStatus.COMPLETE
+
     @pytest.mark.asyncio
     async def test_run_with_file_returns_202(self):
         """POST /run with a TXT file should return 202."""
@@ -280,10 +698,10 @@ class TestPipelineRoutes:
 
         async def hang(*args, **kwargs):
             await block.wait()
-            return SAMPLE_BRIEF
+            return json.dumps(SAMPLE_BRIEF)
 
         hanging_client = AsyncMock()
-        hanging_client.generate = hang
+        hanging_client.generate_raw = hang
 
         async with AsyncClient(
             transport=ASGITransport(app=app), base_url="http://test"
@@ -322,6 +740,52 @@ class TestPipelineRoutes:
         assert "creative_brief" in body["outputs"]
         assert "performance" in body["outputs"]
 
+    @pytest.mark.asyncio
+    async def test_demo_endpoint_revalidates_with_etag(self):
+        """A matching If-None-Match should get 304 with no body."""
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = PipelineOrchestrator(AsyncMock())
+
+            first = await client.get("/api/v1/pipeline/demo")
+            second = await client.get(
+                "/api/v1/pipeline/demo", headers={"If-None-Match": first.headers["etag"]}
+            )
+            identity = await client.get(
+                "/api/v1/pipeline/demo", headers={"Accept-Encoding": "identity"}
+            )
+
+        assert first.status_code == 200
+        assert first.headers["content-encoding"] == "gzip"
+        assert second.status_code == 304
+        assert second.content == b""
+        # Each encoding is a different representation, so it gets its own strong ETag
+        assert identity.headers["etag"] != first.headers["etag"]
+        assert identity.json() == first.json()
+
+    @pytest.mark.asyncio
+    async def test_stream_resumes_after_last_event_id(self):
+        """GET /stream with Last-Event-ID should replay only later events."""
+        responses = [SAMPLE_BRIEF, SAMPLE_AUDIENCE, SAMPLE_CALENDAR,
+                     SAMPLE_CREATIVE, SAMPLE_PERFORMANCE]
+        orchestrator = PipelineOrchestrator(_make_mock_client(responses))
+        run = await orchestrator.start_run("A" * 100)
+        await _collect_events(run)
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            app.state.orchestrator = orchestrator
+
+            response = await client.get(
+                f"/api/v1/pipeline/stream/{run.run_id}",
+                headers={"Last-Event-ID": "3"},
+            )
+
+        ids = [int(line[4:]) for line in response.text.splitlines() if line.startswith("id: ")]
+        assert ids == list(range(4, run.events.last_id + 1))
+
     @pytest.mark.asyncio
     async def test_stream_unknown_run_returns_404(self):
         """GET /stream/{bad_id} should return 404."""
@@ -0,0 +1,228 @@
+"""Tests for the replay LLM backend: recorded responses, latency models, error injection."""
+
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import pytest
+from httpx import ASGITransport
+
+from app.calendar_scheduler import schedule_calendar
+from app.gemini_client import LLMClient
+from app.ollama_client import OllamaClient
+from app.replay_client import (
+    FixedLatency,
+    HistogramLatency,
+    LognormalLatency,
+    RecordedLatency,
+    RecordingLLMClient,
+    ReplayAPIError,
+    ReplayLLMClient,
+    ReplayStore,
+    create_ollama_app,
+)
+from app.schemas import AudienceOutput, BriefParserOutput, CalendarOutput, PipelineStatus
+from app.services.pipeline_orchestrator import PipelineOrchestrator
+
+
+class TestReplayStore:
+
+    def test_seeded_from_precomputed(self):
+        store = ReplayStore.from_precomputed()
+        assert set(store.responses) == {
+            "BriefParserOutput", "AudienceOutput", "CalendarOutput",
+            "CreativeBriefOutput", "PerformanceOutput", "ChannelAnalysisBatch", "PerformanceSummary",
+            "CalendarPlan", "CalendarEntryBatch", "SlotCopyBatch",
+        }
+
+    def test_round_robin(self):
+        store = ReplayStore()
+        store.add("X", '{"n": 1}')
+        store.add("X", '{"n": 2}')
+        assert [store.next_response("X") for _ in range(3)] == ['{"n": 1}', '{"n": 2}', '{"n": 1}']
+
+    def test_unknown_schema_raises(self):
+        with pytest.raises(KeyError):
+            ReplayStore().next_response("Missing")
+
+
+class TestLatencyModels:
+
+    def test_fixed(self):
+        assert FixedLatency(0.25).sample(random.Random(0)) == 0.25
+
+    def test_lognormal_median(self):
+        rng = random.Random(42)
+        samples = sorted(LognormalLatency(0.5, sigma=0.3).sample(rng) for _ in range(2001))
+        assert 0.45 < samples[1000] < 0.55
+
+    def test_histogram_resamples_recorded_values(self):
+        model = HistogramLatency([0.1, 0.2])
+        rng = random.Random(0)
+        assert {model.sample(rng) for _ in range(50)} == {0.1, 0.2}
+
+    def test_recorded_per_schema_and_scaled(self):
+        model = RecordedLatency({"CalendarOutput": 18.0}, scale=0.5)
+        rng = random.Random(0)
+        assert model.sample(rng, "CalendarOutput") == 9.0
+        assert model.sample(rng, "Unknown") == 0.0
+
+    def test_histogram_requires_samples(self):
+        with pytest.raises(ValueError):
+            HistogramLatency([])
+
+
+class TestReplayLLMClient:
+
+    def test_satisfies_protocol(self):
+        assert isinstance(ReplayLLMClient(), LLMClient)
+
+    @pytest.mark.asyncio
+    async def test_returns_valid_output_for_schema(self):
+        client = ReplayLLMClient()
+        result = await client.generate("prompt", CalendarOutput)
+        assert CalendarOutput.model_validate(result).entries
+
+    @pytest.mark.asyncio
+    async def test_generate_raw_validates_as_json(self):
+        client = ReplayLLMClient()
+        raw = await client.generate_raw("prompt", CalendarOutput)
+        assert CalendarOutput.model_validate_json(raw).entries
+
+    @pytest.mark.asyncio
+    async def test_adds_latency(self):
+        client = ReplayLLMClient(latency=FixedLatency(0.05))
+        start = time.monotonic()
+        await client.generate("prompt", BriefParserOutput)
+        assert time.monotonic() - start >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_injects_429(self):
+        client = ReplayLLMClient(error_rate_429=1.0)
+        with pytest.raises(ReplayAPIError) as exc_info:
+            await client.generate("prompt", BriefParserOutput)
+        assert exc_info.value.status_code == 429
+        assert client.errors_injected == 1
+
+    @pytest.mark.asyncio
+    async def test_injects_503(self):
+        client = ReplayLLMClient(error_rate_503=1.0)
+        with pytest.raises(ReplayAPIError) as exc_info:
+            await client.generate("prompt", BriefParserOutput)
+        assert exc_info.value.status_code == 503
+
+    @pytest.mark.asyncio
+    async def test_error_rate_is_approximate(self):
+        client = ReplayLLMClient(error_rate_429=0.2, seed=7)
+        failures = 0
+        for _ in range(500):
+            try:
+                await client.generate("prompt", BriefParserOutput)
+            except ReplayAPIError:
+                failures += 1
+        assert 70 < failures < 130
+
+    @pytest.mark.asyncio
+    async def test_full_pipeline_runs_on_replay(self):
+        orchestrator = PipelineOrchestrator(ReplayLLMClient())
+        run = await orchestrator.start_run("A" * 100)
+
+        async def drain():
+            async for _ in run.events.subscribe():
+                pass
+
+        await asyncio.wait_for(drain(), timeout=10)
+
+        assert run.status == PipelineStatus.COMPLETE
+
+
+    @pytest.mark.asyncio
+    async def test_incremental_report_runs_on_replay(self):
+        orchestrator = PipelineOrchestrator(ReplayLLMClient())
+        run = await orchestrator.start_run("A" * 100, incremental_report=True)
+
+        async def drain():
+            async for _ in run.events.subscribe():
+                pass
+
+        await asyncio.wait_for(drain(), timeout=10)
+
+        assert run.status == PipelineStatus.COMPLETE
+        assert run.report_refresh.channels == len(run.performance_output.channel_analysis)
+
+    @pytest.mark.asyncio
+    async def test_fan_out_calendar_runs_on_replay(self):
+        orchestrator = PipelineOrchestrator(ReplayLLMClient())
+        run = await orchestrator.start_run("A" * 100, calendar_fan_out=True)
+
+        async def drain():
+            async for _ in run.events.subscribe():
+                pass
+
+        await asyncio.wait_for(drain(), timeout=10)
+
+        assert run.status == PipelineStatus.COMPLETE
+        assert {e.channel for e in run.calendar_output.entries} == {"Instagram", "TikTok", "YouTube Shorts", "Twitter/X"}
+        assert max(e.week for e in run.calendar_output.entries) == 8
+
+    @pytest.mark.asyncio
+    async def test_scheduled_calendar_runs_on_replay(self):
+        orchestrator = PipelineOrchestrator(ReplayLLMClient())
+        run = await orchestrator.start_run("A" * 100, calendar_scheduler=True)
+
+        async def drain():
+            async for _ in run.events.subscribe():
+                pass
+
+        await asyncio.wait_for(drain(), timeout=10)
+
+        assert run.status == PipelineStatus.COMPLETE
+        # Every slot of the grid got copy — none dropped for a missing recording
+        assert len(run.calendar_output.entries) == len(schedule_calendar(run.brief_output, run.audience_output).slots)
+
+
+class TestRecordingLLMClient:
+
+    @pytest.mark.asyncio
+    async def test_recordings_replay_with_latency_histogram(self, tmp_path):
+        path = tmp_path / "capture.jsonl"
+        recorder = RecordingLLMClient(ReplayLLMClient(latency=FixedLatency(0.01)), path)
+
+        live = await recorder.generate("prompt", AudienceOutput)
+
+        record = json.loads(path.read_text().splitlines()[0])
+        assert record["schema"] == "AudienceOutput"
+        assert record["latency_ms"] >= 10
+
+        store = ReplayStore().load_recordings(path)
+        assert json.loads(store.next_response("AudienceOutput")) == live
+        assert HistogramLatency(store.all_latencies()).sample(random.Random(0)) >= 0.01
+
+
+class TestOllamaStandIn:
+
+    def _ollama_client(self, replay: ReplayLLMClient) -> OllamaClient:
+        client = OllamaClient(base_url="http://replay")
+        client._http = httpx.AsyncClient(
+            transport=ASGITransport(app=create_ollama_app(replay)), base_url="http://replay"
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_ollama_client_gets_recorded_response(self):
+        client = self._ollama_client(ReplayLLMClient())
+        result = await client.generate("prompt", AudienceOutput)
+        await client.close()
+
+        assert AudienceOutput.model_validate(result).personas
+
+    @pytest.mark.asyncio
+    async def test_injected_errors_become_http_status(self):
+        client = self._ollama_client(ReplayLLMClient(error_rate_503=1.0))
+        with pytest.raises(httpx.HTTPStatusError) as exc_info:
+            await client.generate("prompt", AudienceOutput)
+        await client.close()
+
+        assert exc_info.value.response.status_code == 503
@@ -0,0 +1,105 @@
+"""Tests for the report cache and the incremental report refresh route."""
+
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.schemas import MetricSummary
+from app.services.pipeline_orchestrator import PipelineOrchestrator
+from app.services.report_cache import ReportCache, cache_key, report_cache
+
+METRICS = {
+    "campaign_name": "Summer Vibes",
+    "reporting_period": "May 2026",
+    "channel_metrics": [{"channel": "TikTok", "impressions": 3_200_000, "reach": 2_100_000,
+                         "engagement_rate": 6.2, "clicks": 35_000, "conversions": 3_900, "spend": 28_000.0}],
+    "goals": ["5M impressions"],
+}
+
+
+def _summary(value: str) -> MetricSummary:
+    return MetricSummary(metric_name="CTR", value=value, trend="up")
+
+
+class TestReportCache:
+
+    def test_key_is_order_independent_and_namespaced(self):
+        assert cache_key("channel", {"a": 1, "b": 2}) == cache_key("channel", {"b": 2, "a": 1})
+        assert cache_key("channel", {"a": 1}) != cache_key("summary", {"a": 1})
+        assert cache_key("channel", {"a": 1}) != cache_key("channel", {"a": 2})
+
+    def test_evicts_least_recently_used(self):
+        cache = ReportCache(max_entries=2)
+        cache.put("a", _summary("1%"))
+        cache.put("b", _summary("2%"))
+        cache.get("a")  # a is now more recent than b
+        cache.put("c", _summary("3%"))
+
+        assert cache.get("b") is None
+        assert cache.get("a").value == "1%"
+        assert cache.stats() == {"entries": 2, "hits": 2, "misses": 1, "evictions": 1, "hit_rate": 0.667}
+
+    def test_zero_entries_disables(self):
+        cache = ReportCache(max_entries=0)
+        cache.put("a", _summary("1%"))
+        assert cache.get("a") is None
+
+
+class TestReportRoute:
+
+    @pytest.mark.asyncio
+    async def test_refresh_reuses_unchanged_report(self):
+        from app.main import app
+
+        report_cache.clear()
+        client = AsyncMock()
+        client.generate_raw = AsyncMock(side_effect=[json.dumps(r) for r in (
+            {"channel_analysis": [{"channel": "TikTok", "performance_rating": "Strong", "key_metric": "CTR 1.09%",
+                                   "insight": "Short video.", "recommendation": "More of it."}]},
+            {"executive_summary": "Good month.", "overall_performance": "On track",
+             "top_performing_content": [], "recommendations": [], "next_steps": [], "key_metrics_summary": []},
+        )])
+        app.state.orchestrator = PipelineOrchestrator(client)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http:
+            first = await http.post("/api/v1/performance/report", json=METRICS)
+            second = await http.post("/api/v1/performance/report", json=METRICS)
+            fast = await http.post("/api/v1/performance/report", params={"fast": True}, json=METRICS)
+
+        assert first.status_code == 200
+        assert first.json()["refresh"]["regenerated"] == 1
+        assert second.json()["refresh"]["reused"] == 1
+        assert second.json()["refresh"]["llm_calls"] == 0
+        assert second.json()["report"] == first.json()["report"]
+        assert fast.json()["refresh"] is None
+        assert client.generate_raw.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalid_model_output_is_502(self):
+        from app.main import app
+
+        report_cache.clear()
+        client = AsyncMock()
+        client.generate_raw = AsyncMock(return_value=json.dumps({"channel_analysis": []}))
+        app.state.orchestrator = PipelineOrchestrator(client)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.post("/api/v1/performance/report", json=METRICS)
+
+        assert response.status_code == 502
+
+    @pytest.mark.asyncio
+    async def test_client_failure_is_502(self):
+        from app.main import app
+
+        report_cache.clear()
+        client = AsyncMock()
+        client.generate_raw = AsyncMock(side_effect=KeyError("No recorded response for schema ChannelAnalysisBatch"))
+        app.state.orchestrator = PipelineOrchestrator(client)
+
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http:
+            response = await http.post("/api/v1/performance/report", json=METRICS)
+
+        assert response.status_code == 502
@@ -28,7 +28,7 @@ class TestBriefParserInput:
 
     def test_rejects_too_long_text(self):
         with pytest.raises(ValidationError):
-            BriefParserInput(raw_text="A" * 50_001)
+            BriefParserInput(raw_text="A" * 500_001)
 
     def test_strips_whitespace(self):
         inp = BriefParserInput(raw_text="  " + "A" * 20 + "  ")
@@ -0,0 +1,95 @@
+"""Tests for the extracted-text cache: LRU bound, disk tier, parse_file hits."""
+
+import io
+
+import pytest
+
+from app.text_cache import HASH_BLOCK_BYTES, ExtractedTextCache, cache_key
+
+
+class TestExtractedTextCache:
+
+    def test_key_covers_namespace_and_content(self):
+        assert cache_key(b"brief", "v1") == cache_key(b"brief", "v1")
+        assert cache_key(b"brief", "v1") != cache_key(b"brief", "v2")
+        assert cache_key(b"brief", "v1") != cache_key(b"other", "v1")
+
+    def test_file_key_matches_bytes_key(self):
+        data = b"%PDF-" + b"x" * (3 * HASH_BLOCK_BYTES // 2)
+        file = io.BytesIO(data)
+        file.seek(7)
+
+        assert cache_key(file, "v1") == cache_key(data, "v1")
+        assert file.tell() == 0
+
+    @pytest.mark.asyncio
+    async def test_miss_then_hit(self):
+        cache = ExtractedTextCache(max_bytes=1000, disk_dir="")
+
+        assert await cache.get("k") is None
+        await cache.put("k", "extracted text")
+        assert await cache.get("k") == "extracted text"
+
+        stats = cache.stats()
+        assert stats["misses"] == 1 and stats["memory_hits"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        cache = ExtractedTextCache(max_bytes=10, disk_dir="")
+        await cache.put("a", "aaaa")
+        await cache.put("b", "bbbb")
+        await cache.get("a")  # a is now more recent than b
+        await cache.put("c", "cccc")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "aaaa"
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] == 8
+
+    @pytest.mark.asyncio
+    async def test_oversized_entry_not_kept_in_memory(self):
+        cache = ExtractedTextCache(max_bytes=4, disk_dir="")
+        await cache.put("big", "too large to fit")
+        assert cache.stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_memory_loss(self, tmp_path):
+        cache = ExtractedTextCache(max_bytes=1000, disk_dir=tmp_path)
+        await cache.put("v1-abcdef", "persisted text")
+
+        fresh = ExtractedTextCache(max_bytes=1000, disk_dir=tmp_path)
+        assert await fresh.get("v1-abcdef") == "persisted text"
+        assert await fresh.get("v1-abcdef") == "persisted text"
+        assert fresh.stats()["disk_hits"] == 1 and fresh.stats()["memory_hits"] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_failed_disk_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        def fail(*args):
+            raise OSError("disk full")
+
+        monkeypatch.setattr("app.text_cache.os.replace", fail)
+        cache = ExtractedTextCache(max_bytes=1000, disk_dir=tmp_path)
+        await cache.put("v1-abcdef", "text")
+        await cache.put("v1-fedcba", "bad \udc80 surrogate")
+
+        assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+        assert await cache.get("v1-abcdef") == "text"
+
+class TestParseFileCache:
+
+    @pytest.mark.asyncio
+    async def test_repeat_pdf_upload_skips_extraction(self):
+        from app.file_parser import parse_file
+        from app.pdf_extraction import pdf_pool
+        from benchmarks.payloads import make_pdf
+
+        pdf = make_pdf(["A brief uploaded twice"])
+        first = await parse_file("brief.pdf", pdf)
+        documents = pdf_pool.documents
+
+        second = await parse_file("again.pdf", pdf)
+
+        assert second == first
+        assert pdf_pool.documents == documents
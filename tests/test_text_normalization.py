@@ -0,0 +1,133 @@
+"""Tests for brief text normalization: boilerplate, wraps, whitespace, token report."""
+
+import re
+
+import pytest
+
+from app.agents.brief_parser import parse_brief
+from app.pdf_extraction import _extract_pages
+from app.schemas import BriefParserInput, BriefParserOutput
+from app.services.data_cache import DATA_DIR, SAMPLE_BRIEF
+from app.text_normalization import normalize_brief
+from benchmarks.payloads import make_pdf
+
+
+def _paged(bodies: list[str]) -> str:
+    total = len(bodies)
+    return "\f".join(
+        f"Sunset Beverages - Confidential\n{body}\nPage {n} of {total}"
+        for n, body in enumerate(bodies, start=1)
+    )
+
+
+class LabelledBriefClient:
+    """Extracts a BriefParserOutput from "LABEL: value" sections by rule —
+    stands in for the LLM so the parsed fields of two texts can be compared."""
+
+    async def generate_raw(self, prompt: str, schema: type) -> str:
+        brief = prompt.split("<brief>\n", 1)[1].split("\n</brief>", 1)[0]
+        sections: dict[str, list[str]] = {}
+        label = ""
+        for line in (line.strip() for line in brief.splitlines()):
+            if match := re.match(r"^([A-Za-z][A-Za-z &/()-]*):\s*(.*)$", line):
+                label = match.group(1).casefold()
+                line = match.group(2)
+            if line:
+                sections.setdefault(label, []).append(line)
+
+        def text(*prefixes: str) -> str:
+            return " ".join(v for key, values in sections.items() if key.startswith(prefixes) for v in values)
+
+        def items(name: str) -> list[str]:
+            return sections.get(name, [])[:10]
+
+        return BriefParserOutput(
+            campaign_name=text("campaign brief"), client_name=text("client"),
+            objectives=items("objectives"), target_audience=text("target audience"),
+            budget=text("budget"), timeline=text("timeline", "weeks"), kpis=items("kpis"),
+            channels=text("channels").split(", "), key_messages=items("key messages"),
+            constraints=items("constraints"), raw_summary=text("background")[:1000],
+        ).model_dump_json()
+
+
+class TestNormalizeBrief:
+
+    def test_strips_repeated_headers_and_page_numbers(self):
+        text, report = normalize_brief(_paged(["Budget: $150,000", "Timeline: 8 weeks", "Channels: TikTok"]))
+
+        assert text == "Budget: $150,000\n\nTimeline: 8 weeks\n\nChannels: TikTok"
+        assert report.pages == 3
+        assert report.boilerplate_lines_removed == 6
+
+    def test_keeps_lines_that_repeat_on_too_few_pages(self):
+        pages = ["Intro\nBody one", "Intro\nBody two", "Other\nBody three", "Other2\nBody four", "Other3\nBody five"]
+        text, _ = normalize_brief("\f".join(pages))
+
+        assert text.count("Intro") == 2
+
+    def test_rejoins_hyphenated_and_wrapped_lines(self):
+        text, report = normalize_brief("The cam-\npaign targets health-conscious\nmillennials, and\ngen Z.\n- Bullet one\n- Bullet two")
+
+        assert text == "The campaign targets health-conscious millennials, and gen Z.\n- Bullet one\n- Bullet two"
+        assert report.hyphenations_joined == 1
+        assert report.wrapped_lines_joined == 2
+
+    def test_collapses_whitespace(self):
+        text, _ = normalize_brief("OBJECTIVES:  \t drive   trial\n\n\n\n\nBUDGET:  $50k  ")
+
+        assert text == "OBJECTIVES: drive trial\n\nBUDGET: $50k"
+
+    def test_reports_token_reduction(self):
+        raw = _paged(["Detail line about the campaign goals."] * 6)
+        _, report = normalize_brief(raw)
+
+        assert report.tokens_before > report.tokens_after
+        assert report.chars_before == len(raw)
+
+    def test_one_page_brief_keeps_its_numbers(self):
+        text, report = normalize_brief("Budget (USD):\n150000\nWeeks:\n8")
+
+        assert text == "Budget (USD):\n150000\nWeeks:\n8"
+        assert report.boilerplate_lines_removed == 0
+
+    def test_numbers_out_of_step_with_pages_are_kept(self):
+        pages = ["Budget (USD):\n150000\nIntro text", "Weeks:\n8\nMore text", "Reach:\n2\nEven more"]
+        text, _ = normalize_brief("\f".join(f"{body}\n{n}" for n, body in enumerate(pages, start=1)))
+
+        assert [line for line in text.splitlines() if line.isdigit()] == ["150000", "8", "2"]
+
+    def test_plain_text_brief_is_unchanged(self):
+        sample = (DATA_DIR / SAMPLE_BRIEF).read_text(encoding="utf-8")
+        text, report = normalize_brief(sample)
+
+        assert text == sample.strip()
+        assert report.boilerplate_lines_removed == 0
+
+
+class TestExtractionParity:
+
+    @pytest.mark.asyncio
+    async def test_paged_pdf_parses_to_the_same_fields(self):
+        """The sample brief as a paged PDF with a running header and footer
+        parses to the same BriefParserOutput as the plain brief — every field
+        survives, figures alone on a line at a page's edge included, and only
+        the boilerplate goes."""
+        sample = (DATA_DIR / SAMPLE_BRIEF).read_text(encoding="utf-8")
+        sample = sample.encode("latin-1", "replace").decode("latin-1").strip()
+        sample += "\n\nBUDGET (USD):\n150000\n\nWEEKS:\n8"
+        sections = sample.split("\n\n")
+        bodies = ["\n\n".join(sections[i:i + 2]) for i in range(0, len(sections), 2)]
+        pdf = make_pdf(_paged(bodies).split("\f"))
+
+        texts, _ = _extract_pages(pdf, 0, len(bodies))
+        from_pdf, report = normalize_brief("\f".join(texts))
+        from_text, _ = normalize_brief(sample)
+
+        client = LabelledBriefClient()
+        parsed_pdf = await parse_brief(BriefParserInput(raw_text=from_pdf), client)
+        parsed_text = await parse_brief(BriefParserInput(raw_text=from_text), client)
+
+        assert parsed_pdf == parsed_text
+        assert parsed_pdf.budget.endswith("150000") and parsed_pdf.timeline.endswith("8")
+        assert report.boilerplate_lines_removed == 2 * len(bodies)
+        assert report.tokens_after < report.tokens_before
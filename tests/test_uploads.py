@@ -0,0 +1,108 @@
+"""Tests for the streaming form reader: early 413, first-chunk checks, spooling."""
+
+import os
+
+import pytest
+from fastapi import Request
+
+from app.config import settings
+from app.uploads import UploadTooLarge, read_form
+
+BOUNDARY = "testboundary"
+
+
+def _multipart(parts: list[tuple[str, str | None, bytes]]) -> bytes:
+    body = b""
+    for name, filename, content in parts:
+        disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + content + b"\r\n"
+    return body + f"--{BOUNDARY}--\r\n".encode()
+
+
+class StreamedRequest:
+    """Builds a Request whose body arrives in fixed-size chunks, counting how many were read."""
+
+    def __init__(self, body: bytes, chunk_size: int = 64 * 1024,
+                 content_type: str = f"multipart/form-data; boundary={BOUNDARY}",
+                 content_length: int | None = None):
+        self.chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.chunks_read = 0
+        headers = [(b"content-type", content_type.encode())]
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        self.request = Request({"type": "http", "method": "POST", "headers": headers}, self._receive)
+
+    async def _receive(self) -> dict:
+        chunk = self.chunks[self.chunks_read]
+        self.chunks_read += 1
+        return {"type": "http.request", "body": chunk, "more_body": self.chunks_read < len(self.chunks)}
+
+
+class TestReadForm:
+
+    @pytest.mark.asyncio
+    async def test_reads_fields_and_file(self):
+        body = _multipart([("text", None, b"hello"), ("tenant", None, b"acme"),
+                           ("file", "brief.txt", b"A" * 100)])
+        form = await read_form(StreamedRequest(body).request)
+
+        assert form.fields == {"text": "hello", "tenant": "acme"}
+        assert form.upload.filename == "brief.txt"
+        assert form.upload.size == 100
+        assert form.upload.file.read() == b"A" * 100
+        form.close()
+
+    @pytest.mark.asyncio
+    async def test_oversized_upload_aborts_mid_stream(self):
+        body = _multipart([("file", "brief.txt", b"A" * (settings.max_upload_size_bytes + 1024 * 1024))])
+        streamed = StreamedRequest(body)
+
+        with pytest.raises(UploadTooLarge):
+            await read_form(streamed.request)
+        # Stopped at the limit, not after receiving the whole body
+        assert streamed.chunks_read < len(streamed.chunks)
+
+    @pytest.mark.asyncio
+    async def test_declared_oversized_length_rejected_before_reading(self):
+        streamed = StreamedRequest(b"", content_length=settings.max_upload_size_bytes * 2)
+        with pytest.raises(UploadTooLarge):
+            await read_form(streamed.request)
+        assert streamed.chunks_read == 0
+
+    @pytest.mark.asyncio
+    async def test_bad_magic_bytes_rejected_on_first_chunk(self):
+        body = _multipart([("file", "malicious.pdf", b"MZ" + b"\x00" * (512 * 1024))])
+        streamed = StreamedRequest(body)
+
+        with pytest.raises(ValueError, match="does not appear to be a valid PDF"):
+            await read_form(streamed.request)
+        assert streamed.chunks_read == 1
+
+    @pytest.mark.asyncio
+    async def test_unsupported_extension_rejected_on_first_chunk(self):
+        body = _multipart([("file", "brief.docx", b"PK" + b"\x00" * (512 * 1024))])
+        streamed = StreamedRequest(body)
+
+        with pytest.raises(ValueError, match="Unsupported file type"):
+            await read_form(streamed.request)
+        assert streamed.chunks_read == 1
+
+    @pytest.mark.asyncio
+    async def test_large_upload_spools_to_disk(self):
+        size = settings.upload_spool_bytes + 1
+        form = await read_form(StreamedRequest(_multipart([("file", "brief.txt", b"A" * size)])).request)
+
+        path = form.upload.file.path
+        assert os.path.getsize(path) == size
+        assert len(form.upload.file.read()) == size
+        form.close()
+        assert not os.path.exists(path)
+
+    @pytest.mark.asyncio
+    async def test_urlencoded_form(self):
+        streamed = StreamedRequest(b"text=hello+world&batch=b1",
+                                   content_type="application/x-www-form-urlencoded")
+        form = await read_form(streamed.request)
+
+        assert form.fields == {"text": "hello world", "batch": "b1"}
+        assert form.upload is None